@@ -1,9 +1,11 @@
 import fastapi
 
 from src.api.routes.account_router import router as account_router
+from src.api.routes.auth_router import router as auth_router
 
 router = fastapi.APIRouter(
     prefix="/v1",
 )
 
 router.include_router(account_router)
+router.include_router(auth_router)
@@ -1,19 +1,40 @@
+import asyncio
+import typing
+
 import fastapi
 import loguru
+import orjson
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker as sqlalchemy_async_sessionmaker,
     AsyncEngine as SQLAlchemyAsyncEngine,
     AsyncSession as SQLAlchemyAsyncSession,
     create_async_engine as create_sqlalchemy_async_engine,
 )
+from starlette.background import BackgroundTask
 
 from src.config.settings.setup import settings, Settings
 from src.crud import account_crud
-from src.models.schemas.account_schema import AccountInAuthentication, AccountInUpdate, AccountOut, AccountOutDelete
-from src.utility.database.db_session import get_async_session
+from src.models.schemas.account_schema import (
+    AccountInAuthentication,
+    AccountInBulkDelete,
+    AccountInUpdate,
+    AccountOut,
+    AccountOutBulkCreate,
+    AccountOutBulkDelete,
+    AccountOutCount,
+    AccountOutDelete,
+)
+from src.utility.database.change_feed import ChangeFeedFullError
+from src.utility.database.db_session import get_async_read_session, get_async_session, open_async_read_session
+from src.utility.http.conditional_requests import conditional_response
+from src.utility.pydantic_schema.orm_serializer import compile_orm_serializer
 
 router = fastapi.APIRouter(prefix="/account", tags=["account"])
 
+# Handlers return `ORJSONResponse`s built from the ORM rows, `response_model` only documents the schema
+serialize_account_out = compile_orm_serializer(AccountOut)
+
 
 @router.post(
     path="",
@@ -24,10 +45,10 @@ router = fastapi.APIRouter(prefix="/account", tags=["account"])
 async def create_account(
     new_account: AccountInAuthentication,
     db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
-) -> AccountOut:
+) -> ORJSONResponse:
     try:
         created_account = await account_crud.create(new_account, db_session)
-        return AccountOut(**created_account.__dict__)
+        return ORJSONResponse(content=serialize_account_out(created_account), status_code=201)
     except fastapi.HTTPException as e:
         loguru.logger.debug(f"Error creating account: {e.detail}")
         raise e  # Re-raise the HTTPException so FastAPI can handle it
@@ -36,6 +57,31 @@ async def create_account(
         raise fastapi.HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post(
+    path="/bulk",
+    name="account:create_accounts_bulk",
+    response_model=list[AccountOutBulkCreate],
+    status_code=200,
+)
+async def create_accounts_bulk(
+    new_accounts: list[AccountInAuthentication],
+    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
+) -> ORJSONResponse:
+    _check_bulk_size(len(new_accounts), max_items=settings.BULK_CREATE_MAX_ITEMS)
+    results = await account_crud.create_many(new_accounts, db_session)
+    return ORJSONResponse(
+        content=[
+            {
+                "index": index,
+                "isCreated": created_account is not None,
+                "account": serialize_account_out(created_account) if created_account is not None else None,
+                "detail": detail,
+            }
+            for index, (created_account, detail) in enumerate(results)
+        ]
+    )
+
+
 @router.get(
     path="",
     name="account:get_all_accounts",
@@ -43,13 +89,157 @@ async def create_account(
     status_code=200,
 )
 async def get_all_accounts(
-    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
-) -> list[AccountOut]:
+    request: fastapi.Request,
+    limit: int | None = fastapi.Query(default=None, ge=1),
+    after: int | None = fastapi.Query(default=None, ge=0),
+    ids: list[int] | None = fastapi.Query(default=None),
+    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_read_session),
+) -> fastapi.Response:
+    if ids:
+        return await _get_accounts_by_ids(request=request, ids=ids, db_session=db_session)
 
-    accounts = await account_crud.get_all(db_session)
+    limit = min(limit or settings.PAGE_SIZE_DEFAULT, settings.PAGE_SIZE_MAX)
+
+    accounts = await account_crud.get_page(db_session, limit=limit, after=after)
     if not accounts:
         raise fastapi.HTTPException(status_code=404, detail="No accounts found")
-    return [AccountOut(**account.__dict__) for account in accounts]
+    response = conditional_response(
+        request, accounts, lambda: ORJSONResponse(content=[serialize_account_out(account) for account in accounts])
+    )
+    if len(accounts) == limit:
+        response.headers["X-Next-Cursor"] = str(accounts[-1].id)
+    return response
+
+
+@router.get(
+    path="/stream",
+    name="account:stream_accounts",
+    response_class=StreamingResponse,
+    status_code=200,
+)
+async def stream_accounts() -> StreamingResponse:
+    async def account_lines() -> typing.AsyncIterator[bytes]:
+        # The session is opened inside the generator, because the request scoped session of
+        # `get_async_read_session` is already closed once the body is streamed
+        async with open_async_read_session() as db_session:
+            async for account in account_crud.stream_all(db_session, yield_per=settings.STREAM_YIELD_PER):
+                yield orjson.dumps(serialize_account_out(account)) + b"\n"
+
+    return StreamingResponse(account_lines(), media_type="application/x-ndjson")
+
+
+@router.get(
+    path="/changes",
+    name="account:stream_account_changes",
+    response_class=StreamingResponse,
+    status_code=200,
+)
+async def stream_account_changes(
+    last_event_id: int | None = fastapi.Header(default=None, alias="Last-Event-ID", ge=0),
+) -> StreamingResponse:
+    """
+    Server-Sent Events of the committed account changes: `create` and `update` with the account, `delete` with its
+    id. A client reconnecting with `Last-Event-ID` is sent the events it missed, a `reset` event tells it that they
+    are no longer buffered and that it has to fetch the accounts again.
+    """
+    change_feed = account_crud.get_account_change_feed()
+    try:
+        subscription = change_feed.subscribe(last_event_id=last_event_id)
+    except ChangeFeedFullError as e:
+        raise fastapi.HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+        )
+
+    async def change_events() -> typing.AsyncIterator[bytes]:
+        # Sent right away, so that the client sees the stream open before the first change
+        yield b": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=settings.CHANGE_FEED_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing the idle connection
+                yield b": heartbeat\n\n"
+                continue
+            if event is None:
+                # Dropped for falling behind, the client reconnects and resumes from its last event
+                return
+            yield event.frame
+
+    return StreamingResponse(
+        change_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Runs when the stream ends, also when the client disconnects
+        background=BackgroundTask(change_feed.unsubscribe, subscription),
+    )
+
+
+@router.get(
+    path="/search",
+    name="account:search_accounts",
+    response_model=list[AccountOut],
+    status_code=200,
+)
+async def search_accounts(
+    request: fastapi.Request,
+    username: str | None = fastapi.Query(default=None, min_length=1, max_length=64, description="Username prefix"),
+    email: str | None = fastapi.Query(default=None, min_length=1, max_length=64, description="Case-insensitive"),
+    is_admin: bool | None = fastapi.Query(default=None),
+    is_verified: bool | None = fastapi.Query(default=None),
+    is_logged_in: bool | None = fastapi.Query(default=None),
+    limit: int | None = fastapi.Query(default=None, ge=1),
+    after: int | None = fastapi.Query(default=None, ge=0),
+    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_read_session),
+) -> fastapi.Response:
+    limit = min(limit or settings.PAGE_SIZE_DEFAULT, settings.PAGE_SIZE_MAX)
+
+    accounts = await account_crud.search(
+        db_session,
+        limit=limit,
+        after=after,
+        username_prefix=username,
+        email=email,
+        is_admin=is_admin,
+        is_verified=is_verified,
+        is_logged_in=is_logged_in,
+    )
+    response = conditional_response(
+        request, accounts, lambda: ORJSONResponse(content=[serialize_account_out(account) for account in accounts])
+    )
+    if len(accounts) == limit:
+        response.headers["X-Next-Cursor"] = str(accounts[-1].id)
+    return response
+
+
+@router.get(
+    path="/count",
+    name="account:count_accounts",
+    response_model=AccountOutCount,
+    status_code=200,
+)
+async def count_accounts(
+    mode: typing.Literal["exact", "approximate"] = fastapi.Query(default="approximate"),
+    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_read_session),
+) -> AccountOutCount:
+    count, is_exact = await account_crud.count(
+        db_session, exact=mode == "exact", exact_below=settings.COUNT_EXACT_BELOW_ROWS
+    )
+    return AccountOutCount(count=count, mode="exact" if is_exact else "approximate")
+
+
+@router.delete(
+    path="/bulk",
+    name="account:delete_accounts_bulk",
+    response_model=list[AccountOutBulkDelete],
+    status_code=200,
+)
+async def delete_accounts_bulk(
+    accounts_to_delete: AccountInBulkDelete,
+    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
+) -> list[AccountOutBulkDelete]:
+    _check_bulk_size(len(accounts_to_delete.ids), max_items=settings.BULK_MAX_ITEMS)
+    deleted_ids = set(await account_crud.delete_many_by_ids(accounts_to_delete.ids, db_session))
+    return [AccountOutBulkDelete(id=id, is_deleted=id in deleted_ids) for id in accounts_to_delete.ids]
 
 
 @router.get(
@@ -59,13 +249,16 @@ async def get_all_accounts(
     status_code=200,
 )
 async def get_account_by_id(
+    request: fastapi.Request,
     id: int,
-    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
-) -> AccountOut:
-    account = await account_crud.get_by_id(id, db_session)
+) -> fastapi.Response:
+    # No request scoped session, concurrent lookups are batched into one query on the session of the loader
+    account = await account_crud.load_by_id(id)
     if not account:
         raise fastapi.HTTPException(status_code=404, detail="Account not found")
-    return AccountOut(**account.__dict__)
+    return conditional_response(
+        request, [account], lambda: ORJSONResponse(content=serialize_account_out(account)), with_last_modified=True
+    )
 
 
 @router.put(
@@ -78,11 +271,11 @@ async def update_account_by_id(
     id: int,
     update_account: AccountInUpdate,
     db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
-) -> AccountOut:
+) -> ORJSONResponse:
     account = await account_crud.update_by_id(id, update_account, db_session)
     if not account:
         raise fastapi.HTTPException(status_code=404, detail="Account not found")
-    return AccountOut(**account.__dict__)
+    return ORJSONResponse(content=serialize_account_out(account))
 
 
 @router.delete(
@@ -94,6 +287,30 @@ async def update_account_by_id(
 async def delete_account_by_id(
     id: int,
     db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
-) -> fastapi.Response:
+) -> AccountOutDelete:
     is_deleted = await account_crud.delete_by_id(id, db_session)
     return AccountOutDelete(is_deleted=is_deleted)
+
+
+async def _get_accounts_by_ids(
+    request: fastapi.Request, ids: list[int], db_session: SQLAlchemyAsyncSession
+) -> fastapi.Response:
+    _check_bulk_size(len(ids), max_items=settings.BULK_MAX_ITEMS)
+    unique_ids = list(dict.fromkeys(ids))
+    accounts_by_id = {account.id: account for account in await account_crud.get_many_by_ids(unique_ids, db_session)}
+    if not accounts_by_id:
+        raise fastapi.HTTPException(status_code=404, detail="No accounts found")
+
+    accounts = [accounts_by_id[id] for id in unique_ids if id in accounts_by_id]
+    response = conditional_response(
+        request, accounts, lambda: ORJSONResponse(content=[serialize_account_out(account) for account in accounts])
+    )
+    missing_ids = [id for id in unique_ids if id not in accounts_by_id]
+    if missing_ids:
+        response.headers["X-Missing-Ids"] = ",".join(str(id) for id in missing_ids)
+    return response
+
+
+def _check_bulk_size(size: int, max_items: int) -> None:
+    if size > max_items:
+        raise fastapi.HTTPException(status_code=422, detail=f"At most {max_items} items are allowed per bulk request")
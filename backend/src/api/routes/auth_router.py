@@ -0,0 +1,134 @@
+import fastapi
+import loguru
+from sqlalchemy.ext.asyncio import AsyncSession as SQLAlchemyAsyncSession
+
+from src.config.settings.setup import settings
+from src.crud import account_crud
+from src.models.db_tables.account_table import Account
+from src.models.schemas.auth_schema import AccountInLogin, AccountOutAuthenticated, TokenInRefresh, TokenOut
+from src.utility.cache.cache_backend import CacheUnavailableError
+from src.utility.database.db_session import get_async_session
+from src.utility.security.jwt_tokens import (
+    ACCESS_TOKEN,
+    get_current_token,
+    get_token_manager,
+    InvalidTokenError,
+    REFRESH_TOKEN,
+    TokenClaims,
+)
+from src.utility.security.password_hashing import get_password_hasher
+
+router = fastapi.APIRouter(prefix="/auth", tags=["auth"])
+
+
+@router.post(
+    path="/login",
+    name="auth:login",
+    response_model=TokenOut,
+    status_code=200,
+)
+async def login(
+    credentials: AccountInLogin,
+    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
+) -> TokenOut:
+    password_hasher = get_password_hasher()
+    account = await account_crud.get_by_username(credentials.username, db_session)
+    if not account:
+        # Hashed all the same, so that the response time does not tell whether the username exists
+        await password_hasher.verify_unknown(credentials.password)
+        raise fastapi.HTTPException(status_code=401, detail="Invalid username or password")
+    if not await password_hasher.verify(account.password, credentials.password):
+        raise fastapi.HTTPException(status_code=401, detail="Invalid username or password")
+
+    if password_hasher.needs_rehash(account.password):
+        await account_crud.set_password(account.id, await password_hasher.hash(credentials.password), db_session)
+    if not account.is_logged_in:
+        await account_crud.set_logged_in(account.id, True, db_session)
+    loguru.logger.info(f"* account {account.id} logged in")
+    return _issue_tokens(account)
+
+
+@router.post(
+    path="/refresh",
+    name="auth:refresh",
+    response_model=TokenOut,
+    status_code=200,
+)
+async def refresh(
+    token: TokenInRefresh,
+    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
+) -> TokenOut:
+    token_manager = get_token_manager()
+    try:
+        claims = await token_manager.verify(token.refresh_token, token_type=REFRESH_TOKEN)
+        # Rotate, a refresh token can be used once. It is revoked before the account is looked up, so that of
+        # concurrent refreshes with the same token only one gets new tokens
+        if not await token_manager.revoke(claims):
+            raise fastapi.HTTPException(status_code=401, detail="Token has been revoked")
+    except InvalidTokenError as e:
+        raise fastapi.HTTPException(status_code=401, detail=str(e))
+    except CacheUnavailableError as e:
+        raise _revocations_unavailable(e)
+
+    # Refreshing is the only point where the account is looked up, uncached, so a logout or a deleted account
+    # ends the session on every worker here at the latest
+    accounts = await account_crud.get_many_by_ids([claims.account_id], db_session)
+    account = accounts[0] if accounts else None
+    if not account or not account.is_logged_in:
+        raise fastapi.HTTPException(status_code=401, detail="Account is logged out")
+    return _issue_tokens(account)
+
+
+@router.post(
+    path="/logout",
+    name="auth:logout",
+    status_code=204,
+)
+async def logout(
+    token: TokenInRefresh,
+    claims: TokenClaims = fastapi.Depends(get_current_token),
+    db_session: SQLAlchemyAsyncSession = fastapi.Depends(get_async_session),
+) -> fastapi.Response:
+    token_manager = get_token_manager()
+    try:
+        try:
+            refresh_claims = await token_manager.verify(token.refresh_token, token_type=REFRESH_TOKEN)
+        except InvalidTokenError:
+            # An expired or revoked refresh token can not be used anymore anyway
+            refresh_claims = None
+        if refresh_claims is not None and refresh_claims.account_id != claims.account_id:
+            raise fastapi.HTTPException(status_code=401, detail="Refresh token belongs to another account")
+
+        await token_manager.revoke(claims)
+        if refresh_claims is not None:
+            await token_manager.revoke(refresh_claims)
+    except CacheUnavailableError as e:
+        raise _revocations_unavailable(e)
+    await account_crud.set_logged_in(claims.account_id, False, db_session)
+    return fastapi.Response(status_code=204)
+
+
+@router.get(
+    path="/me",
+    name="auth:get_authenticated_account",
+    response_model=AccountOutAuthenticated,
+    status_code=200,
+)
+async def get_authenticated_account(
+    claims: TokenClaims = fastapi.Depends(get_current_token),
+) -> AccountOutAuthenticated:
+    return AccountOutAuthenticated(id=claims.account_id, username=claims.username, is_admin=claims.is_admin)
+
+
+def _issue_tokens(account: Account) -> TokenOut:
+    token_manager = get_token_manager()
+    access_token, _ = token_manager.issue(account.id, account.username, account.is_admin, token_type=ACCESS_TOKEN)
+    refresh_token, _ = token_manager.issue(account.id, account.username, account.is_admin, token_type=REFRESH_TOKEN)
+    return TokenOut(access_token=access_token, refresh_token=refresh_token, expires_in=token_manager.access_token_ttl)
+
+
+def _revocations_unavailable(error: CacheUnavailableError) -> fastapi.HTTPException:
+    # Fail closed, a token whose revocation can not be checked or recorded is not accepted
+    return fastapi.HTTPException(
+        status_code=503, detail=str(error), headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+    )
@@ -0,0 +1,18 @@
+import fastapi
+from fastapi.responses import PlainTextResponse
+
+from src.utility.metrics.metrics_registry import metrics_registry
+
+router = fastapi.APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(
+    path="/metrics",
+    name="metrics:get_metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
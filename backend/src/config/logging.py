@@ -1,13 +1,176 @@
+import asyncio
+import queue
+import random
 import sys
+import threading
+import traceback
+import typing
 
 import loguru
+import orjson
+
+from src.config.settings.setup import settings
+
+if typing.TYPE_CHECKING:
+    # Only defined in the type stubs of loguru, `LogFilter` is a `loguru.FilterFunction`
+    from loguru import Record
+
+DEV_LOG_FORMAT = (
+    "<level>{level: <8}|</level><cyan>{function}</cyan>:<cyan>{line}</cyan> \t:<g><level>{message}</level></g>"
+)
+
+
+class LogFilter:
+    """
+    Per-module minimum levels plus sampling of records below WARNING.
+
+    `module_levels` maps module prefixes such as `src.crud` to a level, the longest matching prefix
+    wins. The resolved level is memoized per module, so the filter costs one dict lookup per record.
+    """
+
+    def __init__(self, level: str, module_levels: dict[str, str], sample_rate: float):
+        self.level_no = loguru.logger.level(level).no
+        self.module_level_nos = {
+            module: loguru.logger.level(module_level).no for module, module_level in module_levels.items()
+        }
+        self.sample_rate = sample_rate
+        self.warning_no = loguru.logger.level("WARNING").no
+        self._resolved_level_nos: dict[str | None, int] = {}
+
+    @property
+    def min_level_no(self) -> int:
+        # Passed as the sink level, so that loguru drops records below it before formatting them
+        return min([self.level_no, *self.module_level_nos.values()])
+
+    def _resolve_level_no(self, module: str | None) -> int:
+        parts = (module or "").split(".")
+        for end in range(len(parts), 0, -1):
+            level_no = self.module_level_nos.get(".".join(parts[:end]))
+            if level_no is not None:
+                return level_no
+        return self.level_no
+
+    def __call__(self, record: "Record") -> bool:
+        module = record["name"]
+        level_no = self._resolved_level_nos.get(module)
+        if level_no is None:
+            level_no = self._resolved_level_nos[module] = self._resolve_level_no(module)
+
+        record_level_no = record["level"].no
+        if record_level_no < level_no:
+            return False
+        if record_level_no < self.warning_no and self.sample_rate < 1.0:
+            return random.random() < self.sample_rate
+        return True
+
+
+class JSONSink:
+    """
+    Non-blocking sink writing one JSON document per record.
+
+    `write` only hands the record to a bounded in-process queue, serializing and writing happens on a
+    background thread. When the queue is full the record is dropped and counted instead of blocking the
+    event loop. Unlike loguru's `enqueue=True`, records are not pickled through a multiprocessing pipe.
+    """
+
+    def __init__(self, stream: typing.TextIO, max_queue_size: int = 10000):
+        self.stream = stream
+        self.dropped: int = 0
+        self._queue: queue.Queue["Record | None"] = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._write_records, name="json-log-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, message: "loguru.Message") -> None:
+        try:
+            self._queue.put_nowait(message.record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    async def complete(self) -> None:
+        await asyncio.to_thread(self._queue.join)
+
+    @staticmethod
+    def serialize(record: "Record") -> str:
+        extra = dict(record["extra"])
+        log = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "logger": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+            "message": record["message"],
+            "requestId": extra.pop("request_id", None),
+        }
+        if extra:
+            log["extra"] = extra
+        exception = record["exception"]
+        if exception:
+            log["exception"] = {
+                "type": getattr(exception.type, "__name__", None),
+                "message": str(exception.value),
+                "traceback": "".join(traceback.format_exception(exception.type, exception.value, exception.traceback)),
+            }
+        return orjson.dumps(log, default=str).decode() + "\n"
+
+    def _write_records(self) -> None:
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                self.stream.write(self.serialize(record))
+                # Flush once per burst instead of once per record
+                if self._queue.empty():
+                    self.stream.flush()
+            except Exception as e:
+                sys.stderr.write(f"JSON log sink failed: {e}\n")
+            finally:
+                self._queue.task_done()
+
+
+def parse_module_levels(module_levels: str) -> dict[str, str]:
+    """
+    Parse `src.crud=WARNING,sqlalchemy=INFO` into a module to level mapping.
+    """
+    return {
+        module.strip(): level.strip().upper()
+        for module, _, level in (entry.partition("=") for entry in module_levels.split(",") if entry.strip())
+    }
+
+
+def add_development_sink(stream: typing.TextIO) -> int:
+    log_filter = LogFilter(
+        level=settings.LOG_LEVEL,
+        module_levels=parse_module_levels(settings.LOG_MODULE_LEVELS),
+        sample_rate=1.0,
+    )
+    return loguru.logger.add(stream, format=DEV_LOG_FORMAT, level=log_filter.min_level_no, filter=log_filter)
+
+
+def add_production_sink(stream: typing.TextIO, sample_rate: float | None = None) -> int:
+    log_filter = LogFilter(
+        level=settings.LOG_LEVEL,
+        module_levels=parse_module_levels(settings.LOG_MODULE_LEVELS),
+        sample_rate=settings.LOG_INFO_SAMPLE_RATE if sample_rate is None else sample_rate,
+    )
+    return loguru.logger.add(
+        JSONSink(stream),
+        format="{message}",
+        level=log_filter.min_level_no,
+        filter=log_filter,
+        backtrace=False,
+        diagnose=False,
+    )
 
 
-# TODO: add option for production logging
 def setup_logging() -> None:
     loguru.logger.remove(handler_id=None)
-    dev_log_format = (
-        "<level>{level: <8}|</level><cyan>{function}</cyan>:<cyan>{line}</cyan> \t:<g><level>{message}</level></g>"
-    )
-    loguru.logger.add(sys.stderr, format=dev_log_format)
+    if settings.LOG_MODE == "production":
+        add_production_sink(sys.stdout)
+    else:
+        add_development_sink(sys.stderr)
     loguru.logger.success("Logging setup completed!")
@@ -1,4 +1,6 @@
+import functools
 import pathlib
+import typing
 
 import decouple
 import pydantic
@@ -6,6 +8,16 @@ import pydantic_settings
 
 ROOT_DIR: pathlib.Path = pathlib.Path(__file__).parent.parent.parent.parent.parent.resolve()
 
+# Searches the `.env` file upwards from this directory, like `decouple.config` called from this module
+_config = decouple.AutoConfig(search_path=str(pathlib.Path(__file__).parent))
+
+
+def env_config(key: str, **kwargs: typing.Any) -> typing.Any:
+    """
+    Field read through `decouple` when the settings are instantiated, instead of when the class is defined.
+    """
+    return pydantic.Field(default_factory=functools.partial(_config, key, **kwargs))
+
 
 class Settings(pydantic_settings.BaseSettings):
     """
@@ -21,35 +33,120 @@ class Settings(pydantic_settings.BaseSettings):
     VERSION: str = "0.1.0"
     TIMEZONE: str = "UTC"
     DESCRIPTION: str | None = None
-    DEBUG: bool = decouple.config("DEBUG", cast=bool)  # type: ignore
-    # ENVIRONMENT: str = decouple.config("ENVIRONMENT", cast=str)  # type: ignore
-    TESTING: bool = decouple.config("TESTING", cast=bool)  # type: ignore
-    SERVER_HOST: str = decouple.config("BACKEND_SERVER_HOST", cast=str)  # type: ignore
-    SERVER_PORT: int = decouple.config("BACKEND_SERVER_PORT", cast=int)  # type: ignore
-    SERVER_WORKERS: int = decouple.config("BACKEND_SERVER_WORKERS", cast=int)  # type: ignore
-    STATIC_FILE_DIRECTORY: str = decouple.config("STATIC_FILE_DIRECTORY", cast=str)  # type: ignore
+    DEBUG: bool = env_config("DEBUG", cast=bool)  # type: ignore
+    # ENVIRONMENT: str = env_config("ENVIRONMENT", cast=str)  # type: ignore
+    TESTING: bool = env_config("TESTING", cast=bool)  # type: ignore
+    SERVER_HOST: str = env_config("BACKEND_SERVER_HOST", cast=str)  # type: ignore
+    SERVER_PORT: int = env_config("BACKEND_SERVER_PORT", cast=int)  # type: ignore
+    SERVER_WORKERS: int = env_config("BACKEND_SERVER_WORKERS", cast=int)  # type: ignore
+    SERVER_KEEP_ALIVE_SECONDS: int = env_config("BACKEND_SERVER_KEEP_ALIVE_SECONDS", default=5, cast=int)  # type: ignore
+    SERVER_BACKLOG: int = env_config("BACKEND_SERVER_BACKLOG", default=2048, cast=int)  # type: ignore
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = env_config("BACKEND_SERVER_GRACEFUL_SHUTDOWN_SECONDS", default=10, cast=int)  # type: ignore
+    STATIC_FILE_DIRECTORY: str = env_config("STATIC_FILE_DIRECTORY", cast=str)  # type: ignore
+
+    # ---------------------Logging---------------------
+    LOG_MODE: str = env_config("LOG_MODE", default="development", cast=str)  # type: ignore
+    LOG_LEVEL: str = env_config("LOG_LEVEL", default="DEBUG", cast=str)  # type: ignore
+    LOG_MODULE_LEVELS: str = env_config("LOG_MODULE_LEVELS", default="", cast=str)  # type: ignore
+    LOG_INFO_SAMPLE_RATE: float = env_config("LOG_INFO_SAMPLE_RATE", default=1.0, cast=float)  # type: ignore
 
     # ---------------------CORSMiddleware---------------------
-    IS_ALLOWED_CREDENTIALS: bool = decouple.config("IS_ALLOWED_CREDENTIALS", cast=bool)  # type: ignore
-    ALLOWED_ORIGINS: list[str] = [
-        decouple.config("ALLOWED_ORIGIN_FRONTEND_LOCALHOST_DEFAULT", cast=str),  # type: ignore
-        decouple.config("ALLOWED_ORIGIN_FRONTEND_LOCALHOST_CUSTOM", cast=str),  # type: ignore
-        decouple.config("ALLOWED_ORIGIN_FRONTEND_DOCKER", cast=str),  # type: ignore
-        decouple.config("ALLOWED_ORIGIN_FRONTEND_PRODUCTION", cast=str),  # type: ignore
-    ]
-    ALLOWED_METHODS: list[str] = [decouple.config("ALLOWED_METHOD_1")]  # type: ignore
-    ALLOWED_HEADERS: list[str] = [decouple.config("ALLOWED_HEADER_1")]  # type: ignore
+    IS_ALLOWED_CREDENTIALS: bool = env_config("IS_ALLOWED_CREDENTIALS", cast=bool)  # type: ignore
+    ALLOWED_ORIGINS: list[str] = pydantic.Field(
+        default_factory=lambda: [
+            _config("ALLOWED_ORIGIN_FRONTEND_LOCALHOST_DEFAULT", cast=str),
+            _config("ALLOWED_ORIGIN_FRONTEND_LOCALHOST_CUSTOM", cast=str),
+            _config("ALLOWED_ORIGIN_FRONTEND_DOCKER", cast=str),
+            _config("ALLOWED_ORIGIN_FRONTEND_PRODUCTION", cast=str),
+        ]
+    )
+    ALLOWED_METHODS: list[str] = pydantic.Field(default_factory=lambda: [_config("ALLOWED_METHOD_1")])
+    ALLOWED_HEADERS: list[str] = pydantic.Field(default_factory=lambda: [_config("ALLOWED_HEADER_1")])
 
     # ---------------------Postgres---------------------
-    POSTGRES_USERNAME: str = decouple.config("POSTGRES_USERNAME", cast=str)  # type: ignore
-    POSTGRES_PASSWORD: str = decouple.config("POSTGRES_PASSWORD", cast=str)  # type: ignore
-    POSTGRES_PORT: int = decouple.config("POSTGRES_PORT", cast=int)  # type: ignore
-    POSTGRES_SCHEMA: str = decouple.config("POSTGRES_SCHEMA", cast=str)  # type: ignore
+    POSTGRES_USERNAME: str = env_config("POSTGRES_USERNAME", cast=str)  # type: ignore
+    POSTGRES_PASSWORD: str = env_config("POSTGRES_PASSWORD", cast=str)  # type: ignore
+    POSTGRES_PORT: int = env_config("POSTGRES_PORT", cast=int)  # type: ignore
+    POSTGRES_SCHEMA: str = env_config("POSTGRES_SCHEMA", cast=str)  # type: ignore
+
+    # ---------------------Read Replicas---------------------
+    POSTGRES_REPLICA_URIS: str = env_config("POSTGRES_REPLICA_URIS", default="")  # type: ignore
+    DB_REPLICA_STRATEGY: str = env_config("DB_REPLICA_STRATEGY", default="round_robin")  # type: ignore
+    DB_REPLICA_RETRY_SECONDS: float = env_config("DB_REPLICA_RETRY_SECONDS", default=30, cast=float)  # type: ignore
 
     # ---------------------Databases---------------------
-    POSTGRES_ECHO: bool = decouple.config("IS_DB_ECHO_LOG", cast=bool)  # type: ignore
-    DB_POOL_SIZE: int = decouple.config("DB_POOL_SIZE", cast=int)  # type: ignore
-    DB_MAX_OVERFLOW: int = decouple.config("DB_MAX_OVERFLOW", cast=int)  # type: ignore
+    POSTGRES_ECHO: bool = env_config("IS_DB_ECHO_LOG", cast=bool)  # type: ignore
+    DB_POOL_SIZE: int = env_config("DB_POOL_SIZE", cast=int)  # type: ignore
+    DB_MAX_OVERFLOW: int = env_config("DB_MAX_OVERFLOW", cast=int)  # type: ignore
+    DB_MAX_CONNECTIONS: int = env_config("DB_MAX_POOL_CON", default=100, cast=int)  # type: ignore
+    DB_POOL_TIMEOUT: float = env_config("DB_TIMEOUT", default=30, cast=float)  # type: ignore
+    DB_POOL_RECYCLE: int = env_config("DB_POOL_RECYCLE", default=1800, cast=int)  # type: ignore
+    DB_POOL_PRE_PING: bool = env_config("DB_POOL_PRE_PING", default=True, cast=bool)  # type: ignore
+    DB_POOL_WARMUP_CONNECTIONS: int = env_config("DB_POOL_WARMUP_CONNECTIONS", default=5, cast=int)  # type: ignore
+    DB_POOL_DRAIN_TIMEOUT: float = env_config("DB_POOL_DRAIN_TIMEOUT", default=10, cast=float)  # type: ignore
+    DB_STATEMENT_CACHE_SIZE: int = env_config("DB_STATEMENT_CACHE_SIZE", default=100, cast=int)  # type: ignore
+    DB_COMPILED_CACHE_SIZE: int = env_config("DB_COMPILED_CACHE_SIZE", default=500, cast=int)  # type: ignore
+    DB_SLOW_QUERY_MS: float = env_config("DB_SLOW_QUERY_MS", default=200, cast=float)  # type: ignore
+    DB_REPEATED_QUERY_THRESHOLD: int = env_config("DB_REPEATED_QUERY_THRESHOLD", default=5, cast=int)  # type: ignore
+
+    # ---------------------Pagination---------------------
+    PAGE_SIZE_DEFAULT: int = env_config("PAGE_SIZE_DEFAULT", default=100, cast=int)  # type: ignore
+    PAGE_SIZE_MAX: int = env_config("PAGE_SIZE_MAX", default=1000, cast=int)  # type: ignore
+    STREAM_YIELD_PER: int = env_config("STREAM_YIELD_PER", default=500, cast=int)  # type: ignore
+    BULK_MAX_ITEMS: int = env_config("BULK_MAX_ITEMS", default=1000, cast=int)  # type: ignore
+    BULK_CREATE_MAX_ITEMS: int = env_config("BULK_CREATE_MAX_ITEMS", default=50, cast=int)  # type: ignore
+    COUNT_EXACT_BELOW_ROWS: int = env_config("COUNT_EXACT_BELOW_ROWS", default=10000, cast=int)  # type: ignore
+
+    # ---------------------Admission Control---------------------
+    ADMISSION_READ_LIMIT: int = env_config("ADMISSION_READ_LIMIT", default=64, cast=int)  # type: ignore
+    ADMISSION_WRITE_LIMIT: int = env_config("ADMISSION_WRITE_LIMIT", default=32, cast=int)  # type: ignore
+    ADMISSION_MAX_QUEUE: int = env_config("ADMISSION_MAX_QUEUE", default=128, cast=int)  # type: ignore
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = env_config("ADMISSION_QUEUE_TIMEOUT_SECONDS", default=2, cast=float)  # type: ignore
+    ADMISSION_RETRY_AFTER_SECONDS: int = env_config("ADMISSION_RETRY_AFTER_SECONDS", default=1, cast=int)  # type: ignore
+    ADMISSION_MAX_POOL_WAITERS: int = env_config("ADMISSION_MAX_POOL_WAITERS", default=32, cast=int)  # type: ignore
+    ADMISSION_ROUTE_LIMITS: str = env_config("ADMISSION_ROUTE_LIMITS", default="metrics:get_metrics=0,account:stream_account_changes=0")  # type: ignore
+
+    # ---------------------Compression---------------------
+    GZIP_MINIMUM_SIZE: int = env_config("GZIP_MINIMUM_SIZE", default=1024, cast=int)  # type: ignore
+    GZIP_COMPRESS_LEVEL: int = env_config("GZIP_COMPRESS_LEVEL", default=6, cast=int)  # type: ignore
+
+    # ---------------------Batching---------------------
+    BATCH_LOAD_WINDOW_SECONDS: float = env_config("BATCH_LOAD_WINDOW_SECONDS", default=0.002, cast=float)  # type: ignore
+    BATCH_LOAD_MAX_SIZE: int = env_config("BATCH_LOAD_MAX_SIZE", default=100, cast=int)  # type: ignore
+
+    # ---------------------Change Feed---------------------
+    CHANGE_FEED_BUFFER_SIZE: int = env_config("CHANGE_FEED_BUFFER_SIZE", default=1000, cast=int)  # type: ignore
+    CHANGE_FEED_SUBSCRIBER_QUEUE_SIZE: int = env_config("CHANGE_FEED_SUBSCRIBER_QUEUE_SIZE", default=100, cast=int)  # type: ignore
+    CHANGE_FEED_MAX_SUBSCRIBERS: int = env_config("CHANGE_FEED_MAX_SUBSCRIBERS", default=1000, cast=int)  # type: ignore
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = env_config("CHANGE_FEED_HEARTBEAT_SECONDS", default=15, cast=float)  # type: ignore
+
+    # ---------------------Cache---------------------
+    CACHE_BACKEND: str = env_config("CACHE_BACKEND", default="memory", cast=str)  # type: ignore
+    CACHE_MAX_SIZE: int = env_config("CACHE_MAX_SIZE", default=10000, cast=int)  # type: ignore
+    CACHE_TTL_SECONDS: int = env_config("CACHE_TTL_SECONDS", default=60, cast=int)  # type: ignore
+    CACHE_SHARED_URL: str = env_config("CACHE_SHARED_URL", default="redis://localhost:6379/0")  # type: ignore
+    CACHE_INVALIDATION_LEASE_SECONDS: int = env_config("CACHE_INVALIDATION_LEASE_SECONDS", default=5, cast=int)  # type: ignore
+
+    # ---------------------JWT---------------------
+    JWT_SECRET_KEY: str = env_config("JWT_SECRET_KEY", default="")  # type: ignore
+    JWT_ALGORITHM: str = env_config("JWT_ALGORITHM", default="HS256")  # type: ignore
+    JWT_ACCESS_TOKEN_TTL_SECONDS: int = env_config("JWT_ACCESS_TOKEN_TTL_SECONDS", default=900, cast=int)  # type: ignore
+    JWT_REFRESH_TOKEN_TTL_SECONDS: int = env_config("JWT_REFRESH_TOKEN_TTL_SECONDS", default=1209600, cast=int)  # type: ignore
+    JWT_VERIFIED_CACHE_SIZE: int = env_config("JWT_VERIFIED_CACHE_SIZE", default=10000, cast=int)  # type: ignore
+    JWT_DENY_LIST_SIZE: int = env_config("JWT_DENY_LIST_SIZE", default=100000, cast=int)  # type: ignore
+
+    # ---------------------Profiling---------------------
+    PROFILER_SAMPLE_RATE: float = env_config("PROFILER_SAMPLE_RATE", default=0.0, cast=float)  # type: ignore
+    PROFILER_TRIGGER_TOKEN: str = env_config("PROFILER_TRIGGER_TOKEN", default="")  # type: ignore
+    PROFILER_INTERVAL_SECONDS: float = env_config("PROFILER_INTERVAL_SECONDS", default=0.005, cast=float)  # type: ignore
+    PROFILER_OUTPUT_DIRECTORY: str = env_config("PROFILER_OUTPUT_DIRECTORY", default="profiles")  # type: ignore
+
+    # ---------------------Password Hashing---------------------
+    PASSWORD_HASH_TIME_COST: int = env_config("PASSWORD_HASH_TIME_COST", default=3, cast=int)  # type: ignore
+    PASSWORD_HASH_MEMORY_COST: int = env_config("PASSWORD_HASH_MEMORY_COST", default=65536, cast=int)  # type: ignore
+    PASSWORD_HASH_PARALLELISM: int = env_config("PASSWORD_HASH_PARALLELISM", default=4, cast=int)  # type: ignore
+    PASSWORD_HASH_WORKERS: int = env_config("PASSWORD_HASH_WORKERS", default=2, cast=int)  # type: ignore
+    PASSWORD_HASH_BULK_CONCURRENCY: int = env_config("PASSWORD_HASH_BULK_CONCURRENCY", default=1, cast=int)  # type: ignore
 
     # --------------------Class Config-------------------
     model_config: pydantic.ConfigDict = pydantic.ConfigDict(
@@ -1,10 +1,8 @@
-import decouple
-
-from src.config.settings.base import Settings
+from src.config.settings.base import env_config, Settings
 
 
 class DevelopmentSettings(Settings):
     DESCRIPTION: str = "Development Settings | Modified FastAPI Template"
     DEBUG: bool = True
-    POSTGRES_DB: str = decouple.config("POSTGRES_DEV_DB", cast=str)  # type: ignore
-    POSTGRES_HOST: str = decouple.config("POSTGRES_DEV_HOST", cast=str)  # type: ignore
+    POSTGRES_DB: str = env_config("POSTGRES_DEV_DB", cast=str)  # type: ignore
+    POSTGRES_HOST: str = env_config("POSTGRES_DEV_HOST", cast=str)  # type: ignore
@@ -1,4 +1,4 @@
-from src.config.settings.base import Settings
+from src.config.settings.base import env_config, Settings
 
 # Use a secret manager to store sensitive information in production
 
@@ -7,3 +7,5 @@ class ProductionSettings(Settings):
     DESCRIPTION: str = "Production Settings | Modified FastAPI Template"
     DEBUG: bool = False
     TESTING: bool = False
+    LOG_MODE: str = "production"
+    LOG_LEVEL: str = env_config("LOG_LEVEL", default="INFO", cast=str)  # type: ignore
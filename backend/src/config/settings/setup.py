@@ -1,4 +1,5 @@
 import os
+import typing
 from functools import lru_cache
 
 import loguru
@@ -34,4 +35,14 @@ def get_settings() -> Settings:
     return SettingsFactory(environment)()
 
 
-settings: Settings = get_settings()
+class LazySettings:
+    """
+    Instantiates the settings of the environment on first attribute access, so that importing a module does not
+    read the environment.
+    """
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(get_settings(), name)
+
+
+settings: Settings = LazySettings()  # type: ignore
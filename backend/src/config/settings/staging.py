@@ -1,11 +1,9 @@
-import decouple
-
-from src.config.settings.base import Settings
+from src.config.settings.base import env_config, Settings
 
 
 class StagingSettings(Settings):
     DESCRIPTION: str = "Staging / Testing Settings | Modified FastAPI Template"
     DEBUG: bool = True
     TESTING: bool = True
-    POSTGRES_DB: str = decouple.config("POSTGRES_TEST_DB", cast=str)  # type: ignore
-    POSTGRES_HOST: str = decouple.config("POSTGRES_TEST_HOST", cast=str)  # type: ignore
+    POSTGRES_DB: str = env_config("POSTGRES_TEST_DB", cast=str)  # type: ignore
+    POSTGRES_HOST: str = env_config("POSTGRES_TEST_HOST", cast=str)  # type: ignore
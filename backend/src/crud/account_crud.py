@@ -1,26 +1,114 @@
+import datetime
+import functools
+import re
+import typing
+
 import fastapi
 import loguru
+import orjson
 import sqlalchemy
 from sqlalchemy import exc as sqlalchemy_error
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession as SQLAlchemyAsyncSession
-from sqlalchemy.orm import selectinload as sqlalchemy_selectinload
+from sqlalchemy.orm import InstrumentedAttribute
 from sqlalchemy.sql import functions as sqlalchemy_functions
 
+from src.config.settings.setup import settings
 from src.models.db_tables.account_table import Account
 from src.models.schemas.account_schema import AccountInAuthentication, AccountInUpdate, AccountOut, AccountOutDelete
+from src.utility.cache.cache_backend import CacheBackend, get_cache_backend
+from src.utility.database.batch_loader import BatchLoader
+from src.utility.database.change_feed import ChangeEvent, ChangeFeed
+from src.utility.database.db_class import db
+from src.utility.security.password_hashing import get_password_hasher
+
+# Channel of the `notify_account_change` trigger, see the migration `0003_add_account_change_notifications`
+ACCOUNT_CHANGES_CHANNEL = "account_changes"
+
+_UNIQUE_VIOLATION_SQLSTATE = "23505"
+_STRING_ARRAY = postgresql.ARRAY(sqlalchemy.String)
+_ACCOUNT_COLUMNS = tuple(column.key for column in Account.__table__.columns)
+# Row estimate of the planner statistics, -1 when the table was never vacuumed or analyzed
+_ESTIMATED_ACCOUNT_COUNT = sqlalchemy.text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table_name AS regclass)"
+).bindparams(table_name=Account.__tablename__)
+_ACCOUNT_DATETIME_COLUMNS = tuple(
+    column.key for column in Account.__table__.columns if isinstance(column.type, sqlalchemy.DateTime)
+)
+
+# Statements of the hot paths, built once with bound parameters and executed with their values as `params`. The
+# cache key of a statement object is memoized, so executing it again skips building the statement and its cache
+# key and goes straight to SQLAlchemy's compiled cache. The SQL is the same for every call, so asyncpg prepares it
+# once per connection, see `DB_STATEMENT_CACHE_SIZE`
+_SELECT_ACCOUNT_PAGE = sqlalchemy.select(Account).order_by(Account.id).limit(sqlalchemy.bindparam("limit"))
+_SELECT_ACCOUNT_PAGE_AFTER = _SELECT_ACCOUNT_PAGE.where(Account.id > sqlalchemy.bindparam("after"))
+_SELECT_ACCOUNT_BY_USERNAME = sqlalchemy.select(Account).where(Account.username == sqlalchemy.bindparam("username"))
+_SELECT_ACCOUNTS_BY_IDS = sqlalchemy.select(Account).where(
+    Account.id == sqlalchemy.any_(sqlalchemy.bindparam("ids", type_=postgresql.ARRAY(sqlalchemy.Integer)))
+)
+_SELECT_TAKEN_USERNAMES_AND_EMAILS = sqlalchemy.select(Account.username, Account.email).where(
+    sqlalchemy.or_(
+        Account.username == sqlalchemy.any_(sqlalchemy.bindparam("usernames", type_=_STRING_ARRAY)),
+        Account.email == sqlalchemy.any_(sqlalchemy.bindparam("emails", type_=_STRING_ARRAY)),
+    )
+)
+_COUNT_ACCOUNTS = sqlalchemy.select(sqlalchemy_functions.count()).select_from(Account)
+
+
+@functools.lru_cache
+def get_account_cache() -> CacheBackend:
+    return get_cache_backend(namespace="account")
+
+
+@functools.lru_cache
+def get_account_loader() -> BatchLoader[int, Account]:
+    return BatchLoader(
+        name="account",
+        load_many=_load_accounts_by_ids,
+        max_batch_size=settings.BATCH_LOAD_MAX_SIZE,
+        window_seconds=settings.BATCH_LOAD_WINDOW_SECONDS,
+        epoch=lambda: get_account_cache().epoch,
+    )
+
+
+@functools.lru_cache
+def get_account_change_feed() -> ChangeFeed:
+    """
+    The committed creates, updates and deletes of accounts. They are published by a trigger of the account table, so
+    every write of this module and of anything else writing to the table is published.
+    """
+    return ChangeFeed(
+        name="account",
+        channel=ACCOUNT_CHANGES_CHANNEL,
+        connect=db.connect_listener,
+        parse=_account_change_from_notification,
+        buffer_size=settings.CHANGE_FEED_BUFFER_SIZE,
+        subscriber_queue_size=settings.CHANGE_FEED_SUBSCRIBER_QUEUE_SIZE,
+        max_subscribers=settings.CHANGE_FEED_MAX_SUBSCRIBERS,
+        ping_interval=settings.CHANGE_FEED_HEARTBEAT_SECONDS,
+    )
 
 
 async def create(account: AccountInAuthentication, db_session: SQLAlchemyAsyncSession) -> Account:
+    """
+    Insert a new account with a single `INSERT ... RETURNING` statement.
+
+    Uniqueness of `username` and `email` is enforced by the database constraints, a violation is
+    mapped to a 409 response naming the clashing column.
+    """
     loguru.logger.info("* creating new account")
-    new_account = Account(**account.model_dump())
+    account_data = account.model_dump()
+    account_data["password"] = await get_password_hasher().hash(account.password)
+    insert_stmt = sqlalchemy.insert(Account).values(**account_data).returning(Account)
     try:
-        await _check_account_details_are_unique(account=account, db_session=db_session)
-        db_session.add(instance=new_account)
+        query = await db_session.execute(statement=insert_stmt)
+        new_account = query.scalar_one()
         await db_session.commit()
-        await db_session.refresh(instance=new_account)
         return new_account
-    except fastapi.HTTPException as exception:
-        raise exception
+
+    except sqlalchemy_error.IntegrityError as e:
+        await db_session.rollback()
+        _raise_for_unique_violation(error=e, account_data=account_data)
 
     except sqlalchemy_error.DatabaseError as e:
         await db_session.rollback()
@@ -28,95 +116,418 @@ async def create(account: AccountInAuthentication, db_session: SQLAlchemyAsyncSe
         raise fastapi.HTTPException(status_code=500, detail=str(e))
 
 
-async def get_all(db_session: SQLAlchemyAsyncSession) -> list[AccountOut]:
-    loguru.logger.info("* fetching all accounts")
-    select_stmt = sqlalchemy.select(Account).options(sqlalchemy_selectinload("*"))
+async def create_many(
+    accounts: list[AccountInAuthentication], db_session: SQLAlchemyAsyncSession
+) -> list[tuple[Account | None, str | None]]:
+    """
+    Insert many accounts with one multi-row `INSERT ... ON CONFLICT DO NOTHING RETURNING` and a
+    single commit.
+
+    Returns one `(account, conflict_detail)` pair per input, in input order. Rows skipped because of
+    a unique clash are looked up once afterwards to name the clashing column.
+    """
+    loguru.logger.info(f"* creating {len(accounts)} accounts")
+    if not accounts:
+        return []
+    accounts_data = [account.model_dump() for account in accounts]
+    hashed_passwords = await get_password_hasher().hash_many(
+        [account.password for account in accounts], max_concurrency=settings.PASSWORD_HASH_BULK_CONCURRENCY
+    )
+    for account_data, hashed_password in zip(accounts_data, hashed_passwords):
+        account_data["password"] = hashed_password
+    insert_stmt = postgresql.insert(Account).values(accounts_data).on_conflict_do_nothing().returning(Account)
 
     try:
-        query = await db_session.execute(statement=select_stmt)
-        return query.scalars().all()
+        query = await db_session.execute(statement=insert_stmt)
+        created_by_username = {account.username: account for account in query.scalars().all()}
+
+        results: list[tuple[Account | None, str | None]] = []
+        conflicts: list[int] = []
+        for index, account_data in enumerate(accounts_data):
+            # Pop, so that a duplicate within the same batch is not reported as created twice
+            created_account = created_by_username.pop(account_data["username"], None)
+            if created_account is not None and created_account.email == account_data["email"]:
+                results.append((created_account, None))
+            else:
+                results.append((None, None))
+                conflicts.append(index)
+
+        if conflicts:
+            conflicting_data = [accounts_data[index] for index in conflicts]
+            taken_usernames, taken_emails = await _get_taken_usernames_and_emails(
+                usernames=[account_data["username"] for account_data in conflicting_data],
+                emails=[account_data["email"] for account_data in conflicting_data],
+                db_session=db_session,
+            )
+            for index, account_data in zip(conflicts, conflicting_data):
+                if account_data["username"] in taken_usernames:
+                    results[index] = (None, f"Username {account_data['username']} already in use")
+                elif account_data["email"] in taken_emails:
+                    results[index] = (None, f"Email {account_data['email']} already in use")
+                else:
+                    results[index] = (None, "Account details already in use")
+
+        await db_session.commit()
+        return results
+
+    except sqlalchemy_error.DatabaseError as e:
+        await db_session.rollback()
+        loguru.logger.error(f"Error creating accounts: {e}")
+        raise fastapi.HTTPException(status_code=500, detail=str(e))
+
+
+async def get_page(db_session: SQLAlchemyAsyncSession, limit: int, after: int | None = None) -> list[Account]:
+    loguru.logger.info("* fetching page of accounts")
+    if after is None:
+        select_stmt, params = _SELECT_ACCOUNT_PAGE, {"limit": limit}
+    else:
+        select_stmt, params = _SELECT_ACCOUNT_PAGE_AFTER, {"limit": limit, "after": after}
+
+    try:
+        query = await db_session.execute(statement=select_stmt, params=params)
+        return list(query.scalars().all())
 
     except sqlalchemy_error.DatabaseError as e:
-        loguru.logger.error(f"Error getting all accounts: {e}")
+        loguru.logger.error(f"Error getting page of accounts: {e}")
         raise fastapi.HTTPException(status_code=500, detail=str(e))
 
 
-async def get_by_id(id: int, db_session: SQLAlchemyAsyncSession) -> AccountOut:
-    loguru.logger.info("* fetching account by id")
-    select_stmt = sqlalchemy.select(Account).options(sqlalchemy_selectinload("*")).where(Account.id == id)
+async def search(
+    db_session: SQLAlchemyAsyncSession,
+    limit: int,
+    after: int | None = None,
+    username_prefix: str | None = None,
+    email: str | None = None,
+    is_admin: bool | None = None,
+    is_verified: bool | None = None,
+    is_logged_in: bool | None = None,
+) -> list[Account]:
+    """
+    Keyset page of the accounts matching all given filters, ordered by id.
+
+    Every filter is written so that it can use its index of the account table, see the migration
+    `0002_add_account_search_indexes`.
+    """
+    loguru.logger.info("* searching accounts")
+    select_stmt = sqlalchemy.select(Account).order_by(Account.id).limit(limit)
+    if after is not None:
+        select_stmt = select_stmt.where(Account.id > after)
+    if username_prefix:
+        select_stmt = select_stmt.where(_starts_with(Account.username, username_prefix))
+    if email:
+        select_stmt = select_stmt.where(sqlalchemy.func.lower(Account.email) == email.lower())
+    # The flags are rendered as literal predicates instead of bound parameters, so that the planner can match
+    # them with the predicates of the partial indexes
+    for column, value in (
+        (Account.is_admin, is_admin),
+        (Account.is_verified, is_verified),
+        (Account.is_logged_in, is_logged_in),
+    ):
+        if value is not None:
+            select_stmt = select_stmt.where(column if value else sqlalchemy.not_(column))
+
     try:
         query = await db_session.execute(statement=select_stmt)
-        return query.scalars().first()
+        return list(query.scalars().all())
+
+    except sqlalchemy_error.DatabaseError as e:
+        loguru.logger.error(f"Error searching accounts: {e}")
+        raise fastapi.HTTPException(status_code=500, detail=str(e))
+
+
+async def count(db_session: SQLAlchemyAsyncSession, exact: bool, exact_below: int) -> tuple[int, bool]:
+    """
+    Number of accounts and whether it is exact.
+
+    The approximate count is the row estimate of the planner statistics, which autovacuum keeps up to date, so it
+    costs one catalog lookup however large the table is. Below `exact_below` estimated rows, or without
+    statistics, the exact `COUNT(*)` is cheap enough and returned instead.
+    """
+    loguru.logger.info("* counting accounts")
+    try:
+        if not exact:
+            estimated_count = (await db_session.execute(statement=_ESTIMATED_ACCOUNT_COUNT)).scalar_one()
+            if estimated_count >= exact_below:
+                return estimated_count, False
+
+        return (await db_session.execute(statement=_COUNT_ACCOUNTS)).scalar_one(), True
 
     except sqlalchemy_error.DatabaseError as e:
-        loguru.logger.error(f"Error getting account by id: {e}")
+        loguru.logger.error(f"Error counting accounts: {e}")
         raise fastapi.HTTPException(status_code=500, detail=str(e))
 
 
-async def update_by_id(id: int, account: AccountInUpdate, db_session: SQLAlchemyAsyncSession) -> AccountOut:
+async def stream_all(db_session: SQLAlchemyAsyncSession, yield_per: int) -> typing.AsyncIterator[sqlalchemy.Row]:
+    """
+    Stream all accounts ordered by id through a server-side cursor.
+
+    Plain column rows are fetched instead of ORM entities, so neither the identity map nor the
+    result buffer grows with the size of the table.
+    """
+    loguru.logger.info("* streaming all accounts")
+    select_stmt = (
+        sqlalchemy.select(*Account.__table__.columns).order_by(Account.id).execution_options(yield_per=yield_per)
+    )
+    result = await db_session.stream(statement=select_stmt)
+    async for account in result:
+        yield account
+
+
+async def load_by_id(id: int) -> Account | None:
+    """
+    Read-through lookup of a single account, served from the account cache when possible. A cache miss is looked up
+    together with the concurrent lookups of other requests in one batched query of the account loader, on its own
+    session of the primary.
+
+    A cache hit returns a transient `Account` that is not attached to a session.
+    """
+    loguru.logger.info("* loading account by id")
+    account_cache = get_account_cache()
+    cached_account = await account_cache.get(id)
+    if cached_account is not None:
+        return _account_from_cache(cached_account)
+
+    cache_epoch = account_cache.epoch
+    account = await get_account_loader().load(id)
+    if account is not None:
+        await account_cache.set(id, _account_to_cache(account), epoch=cache_epoch)
+    return account
+
+
+async def get_by_username(username: str, db_session: SQLAlchemyAsyncSession) -> Account | None:
+    loguru.logger.info("* fetching account by username")
+    try:
+        query = await db_session.execute(statement=_SELECT_ACCOUNT_BY_USERNAME, params={"username": username})
+        return query.scalar_one_or_none()
+
+    except sqlalchemy_error.DatabaseError as e:
+        loguru.logger.error(f"Error getting account by username: {e}")
+        raise fastapi.HTTPException(status_code=500, detail=str(e))
+
+
+async def get_many_by_ids(ids: list[int], db_session: SQLAlchemyAsyncSession) -> list[Account]:
+    loguru.logger.info(f"* fetching {len(ids)} accounts by id")
+    try:
+        query = await db_session.execute(statement=_SELECT_ACCOUNTS_BY_IDS, params={"ids": ids})
+        return list(query.scalars().all())
+
+    except sqlalchemy_error.DatabaseError as e:
+        loguru.logger.error(f"Error getting accounts by ids: {e}")
+        raise fastapi.HTTPException(status_code=500, detail=str(e))
+
+
+async def update_by_id(id: int, account: AccountInUpdate, db_session: SQLAlchemyAsyncSession) -> Account:
+    """
+    Update an account with a single `UPDATE ... RETURNING` statement, no row coming back means
+    that there is no account with the given id.
+    """
     loguru.logger.info("* updating account by id")
-    update_data = account.dict(exclude_unset=True)
+    update_data = account.model_dump(exclude_unset=True)
+    update_stmt = (
+        sqlalchemy.update(Account)
+        .where(Account.id == id)
+        .values(updated_at=sqlalchemy_functions.now(), **update_data)
+        .returning(Account)
+    )
+
+    try:
+        query = await db_session.execute(statement=update_stmt)
+        updated_account = query.scalar_one_or_none()
+        if not updated_account:
+            await db_session.rollback()
+            raise fastapi.HTTPException(status_code=404, detail=f"Account with id {id} not found")
+        await db_session.commit()
+        await get_account_cache().delete(id)
+        return updated_account
+
+    except sqlalchemy_error.IntegrityError as e:
+        await db_session.rollback()
+        _raise_for_unique_violation(error=e, account_data=update_data)
+
+    except sqlalchemy_error.DatabaseError as e:
+        await db_session.rollback()
+        raise fastapi.HTTPException(status_code=500, detail=str(e))
+
 
-    current_account = await get_by_id(id=id, db_session=db_session)
-    if not current_account:
-        raise fastapi.HTTPException(status_code=404, detail=f"Account with id {id} not found")
+async def set_logged_in(id: int, is_logged_in: bool, db_session: SQLAlchemyAsyncSession) -> Account | None:
+    """
+    Set `is_logged_in` of an account with a single `UPDATE ... RETURNING` statement, returns `None` when there is no
+    account with the given id.
+    """
+    loguru.logger.info(f"* setting account logged in to {is_logged_in}")
+    update_stmt = (
+        sqlalchemy.update(Account)
+        .where(Account.id == id)
+        .values(is_logged_in=is_logged_in, updated_at=sqlalchemy_functions.now())
+        .returning(Account)
+    )
+    try:
+        query = await db_session.execute(statement=update_stmt)
+        account = query.scalar_one_or_none()
+        await db_session.commit()
+        await get_account_cache().delete(id)
+        return account
 
-    update_stmt = sqlalchemy.update(Account).where(Account.id == id).values(updated_at=sqlalchemy_functions.now())
+    except sqlalchemy_error.DatabaseError as e:
+        await db_session.rollback()
+        raise fastapi.HTTPException(status_code=500, detail=str(e))
 
-    for key, value in update_data.items():
-        update_stmt = update_stmt.values(**{key: value})
 
+async def set_password(id: int, hashed_password: str, db_session: SQLAlchemyAsyncSession) -> None:
+    """
+    Replace the password hash of an account, e.g. rehashed with the current Argon2 parameters. The account as
+    returned by the API does not change, so neither does its `updated_at`.
+    """
+    loguru.logger.info("* rehashing account password")
+    update_stmt = sqlalchemy.update(Account).where(Account.id == id).values(password=hashed_password)
     try:
         await db_session.execute(statement=update_stmt)
         await db_session.commit()
-        await db_session.close()
-
-        return await get_by_id(id=id, db_session=db_session)
+        await get_account_cache().delete(id)
 
     except sqlalchemy_error.DatabaseError as e:
         await db_session.rollback()
-        await db_session.close()
         raise fastapi.HTTPException(status_code=500, detail=str(e))
 
 
 async def delete_by_id(id: int, db_session: SQLAlchemyAsyncSession) -> bool:
+    """
+    Delete an account with a single `DELETE ... RETURNING` statement, no row coming back means
+    that there is no account with the given id.
+    """
     loguru.logger.info("* deleting account by id")
-    accout_to_delete = await get_by_id(id=id, db_session=db_session)
-    if not accout_to_delete:
-        raise fastapi.HTTPException(status_code=404, detail=f"Account with id {id} not found")
-    delete_stmt = sqlalchemy.delete(Account).where(Account.id == id)
+    delete_stmt = sqlalchemy.delete(Account).where(Account.id == id).returning(Account.id)
     try:
-        await db_session.execute(statement=delete_stmt)
+        query = await db_session.execute(statement=delete_stmt)
+        deleted_id = query.scalar_one_or_none()
+        if deleted_id is None:
+            await db_session.rollback()
+            raise fastapi.HTTPException(status_code=404, detail=f"Account with id {id} not found")
         await db_session.commit()
-        await db_session.close()
+        await get_account_cache().delete(id)
         return True
+
+    except sqlalchemy_error.DatabaseError as e:
+        await db_session.rollback()
+        raise fastapi.HTTPException(status_code=500, detail=str(e))
+
+
+async def delete_many_by_ids(ids: list[int], db_session: SQLAlchemyAsyncSession) -> list[int]:
+    """
+    Delete many accounts with a single `DELETE ... RETURNING` statement and return the ids that
+    were actually deleted.
+    """
+    loguru.logger.info(f"* deleting {len(ids)} accounts by id")
+    delete_stmt = (
+        sqlalchemy.delete(Account)
+        .where(Account.id == _any_id(ids))
+        .returning(Account.id)
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        query = await db_session.execute(statement=delete_stmt)
+        deleted_ids = list(query.scalars().all())
+        await db_session.commit()
+        if deleted_ids:
+            await get_account_cache().delete(*deleted_ids)
+        return deleted_ids
+
     except sqlalchemy_error.DatabaseError as e:
         await db_session.rollback()
-        await db_session.close()
         raise fastapi.HTTPException(status_code=500, detail=str(e))
 
 
-async def _check_account_details_are_unique(
-    account: AccountInAuthentication, db_session: SQLAlchemyAsyncSession
-) -> None:
-    loguru.logger.info("* checking if account details are unique")
-    email_unique = await _is_email_unique(account.email, db_session)
-    username_unique = await _is_username_unique(account.username, db_session)
-    if not email_unique:
-        raise fastapi.HTTPException(status_code=409, detail=f"Email {account.email} already in use")
-    if not username_unique:
-        raise fastapi.HTTPException(status_code=409, detail=f"Username {account.username} already in use")
+async def _load_accounts_by_ids(ids: list[int]) -> dict[int, Account]:
+    # The loaded accounts fill the account cache, so they are read from the primary. A replica lagging behind a
+    # write would put the row from before the write back into the cache until it expires
+    async with db.async_session() as db_session:
+        return {account.id: account for account in await get_many_by_ids(ids, db_session)}
+
+
+def _account_to_cache(account: Account) -> dict[str, typing.Any]:
+    cached_account = {column: getattr(account, column) for column in _ACCOUNT_COLUMNS}
+    for column in _ACCOUNT_DATETIME_COLUMNS:
+        if cached_account[column] is not None:
+            cached_account[column] = cached_account[column].isoformat()
+    return cached_account
+
+
+def _account_from_cache(cached_account: dict[str, typing.Any]) -> Account:
+    account_data = dict(cached_account)
+    for column in _ACCOUNT_DATETIME_COLUMNS:
+        if account_data[column] is not None:
+            account_data[column] = datetime.datetime.fromisoformat(account_data[column])
+    return Account(**account_data)
+
+
+def _account_change_from_notification(payload: str) -> ChangeEvent:
+    change = orjson.loads(payload)
+    if change["type"] == "delete":
+        data = change["account"]
+    else:
+        # The trigger leaves out the password hash
+        account = AccountOut.model_validate(_account_from_cache(change["account"]))
+        data = account.model_dump(mode="json", by_alias=True)
+    return ChangeEvent.create(id=change["id"], type=change["type"], data=data)
+
+
+def _any_id(ids: list[int]) -> sqlalchemy.ColumnElement:
+    # `= ANY(:ids)` binds the whole list as one array parameter, unlike `IN` which renders one
+    # parameter per id and therefore a different statement for every list length
+    return sqlalchemy.any_(sqlalchemy.bindparam("ids", value=ids, type_=postgresql.ARRAY(sqlalchemy.Integer)))
+
+
+def _starts_with(column: InstrumentedAttribute[str], prefix: str) -> sqlalchemy.ColumnElement:
+    # `LIKE 'prefix%'` only uses the index when the pattern is known at planning time, which a bound parameter of
+    # a generic prepared plan is not. The same range in the `~>=~`/`~<~` operators of the `varchar_pattern_ops`
+    # index, which compare code points, is usable in every plan
+    last_code_point = ord(prefix[-1])
+    if last_code_point in (0xD7FF, 0x10FFFF):
+        # The next code point is not encodable, fall back to a range without upper bound and recheck the prefix
+        return sqlalchemy.and_(
+            column.op("~>=~", is_comparison=True)(prefix), column.startswith(prefix, autoescape=True)
+        )
+    return sqlalchemy.and_(
+        column.op("~>=~", is_comparison=True)(prefix),
+        column.op("~<~", is_comparison=True)(prefix[:-1] + chr(last_code_point + 1)),
+    )
+
+
+async def _get_taken_usernames_and_emails(
+    usernames: list[str], emails: list[str], db_session: SQLAlchemyAsyncSession
+) -> tuple[set[str], set[str]]:
+    query = await db_session.execute(
+        statement=_SELECT_TAKEN_USERNAMES_AND_EMAILS, params={"usernames": usernames, "emails": emails}
+    )
+    rows = query.all()
+    return {row.username for row in rows}, {row.email for row in rows}
+
+
+def _raise_for_unique_violation(error: sqlalchemy_error.IntegrityError, account_data: dict) -> typing.NoReturn:
+    if getattr(error.orig, "sqlstate", None) != _UNIQUE_VIOLATION_SQLSTATE:
+        loguru.logger.error(f"Integrity error: {error}")
+        raise fastapi.HTTPException(status_code=500, detail=str(error))
 
+    column = _get_clashing_column(error=error)
+    loguru.logger.info(f"* unique violation on account column {column}")
+    if column == "email":
+        raise fastapi.HTTPException(status_code=409, detail=f"Email {account_data.get('email')} already in use")
+    if column == "username":
+        raise fastapi.HTTPException(status_code=409, detail=f"Username {account_data.get('username')} already in use")
+    raise fastapi.HTTPException(status_code=409, detail="Account details already in use")
 
-async def _is_email_unique(email: str, db_session: SQLAlchemyAsyncSession) -> bool:
-    loguru.logger.info("* checking if email is unique")
-    select_stmt = sqlalchemy.select(Account).where(Account.email == email)
-    query = await db_session.execute(statement=select_stmt)
-    return query.scalars().first() is None
 
+def _get_clashing_column(error: sqlalchemy_error.IntegrityError) -> str | None:
+    # asyncpg reports the violated key as `Key (email)=(...) already exists.` and attaches the
+    # constraint name (`account_email_key`) to the original exception
+    driver_error = error.orig.__cause__ if error.orig is not None else None
+    detail = getattr(driver_error, "detail", None) or str(error.orig)
+    match = re.search(r"Key \((\w+)\)", detail)
+    if match:
+        return match.group(1)
 
-async def _is_username_unique(username: str, db_session: SQLAlchemyAsyncSession) -> bool:
-    loguru.logger.info("* checking if username is unique")
-    select_stmt = sqlalchemy.select(Account).where(Account.username == username)
-    query = await db_session.execute(statement=select_stmt)
-    return query.scalars().first() is None
+    constraint_name = getattr(driver_error, "constraint_name", None) or ""
+    for column in ("email", "username"):
+        if column in constraint_name:
+            return column
+    return None
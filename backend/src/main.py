@@ -1,20 +1,40 @@
+import functools
+import typing
+
 import fastapi
 import loguru
-import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.api.endpoints import router
+from src.api.routes.metrics_router import router as metrics_router
 from src.config.settings.setup import settings
 from src.utility.events.event_handlers import (
     execute_backend_server_event_handler,
     terminate_backend_server_event_handler,
 )
+from src.utility.middleware.admission_control import AdmissionControlMiddleware, parse_route_limits
+from src.utility.middleware.compression import EventStreamAwareGZipMiddleware
+from src.utility.middleware.metrics import MetricsMiddleware
+from src.utility.middleware.profiler import ProfilerMiddleware
+from src.utility.middleware.query_stats import QueryStatsMiddleware
+from src.utility.middleware.request_context import RequestContextMiddleware
 
 
 def initialize_application() -> fastapi.FastAPI:
     app = fastapi.FastAPI(**settings.set_backend_app_attributes)
     loguru.logger.debug(f"App Settings description: {settings.DESCRIPTION}")
 
+    # Innermost, so that the CORS preflights are answered before and the rejections carry the CORS headers
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        read_limit=settings.ADMISSION_READ_LIMIT,
+        write_limit=settings.ADMISSION_WRITE_LIMIT,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        max_pool_waiters=settings.ADMISSION_MAX_POOL_WAITERS,
+        route_limits=parse_route_limits(settings.ADMISSION_ROUTE_LIMITS),
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.ALLOWED_ORIGINS,
@@ -22,6 +42,29 @@ def initialize_application() -> fastapi.FastAPI:
         allow_methods=settings.ALLOWED_METHODS,
         allow_headers=settings.ALLOWED_HEADERS,
     )
+    # Compresses responses of at least `GZIP_MINIMUM_SIZE` bytes for clients sending `Accept-Encoding: gzip`, except
+    # for the streams of Server-Sent Events
+    app.add_middleware(
+        EventStreamAwareGZipMiddleware,
+        minimum_size=settings.GZIP_MINIMUM_SIZE,
+        compresslevel=settings.GZIP_COMPRESS_LEVEL,
+    )
+    # Within the request context, so that the warnings about repeated statements carry the request id
+    app.add_middleware(
+        QueryStatsMiddleware,
+        expose_headers=settings.DEBUG,
+        repeated_query_threshold=settings.DB_REPEATED_QUERY_THRESHOLD,
+    )
+    if settings.PROFILER_SAMPLE_RATE > 0 or settings.PROFILER_TRIGGER_TOKEN:
+        app.add_middleware(
+            ProfilerMiddleware,
+            output_directory=settings.PROFILER_OUTPUT_DIRECTORY,
+            sample_rate=settings.PROFILER_SAMPLE_RATE,
+            trigger_token=settings.PROFILER_TRIGGER_TOKEN,
+            interval=settings.PROFILER_INTERVAL_SECONDS,
+        )
+    app.add_middleware(RequestContextMiddleware)
+    app.add_middleware(MetricsMiddleware)
 
     app.add_event_handler(
         "startup",
@@ -34,11 +77,25 @@ def initialize_application() -> fastapi.FastAPI:
     )
 
     app.router.include_router(router)
+    app.router.include_router(metrics_router)
 
     return app
 
 
-app: fastapi.FastAPI = initialize_application()
+@functools.lru_cache
+def get_application() -> fastapi.FastAPI:
+    return initialize_application()
+
+
+def __getattr__(name: str) -> typing.Any:
+    # Importing this module builds nothing, `src.main:app` is built on first access, e.g. by `uvicorn src.main:app`
+    if name == "app":
+        return get_application()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="localhost", port=8000)
+    # Single process for local runs, production servers are started with `python -m src.server`
+    import uvicorn
+
+    uvicorn.run(get_application(), host=settings.SERVER_HOST, port=settings.SERVER_PORT)
@@ -22,7 +22,7 @@ class Account(DBBaseTable):
     email: SQLAlchemyMapped[pydantic.EmailStr] = sqlalchemy_mapped_column(
         sqlalchemy.String(length=64), nullable=False, unique=True
     )
-    password: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False)
+    password: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=128), nullable=False)
     is_admin: SQLAlchemyMapped[bool] = sqlalchemy_mapped_column(sqlalchemy.Boolean, default=False)
     is_logged_in: SQLAlchemyMapped[bool] = sqlalchemy_mapped_column(sqlalchemy.Boolean, default=True)
     is_verified: SQLAlchemyMapped[bool] = sqlalchemy_mapped_column(sqlalchemy.Boolean, default=False)
@@ -38,3 +38,11 @@ class Account(DBBaseTable):
     )
 
     __mapper_args__ = {"eager_defaults": True}
+
+
+# Indexes of the account search, see `account_crud.search` and the migration `0002_add_account_search_indexes`
+sqlalchemy.Index("ix_account_lower_email", sqlalchemy.func.lower(Account.email))
+sqlalchemy.Index("ix_account_username_pattern", Account.username, postgresql_ops={"username": "varchar_pattern_ops"})
+sqlalchemy.Index("ix_account_is_admin", Account.id, postgresql_where=Account.is_admin)
+sqlalchemy.Index("ix_account_is_not_verified", Account.id, postgresql_where=sqlalchemy.not_(Account.is_verified))
+sqlalchemy.Index("ix_account_is_logged_in", Account.id, postgresql_where=Account.is_logged_in)
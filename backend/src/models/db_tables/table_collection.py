@@ -1,6 +1,6 @@
 """
-This file is necessary for the initialization of the database tables.
-All database tables should be imported here, else they will not be initialized.
+This file collects the metadata of all database tables for the migrations in `src/repository/migrations`.
+All database tables should be imported here, else `alembic revision --autogenerate` will not see them.
 """
 
 from src.models.db_tables.account_table import Account
@@ -1,11 +1,18 @@
 import datetime
+import typing
 
-import loguru
 import pydantic
 from password_strength import PasswordPolicy
 
 from src.utility.pydantic_schema.base_schema import BaseModel
 
+PASSWORD_POLICY = PasswordPolicy.from_names(
+    length=8,
+    uppercase=1,
+    numbers=1,
+    special=1,
+)
+
 
 class AccountBase(BaseModel):
     username: str
@@ -17,14 +24,7 @@ class AccountInAuthentication(AccountBase):
 
     @pydantic.validator("password")
     def password_strength(cls, v):
-        loguru.logger.info("Evaluating password strength")
-        policy = PasswordPolicy.from_names(
-            length=8,
-            uppercase=1,
-            numbers=1,
-            special=1,
-        )
-        if policy.test(v) != []:
+        if PASSWORD_POLICY.test(v) != []:
             raise ValueError("Password is not strong enough")
         return v
 
@@ -38,7 +38,6 @@ class AccountOut(AccountBase):
     id: int | None
     username: str
     email: pydantic.EmailStr
-    password: str | None
     is_admin: bool | None
     is_logged_in: bool | None
     is_verified: bool | None
@@ -46,5 +45,26 @@ class AccountOut(AccountBase):
     updated_at: datetime.datetime | None
 
 
+class AccountOutCount(BaseModel):
+    count: int
+    mode: typing.Literal["exact", "approximate"]
+
+
 class AccountOutDelete(BaseModel):
     is_deleted: bool
+
+
+class AccountOutBulkCreate(BaseModel):
+    index: int
+    is_created: bool
+    account: AccountOut | None = None
+    detail: str | None = None
+
+
+class AccountInBulkDelete(BaseModel):
+    ids: list[int]
+
+
+class AccountOutBulkDelete(BaseModel):
+    id: int
+    is_deleted: bool
@@ -0,0 +1,23 @@
+from src.utility.pydantic_schema.base_schema import BaseModel
+
+
+class AccountInLogin(BaseModel):
+    username: str
+    password: str
+
+
+class TokenInRefresh(BaseModel):
+    refresh_token: str
+
+
+class TokenOut(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
+class AccountOutAuthenticated(BaseModel):
+    id: int
+    username: str
+    is_admin: bool
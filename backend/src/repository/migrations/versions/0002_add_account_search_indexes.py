@@ -0,0 +1,51 @@
+"""add account search indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The flag indexes cover the rare side of each flag and hold the ids, so a filtered keyset page reads the index in id
+# order. The other side of a flag is a large share of the table and is scanned through the primary key
+FLAG_INDEXES = {
+    "ix_account_is_admin": "is_admin",
+    "ix_account_is_not_verified": "NOT is_verified",
+    "ix_account_is_logged_in": "is_logged_in",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently outside of the migration transaction, so that the account table stays writable
+    with op.get_context().autocommit_block():
+        op.create_index("ix_account_lower_email", "account", [sa.text("lower(email)")], postgresql_concurrently=True)
+        op.create_index(
+            "ix_account_username_pattern",
+            "account",
+            ["username"],
+            postgresql_ops={"username": "varchar_pattern_ops"},
+            postgresql_concurrently=True,
+        )
+        for index_name, predicate in FLAG_INDEXES.items():
+            op.create_index(
+                index_name, "account", ["id"], postgresql_where=sa.text(predicate), postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for index_name in [*FLAG_INDEXES, "ix_account_username_pattern", "ix_account_lower_email"]:
+            op.drop_index(index_name, table_name="account", postgresql_concurrently=True)
@@ -0,0 +1,59 @@
+"""add account change notifications
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every committed insert, update and delete of an account is sent on this channel, see `account_crud.ACCOUNT_CHANGES_CHANNEL`
+CHANNEL = "account_changes"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The notifications are sent on commit, in commit order, and not at all on rollback. The sequence numbers the
+    # events across all workers, the password hash is never sent. A payload stays far below the 8000 bytes limit of
+    # NOTIFY, since the columns are bounded
+    op.execute("CREATE SEQUENCE account_change_id_seq")
+    op.execute(f"""
+        CREATE FUNCTION notify_account_change() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('{CHANNEL}', json_build_object(
+                    'id', nextval('account_change_id_seq'),
+                    'type', 'delete',
+                    'account', json_build_object('id', OLD.id)
+                )::text);
+                RETURN OLD;
+            END IF;
+            PERFORM pg_notify('{CHANNEL}', json_build_object(
+                'id', nextval('account_change_id_seq'),
+                'type', CASE TG_OP WHEN 'INSERT' THEN 'create' ELSE 'update' END,
+                'account', to_jsonb(NEW) - 'password'
+            )::text);
+            RETURN NEW;
+        END
+        $$
+        """)
+    op.execute(
+        "CREATE TRIGGER account_change_notify AFTER INSERT OR UPDATE OR DELETE ON account "
+        "FOR EACH ROW EXECUTE FUNCTION notify_account_change()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER account_change_notify ON account")
+    op.execute("DROP FUNCTION notify_account_change()")
+    op.execute("DROP SEQUENCE account_change_id_seq")
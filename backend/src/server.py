@@ -0,0 +1,85 @@
+"""
+Production entrypoint, run with `python -m src.server`.
+
+Starts `SERVER_WORKERS` uvicorn worker processes on `SERVER_HOST:SERVER_PORT`. Every worker imports `src.main:app`
+and opens its own connection pools, so the pool settings are split across the workers before they are started.
+"""
+
+import importlib.util
+import os
+
+import loguru
+import uvicorn
+
+from src.config.settings.setup import get_settings
+from src.utility.database.pool_budget import split_pool_budget
+
+
+def get_event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def get_http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def budget_worker_pools() -> None:
+    """
+    Export the per worker pool size and overflow, the workers inherit the environment and read them as their
+    `DB_POOL_SIZE` and `DB_MAX_OVERFLOW`.
+    """
+    settings = get_settings()
+    budget = split_pool_budget(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        workers=settings.SERVER_WORKERS,
+        # Each worker holds a `LISTEN` connection of the change feeds outside of its pools
+        max_connections=settings.DB_MAX_CONNECTIONS - settings.SERVER_WORKERS,
+    )
+    loguru.logger.info(
+        f"Server: \t {settings.SERVER_WORKERS} workers with a pool of {budget.pool_size} + {budget.max_overflow} "
+        f"overflow connections each, at most {settings.SERVER_WORKERS * budget.max_connections} of "
+        f"{settings.DB_MAX_CONNECTIONS} per database"
+    )
+    os.environ["DB_POOL_SIZE"] = str(budget.pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(budget.max_overflow)
+    # A single worker runs in this process, where the settings were already read with the totals
+    get_settings.cache_clear()
+
+
+def check_worker_cache() -> None:
+    """
+    Refuse to start several workers without the shared cache. A write only invalidates the account cache of the worker
+    handling it, and a revoked token is only denied by that worker, the other workers would serve the stale or deleted
+    account until its entry expires and keep accepting the token.
+    """
+    settings = get_settings()
+    if settings.SERVER_WORKERS > 1 and settings.CACHE_BACKEND != "shared":
+        raise RuntimeError(
+            f"{settings.SERVER_WORKERS} workers can not share CACHE_BACKEND={settings.CACHE_BACKEND}, "
+            "use CACHE_BACKEND=shared or a single worker"
+        )
+
+
+def run() -> None:
+    check_worker_cache()
+    budget_worker_pools()
+    settings = get_settings()
+    loop, http = get_event_loop(), get_http_protocol()
+    loguru.logger.info(f"Server: \t Serving on {settings.SERVER_HOST}:{settings.SERVER_PORT} with {loop} and {http}")
+    uvicorn.run(
+        "src.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.SERVER_WORKERS,
+        loop=loop,
+        http=http,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        # Server-Sent Events streams stay open until the client leaves, they are cut after this timeout
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,285 @@
+"""
+Pluggable caches for read-through lookups.
+
+All backends store JSON-serializable values only, so that the in-process and the shared backend
+can be swapped through `Settings.CACHE_BACKEND` without touching the callers.
+"""
+
+import asyncio
+import collections
+import json
+import math
+import time
+import typing
+
+import loguru
+
+from src.config.settings.setup import settings
+
+
+class CacheUnavailableError(Exception):
+    """
+    The cache can not give an answer. Raised to the callers that must fail closed instead of taking it as a miss.
+    """
+
+
+class CacheFullError(CacheUnavailableError):
+    pass
+
+
+class CacheBackend:
+    """
+    Base class of all cache backends, it never holds a value and is used when caching is disabled.
+
+    Every `delete` bumps the invalidation `epoch` of this node. A caller filling the cache after a
+    database read passes the epoch it saw before the read, the value is dropped if a write invalidated
+    entries in the meantime, so a slow read can not put stale data back into the cache. The epoch only
+    sees the deletes of this process, see `SharedCacheBackend` for the deletes of other workers.
+    """
+
+    def __init__(self) -> None:
+        self.hits: int = 0
+        self.misses: int = 0
+        self._epoch: int = 0
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    async def get(self, key: typing.Hashable) -> typing.Any | None:
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: typing.Hashable, value: typing.Any, epoch: int | None = None) -> None:
+        if epoch is not None and epoch != self._epoch:
+            return
+        await self._set(key, value)
+
+    async def add(self, key: typing.Hashable, value: typing.Any, ttl_seconds: float) -> bool:
+        """
+        Store `value` under `key` for `ttl_seconds` unless the key already holds one, as one atomic check-and-set.
+        Returns whether the value was stored.
+        """
+        return await self._add(key, value, ttl_seconds)
+
+    async def delete(self, *keys: typing.Hashable) -> None:
+        self._epoch += 1
+        await self._delete(keys)
+
+    async def _get(self, key: typing.Hashable) -> typing.Any | None:
+        return None
+
+    async def _set(self, key: typing.Hashable, value: typing.Any) -> None:
+        return None
+
+    async def _add(self, key: typing.Hashable, value: typing.Any, ttl_seconds: float) -> bool:
+        return True
+
+    async def _delete(self, keys: tuple[typing.Hashable, ...]) -> None:
+        return None
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU cache with a time to live per entry. When it is full, expired entries are dropped before the least
+    recently used one is evicted. Without `evict`, entries only ever leave the cache when they expire, and storing a
+    new key in a full cache raises `CacheFullError`.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: typing.Callable[[], float] = time.monotonic,
+        evict: bool = True,
+    ) -> None:
+        super().__init__()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.evict = evict
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self._clock = clock
+        self._entries: collections.OrderedDict[typing.Hashable, tuple[float, typing.Any]] = collections.OrderedDict()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return super().stats | {
+            "size": len(self._entries),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    async def _get(self, key: typing.Hashable) -> typing.Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def _set(self, key: typing.Hashable, value: typing.Any) -> None:
+        self._store(key, value, self._clock() + self.ttl_seconds)
+
+    async def _add(self, key: typing.Hashable, value: typing.Any, ttl_seconds: float) -> bool:
+        # No await between the check and the store, so the check-and-set is atomic within the event loop
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return False
+        self._store(key, value, now + ttl_seconds)
+        return True
+
+    def _store(self, key: typing.Hashable, value: typing.Any, expires_at: float) -> None:
+        if key not in self._entries and len(self._entries) >= self.max_size:
+            now = self._clock()
+            for expired_key in [
+                entry_key for entry_key, (entry_expires_at, _) in self._entries.items() if entry_expires_at <= now
+            ]:
+                del self._entries[expired_key]
+                self.expirations += 1
+            if len(self._entries) >= self.max_size and not self.evict:
+                raise CacheFullError(f"Cache is full with {len(self._entries)} entries that have not expired")
+            while len(self._entries) >= self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+    async def _delete(self, keys: tuple[typing.Hashable, ...]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+class SharedCacheClient(typing.Protocol):
+    """
+    The subset of the `redis.asyncio.Redis` interface the shared backend relies on.
+    """
+
+    async def get(self, name: str) -> bytes | str | None: ...
+
+    async def set(self, name: str, value: str, ex: int | None = None, nx: bool = False) -> typing.Any: ...
+
+    async def delete(self, *names: str) -> typing.Any: ...
+
+
+# Not valid JSON, so no cached value can be mistaken for it
+_TOMBSTONE = "!invalidated"
+
+
+class SharedCacheBackend(CacheBackend):
+    """
+    Cache shared between workers and nodes, e.g. Redis.
+
+    A delete leaves a tombstone for `invalidation_lease_seconds` instead of removing the key, and a
+    fill only stores a key that holds nothing (`SET NX`). A fill of another worker that read the row
+    before the write is refused while the tombstone lives, so the staleness after a write is bounded
+    by the lease: only a database read taking longer than the lease can put the old row back, until
+    its `ttl_seconds` expire.
+
+    Errors of the shared cache are logged and treated as a miss, an unavailable cache must never
+    fail a read that the database can still answer. With `fail_closed`, for a cache whose miss grants
+    something, errors of `get` raise `CacheUnavailableError` instead. Errors of `add` are always raised,
+    a check-and-set whose outcome is unknown must be taken as neither stored nor refused.
+    """
+
+    def __init__(
+        self,
+        client: SharedCacheClient,
+        namespace: str,
+        ttl_seconds: int,
+        invalidation_lease_seconds: int = 5,
+        fail_closed: bool = False,
+    ) -> None:
+        super().__init__()
+        self.client = client
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.invalidation_lease_seconds = invalidation_lease_seconds
+        self.fail_closed = fail_closed
+        self.errors: int = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return super().stats | {"errors": self.errors}
+
+    def _key(self, key: typing.Hashable) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def _get(self, key: typing.Hashable) -> typing.Any | None:
+        try:
+            value = await self.client.get(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            loguru.logger.warning(f"Shared cache get failed: {e}")
+            if self.fail_closed:
+                raise CacheUnavailableError(f"Shared cache get failed: {e}") from e
+            return None
+        if value is None or value in (_TOMBSTONE, _TOMBSTONE.encode()):
+            return None
+        return json.loads(value)
+
+    async def _set(self, key: typing.Hashable, value: typing.Any) -> None:
+        try:
+            await self.client.set(self._key(key), json.dumps(value), ex=self.ttl_seconds, nx=True)
+        except Exception as e:
+            self.errors += 1
+            loguru.logger.warning(f"Shared cache set failed: {e}")
+
+    async def _add(self, key: typing.Hashable, value: typing.Any, ttl_seconds: float) -> bool:
+        try:
+            return bool(
+                await self.client.set(self._key(key), json.dumps(value), ex=max(1, math.ceil(ttl_seconds)), nx=True)
+            )
+        except Exception as e:
+            self.errors += 1
+            loguru.logger.warning(f"Shared cache add failed: {e}")
+            raise CacheUnavailableError(f"Shared cache add failed: {e}") from e
+
+    async def _delete(self, keys: tuple[typing.Hashable, ...]) -> None:
+        try:
+            await asyncio.gather(
+                *(self.client.set(self._key(key), _TOMBSTONE, ex=self.invalidation_lease_seconds) for key in keys)
+            )
+        except Exception as e:
+            self.errors += 1
+            loguru.logger.warning(f"Shared cache delete failed: {e}")
+
+
+def get_cache_backend(namespace: str, fail_closed: bool = False) -> CacheBackend:
+    if settings.CACHE_BACKEND == "memory":
+        return InMemoryCacheBackend(max_size=settings.CACHE_MAX_SIZE, ttl_seconds=settings.CACHE_TTL_SECONDS)
+
+    if settings.CACHE_BACKEND == "shared":
+        try:
+            import redis.asyncio as redis_asyncio  # type: ignore
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=shared requires the `redis` package to be installed") from e
+        client = redis_asyncio.from_url(settings.CACHE_SHARED_URL)
+        return SharedCacheBackend(
+            client=client,
+            namespace=namespace,
+            ttl_seconds=settings.CACHE_TTL_SECONDS,
+            invalidation_lease_seconds=settings.CACHE_INVALIDATION_LEASE_SECONDS,
+            fail_closed=fail_closed,
+        )
+
+    if settings.CACHE_BACKEND == "none":
+        return CacheBackend()
+
+    raise ValueError(f"Invalid cache backend: {settings.CACHE_BACKEND}")
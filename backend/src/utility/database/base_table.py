@@ -5,6 +5,15 @@ This file contains the base table class from which all other database tables sho
 import sqlalchemy
 from sqlalchemy.orm import DeclarativeBase
 
+# Matches the names Postgres gives constraints by default, so that migrations reference stable names
+NAMING_CONVENTION = {
+    "ix": "ix_%(table_name)s_%(column_0_N_name)s",
+    "uq": "%(table_name)s_%(column_0_name)s_key",
+    "ck": "%(table_name)s_%(constraint_name)s_check",
+    "fk": "%(table_name)s_%(column_0_name)s_fkey",
+    "pk": "%(table_name)s_pkey",
+}
+
 
 class DBBaseTable(DeclarativeBase):
-    metadata: sqlalchemy.MetaData = sqlalchemy.MetaData()
+    metadata: sqlalchemy.MetaData = sqlalchemy.MetaData(naming_convention=NAMING_CONVENTION)
@@ -0,0 +1,95 @@
+"""
+Dataloader-style batching of concurrent point lookups into one query.
+"""
+
+import asyncio
+import typing
+
+from src.utility.metrics.metrics_registry import BATCH_LOADER_BATCH_SIZE, BATCH_LOADER_REQUESTS
+
+Key = typing.TypeVar("Key", bound=typing.Hashable)
+Value = typing.TypeVar("Value")
+
+
+class BatchLoader(typing.Generic[Key, Value]):
+    """
+    Collects the keys passed to `load` within `window_seconds` of the first one, or until `max_batch_size` keys are
+    collected, and looks them all up with a single call of `load_many`, which returns the found values by key.
+
+    Concurrent lookups of a key that is already pending or being loaded share that lookup. A window of 0 still
+    batches the lookups made within the same iteration of the event loop.
+
+    `epoch` returns the invalidation epoch of the cache the loaded values are put into, see `CacheBackend`. A lookup
+    does not share a batch dispatched in an earlier epoch, which may have read the value from before a write.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_many: typing.Callable[[list[Key]], typing.Awaitable[typing.Mapping[Key, Value]]],
+        max_batch_size: int,
+        window_seconds: float,
+        epoch: typing.Callable[[], int] = lambda: 0,
+    ):
+        self.name = name
+        self.load_many = load_many
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self.epoch = epoch
+        self._pending: dict[Key, asyncio.Future[Value | None]] = {}
+        # The future of every key being loaded with the epoch its batch was dispatched in
+        self._loading: dict[Key, tuple[asyncio.Future[Value | None], int]] = {}
+        self._dispatch_handle: asyncio.Handle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: Key) -> Value | None:
+        future = self._pending.get(key)
+        if future is None and key in self._loading:
+            loading_future, dispatch_epoch = self._loading[key]
+            if dispatch_epoch == self.epoch():
+                future = loading_future
+        BATCH_LOADER_REQUESTS.inc(labels=(self.name, "true" if future else "false"))
+        if future is None:
+            future = self._pending[key] = asyncio.get_running_loop().create_future()
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._dispatch_handle is None:
+                self._dispatch_handle = asyncio.get_running_loop().call_later(self.window_seconds, self._dispatch)
+        # Shielded, a cancelled caller must not cancel the lookup shared with the other callers
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._dispatch_handle is not None:
+            self._dispatch_handle.cancel()
+            self._dispatch_handle = None
+        batch, self._pending = self._pending, {}
+        dispatch_epoch = self.epoch()
+        self._loading.update((key, (future, dispatch_epoch)) for key, future in batch.items())
+        task = asyncio.get_running_loop().create_task(self._load_batch(batch))
+        # Keep a reference, the event loop only holds weak references to its tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, batch: dict[Key, asyncio.Future[Value | None]]) -> None:
+        BATCH_LOADER_BATCH_SIZE.observe(len(batch), labels=(self.name,))
+        try:
+            values = await self.load_many(list(batch))
+        except Exception as exception:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exception)
+                    # Marks the exception as retrieved, the future of a cancelled caller is never awaited
+                    future.exception()
+        except BaseException:
+            for future in batch.values():
+                future.cancel()
+            raise
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            for key, future in batch.items():
+                # A later batch may load the key again
+                if self._loading.get(key, (None, None))[0] is future:
+                    del self._loading[key]
@@ -0,0 +1,219 @@
+"""
+Fan-out of Postgres notifications to the Server-Sent Events streams of a worker.
+
+Each worker holds one `LISTEN` connection per feed and keeps the latest events in a bounded buffer, so a client
+reconnecting with the id of the last event it received is sent the events it missed. Every subscriber has a bounded
+queue. A subscriber falling behind by more than its queue is sent what is queued and then disconnected, instead of
+buffering without limit or slowing down the other subscribers. It resumes from the buffer when it reconnects.
+"""
+
+import asyncio
+import collections
+import contextlib
+import typing
+
+import loguru
+import orjson
+
+from src.utility.metrics.metrics_registry import (
+    CHANGE_FEED_EVENTS,
+    CHANGE_FEED_SUBSCRIBERS,
+    CHANGE_FEED_SUBSCRIBERS_DROPPED,
+)
+
+RESET_EVENT = "reset"
+
+
+class ChangeFeedFullError(Exception):
+    pass
+
+
+class ChangeEvent(typing.NamedTuple):
+    id: int | None
+    type: str
+    # The event encoded once as a Server-Sent Events frame and sent as is to every subscriber
+    frame: bytes
+
+    @classmethod
+    def create(cls, id: int | None, type: str, data: typing.Any) -> "ChangeEvent":
+        event_id = b"" if id is None else b"id: %d\n" % id
+        return cls(
+            id=id, type=type, frame=b"%sevent: %s\ndata: %s\n\n" % (event_id, type.encode(), orjson.dumps(data))
+        )
+
+
+# Tells the subscriber that events were lost and its state has to be fetched again, e.g. after the `LISTEN`
+# connection was lost or when the event to resume after is no longer buffered
+RESET = ChangeEvent.create(id=None, type=RESET_EVENT, data={})
+
+
+class Listener(typing.Protocol):
+    """
+    The part of `asyncpg.Connection` used by the feed.
+    """
+
+    async def add_listener(self, channel: str, callback: typing.Callable[..., None]) -> None: ...
+
+    def add_termination_listener(self, callback: typing.Callable[..., None]) -> None: ...
+
+    async def execute(self, query: str) -> typing.Any: ...
+
+    async def close(self, *, timeout: float | None = None) -> None: ...
+
+
+class Subscription:
+    def __init__(self, queue_size: int):
+        self.closed = False
+        self._queue: asyncio.Queue[ChangeEvent | None] = asyncio.Queue(maxsize=queue_size)
+
+    async def get(self) -> ChangeEvent | None:
+        """
+        The next event, `None` once the subscription is closed and its queued events are consumed.
+        """
+        if self.closed and self._queue.empty():
+            return None
+        return await self._queue.get()
+
+    def put(self, event: ChangeEvent) -> bool:
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            # Wakes up a consumer waiting for the next event, a full queue has no waiting consumer
+            with contextlib.suppress(asyncio.QueueFull):
+                self._queue.put_nowait(None)
+
+
+class ChangeFeed:
+    """
+    Listens on the Postgres notification `channel` once the first subscriber arrives, through a connection opened
+    with `connect`, and reconnects after `reconnect_delay` seconds when the connection is lost. `parse` turns the
+    payload of a notification into its event.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        channel: str,
+        connect: typing.Callable[[], typing.Awaitable[Listener]],
+        parse: typing.Callable[[str], ChangeEvent],
+        buffer_size: int,
+        subscriber_queue_size: int,
+        max_subscribers: int,
+        ping_interval: float,
+        reconnect_delay: float = 1.0,
+    ):
+        self.name = name
+        self.channel = channel
+        self.subscriber_queue_size = subscriber_queue_size
+        self.max_subscribers = max_subscribers
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self._connect = connect
+        self._parse = parse
+        self._buffer: collections.deque[ChangeEvent] = collections.deque(maxlen=buffer_size)
+        self._subscribers: set[Subscription] = set()
+        self._listen_task: asyncio.Task | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, last_event_id: int | None = None) -> Subscription:
+        """
+        Subscribe to the events after `last_event_id`, or to the new events without it.
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise ChangeFeedFullError(f"The {self.name} change feed has reached {self.max_subscribers} subscribers")
+        if self._listen_task is None:
+            self._listen_task = asyncio.create_task(self._listen(), name=f"{self.name}-change-feed")
+
+        subscription = Subscription(queue_size=self.subscriber_queue_size)
+        if last_event_id is not None:
+            for event in self._events_after(last_event_id):
+                if not subscription.put(event):
+                    self._drop(subscription)
+                    return subscription
+        self._subscribers.add(subscription)
+        CHANGE_FEED_SUBSCRIBERS.set(len(self._subscribers), labels=(self.name,))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        self._subscribers.discard(subscription)
+        CHANGE_FEED_SUBSCRIBERS.set(len(self._subscribers), labels=(self.name,))
+
+    def publish(self, event: ChangeEvent) -> None:
+        if event.id is not None:
+            self._buffer.append(event)
+        CHANGE_FEED_EVENTS.inc(labels=(self.name, event.type))
+        for subscription in list(self._subscribers):
+            if not subscription.put(event):
+                self._drop(subscription)
+
+    async def close(self) -> None:
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            await asyncio.gather(self._listen_task, return_exceptions=True)
+            self._listen_task = None
+        for subscription in list(self._subscribers):
+            self.unsubscribe(subscription)
+
+    def _events_after(self, last_event_id: int) -> list[ChangeEvent]:
+        # The buffer is in the commit order of the notifications, which the event ids do not follow when
+        # transactions commit out of order, so the events after the position of `last_event_id` are replayed
+        for position in range(len(self._buffer) - 1, -1, -1):
+            if self._buffer[position].id == last_event_id:
+                return list(self._buffer)[position + 1 :]
+        return [RESET]
+
+    def _drop(self, subscription: Subscription) -> None:
+        loguru.logger.warning(f"Dropping a slow subscriber of the {self.name} change feed")
+        CHANGE_FEED_SUBSCRIBERS_DROPPED.inc(labels=(self.name,))
+        self.unsubscribe(subscription)
+
+    def _on_notification(self, connection: Listener, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = self._parse(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            loguru.logger.error(f"Invalid notification on {channel}: {e}")
+            return
+        self.publish(event)
+
+    async def _listen(self) -> None:
+        reconnected = False
+        while True:
+            try:
+                connection = await self._connect()
+            except Exception as e:
+                loguru.logger.warning(f"The {self.name} change feed failed to connect: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            terminated = asyncio.Event()
+            connection.add_termination_listener(lambda _: terminated.set())
+            try:
+                await connection.add_listener(self.channel, self._on_notification)
+                if reconnected:
+                    # Notifications sent while disconnected are lost, the buffer can no longer be resumed from
+                    self._buffer.clear()
+                    self.publish(RESET)
+                loguru.logger.info(f"The {self.name} change feed is listening on {self.channel}")
+                while not terminated.is_set():
+                    try:
+                        await asyncio.wait_for(terminated.wait(), timeout=self.ping_interval)
+                    except asyncio.TimeoutError:
+                        # A connection that died without being closed is only noticed when it is used
+                        await connection.execute("SELECT 1")
+                loguru.logger.warning(f"The {self.name} change feed lost its connection")
+            except Exception as e:
+                loguru.logger.warning(f"The {self.name} change feed lost its connection: {e}")
+            finally:
+                await asyncio.gather(connection.close(timeout=self.reconnect_delay), return_exceptions=True)
+            reconnected = True
+            await asyncio.sleep(self.reconnect_delay)
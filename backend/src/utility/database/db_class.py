@@ -1,5 +1,10 @@
+import asyncio
+import time
+
+import asyncpg
 import loguru
 import pydantic
+import sqlalchemy
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker as sqlalchemy_async_sessionmaker,
     AsyncEngine as SQLAlchemyAsyncEngine,
@@ -8,6 +13,8 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from src.config.settings.setup import settings
+from src.utility.database.instrumented_pool import InstrumentedAsyncAdaptedQueuePool
+from src.utility.database.replica_routing import ReadRoutingSession, ReplicaSet
 
 
 class Database:
@@ -20,6 +27,10 @@ class Database:
             - create async engine
             - initialize async engine
             - initialize async session
+            - route read sessions to read replicas
+            - open listener connections for notifications
+            - warm up the connection pool
+            - drain checked out connections and dispose the engine
     """
 
     def __init__(self):
@@ -28,9 +39,19 @@ class Database:
         self.framework: str = "Asynchronous SQLAlchemy"
         self._async_engine: SQLAlchemyAsyncEngine | None = None
         self._async_session: sqlalchemy_async_sessionmaker[SQLAlchemyAsyncSession] | None = None
-        self.postgres_uri: str = (
-            f"{settings.POSTGRES_SCHEMA}://{settings.POSTGRES_USERNAME}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
-        )
+        self._async_read_session: sqlalchemy_async_sessionmaker[SQLAlchemyAsyncSession] | None = None
+        self._replicas: ReplicaSet | None = None
+
+    # The URIs are read from the settings on first use, constructing `Database` neither reads the settings nor
+    # creates an engine
+
+    @property
+    def postgres_uri(self) -> str:
+        return f"{settings.POSTGRES_SCHEMA}://{settings.POSTGRES_USERNAME}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+
+    @property
+    def replica_uris(self) -> list[str]:
+        return [uri.strip() for uri in settings.POSTGRES_REPLICA_URIS.split(",") if uri.strip()]
 
     @property
     def async_engine(self) -> SQLAlchemyAsyncEngine:
@@ -44,11 +65,40 @@ class Database:
     def initialize_async_engine(self) -> None:
         loguru.logger.debug(f"DB Class: \t Initializing async engine...")
         loguru.logger.info(f"DB Class: \t Postgres URI: {self.postgres_uri}")
-        self._async_engine = create_sqlalchemy_async_engine(
-            url=self.postgres_uri,
+        self._async_engine = self._create_async_engine(url=self.postgres_uri, pool_name="primary")
+
+    def _create_async_engine(self, url: str, pool_name: str) -> SQLAlchemyAsyncEngine:
+        return create_sqlalchemy_async_engine(
+            url=url,
             echo=settings.POSTGRES_ECHO,
             pool_size=settings.DB_POOL_SIZE,
             max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            poolclass=InstrumentedAsyncAdaptedQueuePool,
+            pool_logging_name=pool_name,
+            # Statements compiled to SQL, shared by the connections of the engine
+            query_cache_size=settings.DB_COMPILED_CACHE_SIZE,
+            connect_args={
+                # SQLAlchemy's cache of prepared statements and asyncpg's own one
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            },
+        )
+
+    async def connect_listener(self) -> asyncpg.Connection:
+        """
+        Open a connection to the primary outside of the pool, for `LISTEN` which holds its connection for good.
+        """
+        url = sqlalchemy.make_url(self.postgres_uri)
+        return await asyncpg.connect(
+            user=url.username,
+            password=url.password,
+            host=url.host,
+            port=url.port,
+            database=url.database,
+            timeout=settings.DB_POOL_TIMEOUT,
         )
 
     @property
@@ -63,6 +113,74 @@ class Database:
     def initialize_async_session(self) -> None:
         self._async_session = sqlalchemy_async_sessionmaker(bind=self.async_engine, expire_on_commit=False)
 
+    @property
+    def replicas(self) -> ReplicaSet:
+        if not self._replicas:
+            loguru.logger.info(f"DB Class: \t Initializing {len(self.replica_uris)} read replica engines...")
+            self._replicas = ReplicaSet(
+                engines=[
+                    self._create_async_engine(url=uri, pool_name=f"replica-{index}")
+                    for index, uri in enumerate(self.replica_uris)
+                ],
+                strategy=settings.DB_REPLICA_STRATEGY,
+                retry_after=settings.DB_REPLICA_RETRY_SECONDS,
+            )
+        return self._replicas
+
+    @property
+    def async_read_session(self) -> sqlalchemy_async_sessionmaker[SQLAlchemyAsyncSession]:
+        """
+        Sessions bound to the primary that send their reads to the replica passed as `replica_bind`.
+        """
+        if not self._async_read_session:
+            self._async_read_session = sqlalchemy_async_sessionmaker(
+                bind=self.async_engine, expire_on_commit=False, sync_session_class=ReadRoutingSession
+            )
+        return self._async_read_session
+
+    @property
+    def engines(self) -> list[SQLAlchemyAsyncEngine]:
+        return [self.async_engine, *self.replicas.engines]
+
+    async def warm_up(self, connections: int) -> int:
+        """
+        Open up to `connections` pooled connections per engine concurrently, so that the first requests after a
+        deploy do not pay for the TCP and authentication setup. Returns the number of connections opened.
+        """
+        opened = await asyncio.gather(*(self._warm_up_engine(engine, connections) for engine in self.engines))
+        return sum(opened)
+
+    async def _warm_up_engine(self, engine: SQLAlchemyAsyncEngine, connections: int) -> int:
+        connections = min(connections, engine.pool.size())  # type: ignore
+        if connections <= 0:
+            return 0
+
+        loguru.logger.info(f"DB Class: \t Warming up {connections} pooled connections of {engine.url.host}...")
+        results = await asyncio.gather(*(engine.connect() for _ in range(connections)), return_exceptions=True)
+        opened = [result for result in results if not isinstance(result, BaseException)]
+        # Closing returns the connections to the pool instead of closing them
+        await asyncio.gather(*(connection.close() for connection in opened))
+
+        for error in {str(result) for result in results if isinstance(result, BaseException)}:
+            loguru.logger.warning(f"DB Class: \t Pool warmup connection failed: {error}")
+        return len(opened)
+
+    async def dispose(self, drain_timeout: float) -> None:
+        """
+        Wait up to `drain_timeout` seconds for checked out connections to be returned, then close the pools.
+        """
+        if not self._async_engine:
+            return
+
+        engines = [self._async_engine, *(self._replicas.engines if self._replicas else [])]
+        deadline = time.monotonic() + drain_timeout
+        while (checked_out := sum(engine.pool.checkedout() for engine in engines)) and time.monotonic() < deadline:  # type: ignore
+            await asyncio.sleep(0.05)
+        if checked_out:
+            loguru.logger.warning(f"DB Class: \t Disposing the engines with {checked_out} connections still in use")
+
+        await asyncio.gather(*(engine.dispose() for engine in engines))
+
     def __call__(self):
         loguru.logger.info(f"DB Class: \t Database is called!")
         loguru.logger.info(f"Establishing SQLAlchemy Async Engine...")
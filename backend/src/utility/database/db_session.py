@@ -2,13 +2,17 @@
 Get async session through function with proper lifecycle management.
 """
 
+import contextlib
 from typing import AsyncGenerator
 
 import loguru
+import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.utility.database.db_class import db
 
+READ_REPLICA_CONNECTION_ERRORS = (sqlalchemy.exc.DBAPIError, OSError)
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -21,3 +25,42 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             loguru.logger.error(f"Exception in async session: {exception}")
             await session.rollback()
             raise
+
+
+@contextlib.asynccontextmanager
+async def open_async_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Open a session reading from a read replica, see `ReadRoutingSession`.
+
+    The replica connection is opened eagerly, a replica that cannot be reached is marked down and the next one
+    is tried. Without a reachable replica the session reads from the primary.
+    """
+    while replica := db.replicas.choose():
+        session = db.async_read_session(replica_bind=replica.sync_engine)
+        try:
+            await session.connection()
+            break
+        except READ_REPLICA_CONNECTION_ERRORS as exception:
+            loguru.logger.warning(f"Read replica {replica.url.host} failed to connect: {exception}")
+            await session.close()
+            db.replicas.mark_down(replica)
+    else:
+        session = db.async_read_session()
+
+    async with session:
+        yield session
+
+
+async def get_async_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to provide an async database session for read-only routes.
+
+    Reads go to a read replica, writes and every statement after the first write go to the primary.
+    """
+    async with open_async_read_session() as session:
+        try:
+            yield session
+        except Exception as exception:
+            loguru.logger.error(f"Exception in async read session: {exception}")
+            await session.rollback()
+            raise
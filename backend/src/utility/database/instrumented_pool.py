@@ -0,0 +1,85 @@
+"""
+Connection pool exposing its state and checkout wait time as metrics.
+"""
+
+import time
+import typing
+import weakref
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, PoolProxiedConnection
+
+from src.utility.metrics.metrics_registry import CallbackGauge, DB_POOL_CHECKOUT_WAIT, metrics_registry
+
+_pools: "weakref.WeakSet[InstrumentedAsyncAdaptedQueuePool]" = weakref.WeakSet()
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    `AsyncAdaptedQueuePool` timing every checkout and counting the callers currently waiting for one.
+
+    Only a caller finding every connection checked out is waiting, one opening a new connection or pinging an idle one
+    is not, otherwise the admission control would shed requests while the pool still has free connections.
+
+    The pool is labelled with its `logging_name`, passed as `pool_logging_name` when creating the engine.
+    """
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any):
+        super().__init__(*args, **kwargs)
+        self.waiting: int = 0
+        _pools.add(self)
+
+    @property
+    def name(self) -> str:
+        return self._orig_logging_name or "default"
+
+    def connect(self) -> PoolProxiedConnection:
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started_at, labels=(self.name,))
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        if not self.is_exhausted():
+            return super()._do_get()
+
+        self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+
+    def is_exhausted(self) -> bool:
+        # `max_overflow=-1` opens as many connections as requested, a caller never waits
+        return self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+
+    def dispose(self) -> None:
+        # `engine.dispose()` replaces the pool with a recreated one, stop reporting the old one
+        _pools.discard(self)
+        super().dispose()
+
+
+def get_pool_waiting() -> int:
+    """
+    Number of callers waiting for a connection of an exhausted pool, over all pools of the process.
+    """
+    return sum(pool.waiting for pool in list(_pools))
+
+
+def _collect_pool_state(read_state: typing.Callable[[InstrumentedAsyncAdaptedQueuePool], int]) -> typing.Callable:
+    def collect() -> list[tuple[tuple[str, ...], float]]:
+        return [((pool.name,), read_state(pool)) for pool in list(_pools)]
+
+    return collect
+
+
+for _name, _description, _read_state in (
+    ("db_pool_size", "Configured number of pooled connections.", lambda pool: pool.size()),
+    ("db_pool_checked_out", "Connections currently checked out.", lambda pool: pool.checkedout()),
+    ("db_pool_checked_in", "Idle connections in the pool.", lambda pool: pool.checkedin()),
+    ("db_pool_overflow", "Connections opened beyond the pool size.", lambda pool: max(pool.overflow(), 0)),
+    ("db_pool_waiting", "Callers waiting for a connection of the exhausted pool.", lambda pool: pool.waiting),
+):
+    metrics_registry.register(
+        CallbackGauge(_name, _description, callback=_collect_pool_state(_read_state), label_names=("pool",))
+    )
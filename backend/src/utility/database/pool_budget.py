@@ -0,0 +1,29 @@
+import typing
+
+
+class PoolBudget(typing.NamedTuple):
+    pool_size: int
+    max_overflow: int
+
+    @property
+    def max_connections(self) -> int:
+        return self.pool_size + self.max_overflow
+
+
+def split_pool_budget(pool_size: int, max_overflow: int, workers: int, max_connections: int) -> PoolBudget:
+    """
+    Split the pool of the server across its worker processes, each of which opens its own pool per database.
+
+    `pool_size` and `max_overflow` are the totals of the server, every worker gets an equal share of them. When the
+    shares add up to more than `max_connections`, the overflow and then the pool size of each worker are cut until
+    `workers * (pool_size + max_overflow) <= max_connections`.
+    """
+    if workers < 1:
+        raise ValueError(f"At least one worker is required, got {workers}")
+    connections_per_worker = max_connections // workers
+    if connections_per_worker < 1:
+        raise ValueError(f"{workers} workers cannot share {max_connections} database connections")
+
+    worker_pool_size = min(max(pool_size // workers, 1), connections_per_worker)
+    worker_max_overflow = min(max_overflow // workers, connections_per_worker - worker_pool_size)
+    return PoolBudget(pool_size=worker_pool_size, max_overflow=worker_max_overflow)
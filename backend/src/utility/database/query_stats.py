@@ -0,0 +1,75 @@
+"""
+Statements executed per request, recorded by the cursor listeners in `src/utility/events/db_events.py`.
+
+The stats are tracked through a context variable, so the queries of a request are counted in the tasks it spawns as
+well. A query batched by a `BatchLoader` counts for the request that opened the batch.
+"""
+
+import collections
+import contextlib
+import contextvars
+import typing
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.statements: collections.Counter[str] = collections.Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Statements executed at least `threshold` times, a hint for an N+1 query pattern.
+        """
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+_tracked: contextvars.ContextVar[tuple[QueryStats, ...]] = contextvars.ContextVar("tracked_query_stats", default=())
+
+
+def record_query(statement: str, duration: float) -> None:
+    for stats in _tracked.get():
+        stats.record(statement, duration)
+
+
+@contextlib.contextmanager
+def track_queries() -> typing.Iterator[QueryStats]:
+    """
+    Counts the queries executed within the block, nested blocks count them as well.
+    """
+    stats = QueryStats()
+    token = _tracked.set(_tracked.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _tracked.reset(token)
+
+
+@contextlib.contextmanager
+def assert_query_budget(max_queries: int) -> typing.Iterator[QueryStats]:
+    """
+    Fails with the executed statements if the block executes more than `max_queries` queries, for tests.
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        statements = "\n".join(f"{count}x {statement}" for statement, count in stats.statements.most_common())
+        raise AssertionError(f"Expected at most {max_queries} queries, {stats.count} were executed:\n{statements}")
+
+
+def redact_parameters(parameters: typing.Any, executemany: bool = False) -> typing.Any:
+    """
+    The parameters of a statement for the logs, the values replaced by their type names.
+    """
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, typing.Mapping):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
@@ -0,0 +1,81 @@
+"""
+Route reads to read replicas while writes and read-after-write stay on the primary.
+"""
+
+import itertools
+import time
+import typing
+
+import loguru
+import sqlalchemy
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine as SQLAlchemyAsyncEngine
+from sqlalchemy.orm import Session
+
+REPLICA_STRATEGIES = ("round_robin", "least_connections")
+
+
+class ReplicaSet:
+    """
+    Chooses a replica engine per session with `round_robin` or `least_connections`, the latter compares the
+    connections currently checked out of each replica pool.
+
+    A replica that failed to connect is skipped for `retry_after` seconds, when every replica is down
+    `choose` returns `None` and the caller falls back to the primary.
+    """
+
+    def __init__(
+        self,
+        engines: list[SQLAlchemyAsyncEngine],
+        strategy: str = "round_robin",
+        retry_after: float = 30.0,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ):
+        if strategy not in REPLICA_STRATEGIES:
+            raise ValueError(f"Unknown replica strategy {strategy}, expected one of {REPLICA_STRATEGIES}")
+        self.engines = engines
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._clock = clock
+        self._down_until: dict[int, float] = {}
+        self._round_robin = itertools.count()
+
+    def available(self) -> list[SQLAlchemyAsyncEngine]:
+        now = self._clock()
+        return [engine for index, engine in enumerate(self.engines) if self._down_until.get(index, 0.0) <= now]
+
+    def choose(self) -> SQLAlchemyAsyncEngine | None:
+        available = self.available()
+        if not available:
+            return None
+        if self.strategy == "least_connections":
+            return min(available, key=lambda engine: engine.pool.checkedout())  # type: ignore
+        return available[next(self._round_robin) % len(available)]
+
+    def mark_down(self, engine: SQLAlchemyAsyncEngine) -> None:
+        loguru.logger.warning(f"Read replica {engine.url.host} is down for {self.retry_after} seconds")
+        self._down_until[self.engines.index(engine)] = self._clock() + self.retry_after
+
+
+class ReadRoutingSession(Session):
+    """
+    Sends statements to `replica_bind` until the session writes. Flushes, `INSERT`/`UPDATE`/`DELETE` and
+    `SELECT ... FOR UPDATE` go to the primary and pin every later statement of the session to the primary,
+    so that a request reads its own writes. Without a replica every statement goes to the primary.
+    """
+
+    def __init__(self, *args: typing.Any, replica_bind: Engine | None = None, **kwargs: typing.Any):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+        self.is_pinned_to_primary = replica_bind is None
+
+    def get_bind(self, mapper: typing.Any = None, clause: typing.Any = None, **kwargs: typing.Any) -> typing.Any:
+        if not self.is_pinned_to_primary and (
+            self._flushing
+            or isinstance(clause, sqlalchemy.sql.dml.UpdateBase)
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self.is_pinned_to_primary = True
+        if self.is_pinned_to_primary:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        return self.replica_bind
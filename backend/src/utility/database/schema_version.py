@@ -0,0 +1,45 @@
+"""
+Compare the schema revision of the database with the head of the migrations shipped with the code.
+
+Migrations run once per deploy with `alembic upgrade head`, the server only checks the revision.
+"""
+
+import pathlib
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+MIGRATIONS_DIR: pathlib.Path = pathlib.Path(__file__).parent.parent.parent.resolve() / "repository" / "migrations"
+
+
+class SchemaVersionMismatchError(RuntimeError):
+    pass
+
+
+# Alembic is imported on use, it is only needed once at startup and importing it takes about 0.1s
+
+
+def get_head_revisions() -> set[str]:
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory(str(MIGRATIONS_DIR)).get_heads())
+
+
+def get_current_revisions(conn: Connection) -> set[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    return set(MigrationContext.configure(conn).get_current_heads())
+
+
+async def check_db_schema_version(conn: AsyncConnection) -> str:
+    """
+    Raise `SchemaVersionMismatchError` unless the database is at the head revision of the migrations.
+    """
+    current_revisions = await conn.run_sync(get_current_revisions)
+    head_revisions = get_head_revisions()
+    if current_revisions != head_revisions:
+        raise SchemaVersionMismatchError(
+            f"Database schema is at revision {sorted(current_revisions) or 'none'} but the code expects "
+            f"{sorted(head_revisions)}, run `alembic upgrade head` before starting the server"
+        )
+    return ",".join(sorted(head_revisions))
@@ -1,14 +1,24 @@
+import time
 import typing
 
 import fastapi
 import loguru
 from sqlalchemy import event
 from sqlalchemy.dialects.postgresql.asyncpg import AsyncAdapt_asyncpg_connection as AsyncPGConnection
-from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from sqlalchemy.pool import Pool
 from sqlalchemy.pool.base import _ConnectionRecord as ConnectionRecord
 
-from src.models.db_tables.table_collection import DBBaseTable
+from src.config.settings.setup import settings
 from src.utility.database.db_class import db
+from src.utility.database.query_stats import record_query, redact_parameters
+from src.utility.database.schema_version import check_db_schema_version
+from src.utility.metrics.metrics_registry import DB_QUERY_DURATION
+
+_QUERY_OPERATIONS = frozenset(("select", "insert", "update", "delete", "with"))
+
+# The listeners below are attached to the `Pool` and `Engine` classes, they apply to the primary and the replica
+# engines without creating them when this module is imported
 
 
 async def initialize_db_connection(app: fastapi.FastAPI) -> None:
@@ -16,8 +26,11 @@ async def initialize_db_connection(app: fastapi.FastAPI) -> None:
 
     app.state.db = db
 
-    async with app.state.db.async_engine.begin() as conn:
-        await initialize_db_tables(conn=conn)
+    async with app.state.db.async_engine.connect() as conn:
+        revision = await check_db_schema_version(conn=conn)
+    loguru.logger.info(f"Database schema is at revision {revision}")
+
+    await app.state.db.warm_up(connections=settings.DB_POOL_WARMUP_CONNECTIONS)
 
     loguru.logger.info("Database connection initialized!")
 
@@ -25,28 +38,61 @@ async def initialize_db_connection(app: fastapi.FastAPI) -> None:
 async def terminate_db_connection(app: fastapi.FastAPI) -> None:
     loguru.logger.info("Terminating database connection...")
 
-    app.state.db.async_engine.dispose()
+    await app.state.db.dispose(drain_timeout=settings.DB_POOL_DRAIN_TIMEOUT)
 
     loguru.logger.info("Database connection terminated!")
 
 
-async def initialize_db_tables(conn: AsyncConnection) -> None:
-    loguru.logger.info("Initializing database tables...")
-
-    await conn.run_sync(DBBaseTable.metadata.drop_all)  # type: ignore
-
-    await conn.run_sync(DBBaseTable.metadata.create_all)
-
-    loguru.logger.info("Database tables initialized!")
-
-
-@event.listens_for(target=db.async_engine.sync_engine, identifier="connect")
+@event.listens_for(target=Pool, identifier="connect")
 def inspect_db_server_on_connection(db_api_connection: AsyncPGConnection, connection_record: ConnectionRecord) -> None:
-    loguru.logger.info(f"New DB API Connection ---\n {db_api_connection}")
-    loguru.logger.info(f"Connection Record ---\n {connection_record}")
+    # Lazy formatting, the connection reprs are only rendered when DEBUG records are emitted
+    loguru.logger.debug("New DB API Connection ---\n {}", db_api_connection)
+    loguru.logger.debug("Connection Record ---\n {}", connection_record)
 
 
-@event.listens_for(target=db.async_engine.sync_engine, identifier="close")
+@event.listens_for(target=Pool, identifier="close")
 def inspect_db_server_on_close(db_api_connection: AsyncPGConnection, connection_record: ConnectionRecord) -> None:
-    loguru.logger.info(f"Closing DB API Connection ---\n {db_api_connection}")
-    loguru.logger.info(f"Closed Connection Record ---\n {connection_record}")
+    loguru.logger.debug("Closing DB API Connection ---\n {}", db_api_connection)
+    loguru.logger.debug("Closed Connection Record ---\n {}", connection_record)
+
+
+@event.listens_for(target=Engine, identifier="before_cursor_execute")
+def start_query_timer(
+    conn: Connection,
+    cursor: typing.Any,
+    statement: str,
+    parameters: typing.Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    # Kept on the execution context of the statement, which is dropped with it also when the statement fails
+    if context is not None:
+        context._query_started_at = time.perf_counter()  # type: ignore[attr-defined]
+
+
+@event.listens_for(target=Engine, identifier="after_cursor_execute")
+def observe_query_duration(
+    conn: Connection,
+    cursor: typing.Any,
+    statement: str,
+    parameters: typing.Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    started_at = getattr(context, "_query_started_at", None)
+    if started_at is None:
+        return
+    duration = time.perf_counter() - started_at
+    # The leading keyword of the statement, only a short prefix is split to keep this cheap
+    keyword = statement.lstrip()[:7].lower().split(maxsplit=1)
+    operation = keyword[0] if keyword and keyword[0] in _QUERY_OPERATIONS else "other"
+    DB_QUERY_DURATION.observe(duration, labels=(operation,))
+    record_query(statement, duration)
+    if duration * 1000 >= settings.DB_SLOW_QUERY_MS:
+        # Only the types of the parameters are logged, their values can be personal data or secrets
+        loguru.logger.warning(
+            "Slow query took {:.1f} ms: {} parameters={}",
+            duration * 1000,
+            statement,
+            redact_parameters(parameters, executemany),
+        )
@@ -4,7 +4,9 @@ import fastapi
 import loguru
 
 from src.config.logging import setup_logging
+from src.crud.account_crud import get_account_change_feed
 from src.utility.events.db_events import initialize_db_connection, terminate_db_connection
+from src.utility.security.password_hashing import get_password_hasher
 
 
 def execute_backend_server_event_handler(app: fastapi.FastAPI) -> typing.Any:
@@ -24,6 +26,10 @@ def terminate_backend_server_event_handler(app: fastapi.FastAPI) -> typing.Any:
 
     async def dumy_stop() -> None:
         loguru.logger.info("Terminating backend server events...")
+        await get_account_change_feed().close()
         await terminate_db_connection(app=app)
+        get_password_hasher().shutdown()
+        # Flush records still queued for enqueued sinks
+        await loguru.logger.complete()
 
     return dumy_stop
@@ -0,0 +1,91 @@
+import datetime
+import email.utils
+import hashlib
+import typing
+
+import fastapi
+
+# Clients keep the response but revalidate it with its validators before every reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+class Validators(typing.NamedTuple):
+    etag: str
+    last_modified: datetime.datetime | None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = email.utils.format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def get_validators(rows: typing.Iterable[typing.Any], with_last_modified: bool = False) -> Validators:
+    """
+    Validators of a response built from rows with `id`, `created_at` and `updated_at`.
+
+    The ETag hashes the id and the version (`updated_at`, else `created_at`) of every row in order, so it changes
+    when a row is updated, added or removed. It is weak because the GZip middleware may encode the body.
+
+    `Last-Modified`, the latest version, is only sent `with_last_modified`, for a single row. It does not change when
+    a row of a collection is removed, so `If-Modified-Since` would keep answering `304` for the old collection. It is
+    truncated to the whole seconds of the header, so that a client sending back the date it got is answered `304`. An
+    update within the same second only changes the ETag.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    last_modified: datetime.datetime | None = None
+    for row in rows:
+        version = row.updated_at or row.created_at
+        digest.update(f"{row.id}:{version.isoformat() if version else ''};".encode())
+        if version is not None and (last_modified is None or version > last_modified):
+            last_modified = version
+
+    if last_modified is not None and with_last_modified:
+        last_modified = last_modified.astimezone(datetime.timezone.utc).replace(microsecond=0)
+    else:
+        last_modified = None
+    return Validators(etag=f'W/"{digest.hexdigest()}"', last_modified=last_modified)
+
+
+def is_not_modified(request_headers: typing.Mapping[str, str], validators: Validators) -> bool:
+    """
+    Evaluate `If-None-Match`, or `If-Modified-Since` when there is no `If-None-Match`, like RFC 9110 section 13.2.2.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, `W/"x"` matches `"x"`
+        etag = validators.etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is None or validators.last_modified is None:
+        return False
+    try:
+        modified_since = email.utils.parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if modified_since.tzinfo is None:
+        modified_since = modified_since.replace(tzinfo=datetime.timezone.utc)
+    return validators.last_modified <= modified_since
+
+
+def conditional_response(
+    request: fastapi.Request,
+    rows: typing.Sequence[typing.Any],
+    build_response: typing.Callable[[], fastapi.Response],
+    with_last_modified: bool = False,
+) -> fastapi.Response:
+    """
+    Answer with `304 Not Modified` when the client already has the current representation of `rows`, without
+    calling `build_response`, else with the built response. Both carry the validators, see `get_validators`.
+    """
+    validators = get_validators(rows, with_last_modified=with_last_modified)
+    if is_not_modified(request.headers, validators):
+        response = fastapi.Response(status_code=304)
+    else:
+        response = build_response()
+    response.headers.update(validators.headers)
+    return response
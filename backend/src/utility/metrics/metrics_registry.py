@@ -0,0 +1,201 @@
+"""
+Minimal in-process metrics in the Prometheus text exposition format.
+
+Recording a value is a dict lookup plus an increment, so the metrics can sit on the hot path of
+every request and query. Values that already live elsewhere, such as the pool state, are read by
+callbacks only when `/metrics` is scraped.
+"""
+
+import abc
+import bisect
+import typing
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: LabelValues, extra: str = "") -> str:
+    labels = [f'{name}="{_escape_label_value(str(value))}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+class Metric(abc.ABC):
+    type: str = "untyped"
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type}", *self.render_samples()]
+
+    @abc.abstractmethod
+    def render_samples(self) -> list[str]: ...
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, description, label_names)
+        self.values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render_samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {value}" for labels, value in self.values.items()
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        self.inc(-amount, labels)
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        self.values[labels] = value
+
+
+class CallbackGauge(Metric):
+    """
+    Gauge whose samples are produced by `callback` at scrape time.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        callback: typing.Callable[[], typing.Iterable[tuple[LabelValues, float]]],
+        label_names: tuple[str, ...] = (),
+    ):
+        super().__init__(name, description, label_names)
+        self.callback = callback
+
+    def render_samples(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {value}" for labels, value in self.callback()]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts (non-cumulative, last one is +Inf), sum, count]
+        self.values: dict[LabelValues, list[typing.Any]] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render_samples(self) -> list[str]:
+        samples = []
+        for labels, (bucket_counts, total, count) in self.values.items():
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip((*self.buckets, "+Inf"), bucket_counts):
+                cumulative_count += bucket_count
+                bucket_labels = _format_labels(self.label_names, labels, extra=f'le="{upper_bound}"')
+                samples.append(f"{self.name}_bucket{bucket_labels} {cumulative_count}")
+            samples.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}")
+            samples.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> typing.Any:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics.values() for line in metric.render()) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+REQUEST_DURATION: Histogram = metrics_registry.register(
+    Histogram(
+        "http_request_duration_seconds", "Request latency by route name and status.", label_names=("route", "status")
+    )
+)
+REQUESTS_IN_FLIGHT: Gauge = metrics_registry.register(
+    Gauge("http_requests_in_flight", "Requests currently being served.")
+)
+DB_QUERY_DURATION: Histogram = metrics_registry.register(
+    Histogram("db_query_duration_seconds", "Duration of database statements by operation.", label_names=("operation",))
+)
+DB_POOL_CHECKOUT_WAIT: Histogram = metrics_registry.register(
+    Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", label_names=("pool",))
+)
+ADMISSION_REJECTED: Counter = metrics_registry.register(
+    Counter(
+        "http_requests_rejected_total",
+        "Requests shed by the admission control by budget and reason.",
+        label_names=("budget", "reason"),
+    )
+)
+ADMISSION_QUEUED: Gauge = metrics_registry.register(
+    Gauge("http_requests_queued", "Requests waiting for admission by budget.", label_names=("budget",))
+)
+BATCH_LOADER_REQUESTS: Counter = metrics_registry.register(
+    Counter(
+        "batch_loader_requests_total",
+        "Lookups by loader and whether they shared the result of a concurrent lookup of the same key.",
+        label_names=("loader", "deduplicated"),
+    )
+)
+BATCH_LOADER_BATCH_SIZE: Histogram = metrics_registry.register(
+    Histogram(
+        "batch_loader_batch_size",
+        "Distinct keys per batched query by loader.",
+        label_names=("loader",),
+        buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+    )
+)
+AUTH_TOKEN_VERIFICATIONS: Counter = metrics_registry.register(
+    Counter(
+        "auth_token_verifications_total",
+        "Token verifications by outcome, cache_hit and verified ones succeeded.",
+        label_names=("outcome",),
+    )
+)
+CHANGE_FEED_SUBSCRIBERS: Gauge = metrics_registry.register(
+    Gauge("change_feed_subscribers", "Server-Sent Events streams subscribed by feed.", label_names=("feed",))
+)
+CHANGE_FEED_EVENTS: Counter = metrics_registry.register(
+    Counter("change_feed_events_total", "Events received by feed and event type.", label_names=("feed", "type"))
+)
+CHANGE_FEED_SUBSCRIBERS_DROPPED: Counter = metrics_registry.register(
+    Counter(
+        "change_feed_subscribers_dropped_total",
+        "Subscribers disconnected for falling behind by more than their queue, by feed.",
+        label_names=("feed",),
+    )
+)
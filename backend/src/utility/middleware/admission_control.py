@@ -0,0 +1,174 @@
+"""
+Pure ASGI middleware limiting the requests in flight and shedding the excess with `503 Service Unavailable`.
+"""
+
+import asyncio
+import collections
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.utility.database.instrumented_pool import get_pool_waiting
+from src.utility.metrics.metrics_registry import ADMISSION_QUEUED, ADMISSION_REJECTED
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AdmissionBudget:
+    """
+    Admits up to `limit` requests at a time and queues up to `max_queue` more in arrival order. A queued request
+    that is not admitted within the queue timeout, or one arriving at a full queue, is refused.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.in_flight: int = 0
+        self._waiters: collections.deque[asyncio.Future[None]] = collections.deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def try_acquire(self) -> bool:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        return False
+
+    async def acquire(self, timeout: float) -> str | None:
+        """
+        Wait for admission, returns `None` once admitted, else the reason of the refusal.
+        """
+        if self.try_acquire():
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUED.inc(labels=(self.name,))
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return None
+        except asyncio.TimeoutError:
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            # The slot may have been handed over right before the cancellation
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            ADMISSION_QUEUED.dec(labels=(self.name,))
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+
+    def release(self) -> None:
+        # Hand the slot over to the longest waiting request instead of freeing it, so that new arrivals cannot
+        # overtake the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class AdmissionControlMiddleware:
+    """
+    Every request is admitted by the budget of its route: the route's own budget when one is configured in
+    `route_limits` (a limit of 0 exempts the route), else the shared read budget for GET, HEAD and OPTIONS and the
+    shared write budget for every other method.
+
+    New requests are refused right away while more than `max_pool_waiters` callers wait for a database connection,
+    instead of joining that queue and timing out in `pool_timeout`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        read_limit: int,
+        write_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: int,
+        max_pool_waiters: int,
+        route_limits: dict[str, int] | None = None,
+    ):
+        self.app = app
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.max_pool_waiters = max_pool_waiters
+        self.read_budget = AdmissionBudget("read", limit=read_limit, max_queue=max_queue)
+        self.write_budget = AdmissionBudget("write", limit=write_limit, max_queue=max_queue)
+        self.route_budgets: dict[str, AdmissionBudget | None] = {
+            route_name: AdmissionBudget(route_name, limit=limit, max_queue=max_queue) if limit > 0 else None
+            for route_name, limit in (route_limits or {}).items()
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_name = _match_route_name(scope)
+        if route_name in self.route_budgets:
+            budget = self.route_budgets[route_name]
+            if budget is None:
+                await self.app(scope, receive, send)
+                return
+        else:
+            budget = self.read_budget if scope["method"] in READ_METHODS else self.write_budget
+
+        if get_pool_waiting() > self.max_pool_waiters:
+            await self._reject(budget, reason="pool", scope=scope, receive=receive, send=send)
+            return
+        reason = await budget.acquire(self.queue_timeout)
+        if reason is not None:
+            await self._reject(budget, reason=reason, scope=scope, receive=receive, send=send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            budget.release()
+
+    async def _reject(self, budget: AdmissionBudget, reason: str, scope: Scope, receive: Receive, send: Send) -> None:
+        ADMISSION_REJECTED.inc(labels=(budget.name, reason))
+        response = JSONResponse(
+            {"detail": "Server is overloaded, retry later"},
+            status_code=503,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+        await response(scope, receive, send)
+
+
+def _match_route_name(scope: Scope) -> str | None:
+    # The middleware runs before the routing, so the route is matched here the same way the router will
+    router = getattr(scope.get("app"), "router", None)
+    partial_match: str | None = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "name", None)
+        if match == Match.PARTIAL and partial_match is None:
+            partial_match = getattr(route, "name", None)
+    return partial_match
+
+
+def parse_route_limits(route_limits: str) -> dict[str, int]:
+    """
+    Parse `route:name=limit` pairs separated by commas, e.g. `account:create_accounts_bulk=4,metrics:get_metrics=0`.
+    """
+    limits = {}
+    for item in route_limits.split(","):
+        if not item.strip():
+            continue
+        route_name, _, limit = item.rpartition("=")
+        limits[route_name.strip()] = int(limit)
+    return limits
@@ -0,0 +1,36 @@
+"""
+Gzip compression of the responses, except for streams of Server-Sent Events.
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+
+class EventStreamAwareGZipMiddleware(GZipMiddleware):
+    """
+    `GZipMiddleware` leaving `text/event-stream` responses uncompressed, so that every event is sent right away.
+
+    The decision is taken from the `content-type` of the response itself, whose messages then bypass the
+    `GZipResponder`, the gzip stream would hold the events back until enough of them were buffered to be compressed.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("Accept-Encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        async def app_bypassing_event_streams(scope: Scope, receive: Receive, send_with_gzip: Send) -> None:
+            is_event_stream = False
+
+            async def send_or_bypass(message: Message) -> None:
+                nonlocal is_event_stream
+                if message["type"] == "http.response.start":
+                    content_type = Headers(raw=message["headers"]).get("content-type", "")
+                    is_event_stream = content_type.startswith("text/event-stream")
+                await (send if is_event_stream else send_with_gzip)(message)
+
+            await self.app(scope, receive, send_or_bypass)
+
+        responder = GZipResponder(app_bypassing_event_streams, self.minimum_size, compresslevel=self.compresslevel)
+        await responder(scope, receive, send)
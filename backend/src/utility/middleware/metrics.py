@@ -0,0 +1,47 @@
+"""
+Pure ASGI middleware recording request latency and the number of requests in flight.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utility.metrics.metrics_registry import REQUEST_DURATION, REQUESTS_IN_FLIGHT
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Labels the latency of each request with the `name` of the route that served it, for example
+    `account:get_account_by_id`. FastAPI stores the matched route in the scope, so no path matching is
+    repeated here and the label cardinality stays bounded by the number of routes.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started_at,
+                labels=(getattr(route, "name", UNMATCHED_ROUTE), str(status_code)),
+            )
@@ -0,0 +1,141 @@
+"""
+Pure ASGI middleware sampling the stacks of single requests into collapsed stack files.
+"""
+
+import asyncio
+import collections
+import hmac
+import pathlib
+import random
+import re
+import sys
+import threading
+import time
+import types
+import typing
+import uuid
+
+import loguru
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.utility.middleware.metrics import UNMATCHED_ROUTE
+
+PROFILE_HEADER = b"x-profile"
+AWAITING = "[awaiting]"
+_UNSAFE_FILE_NAME_CHARACTERS = re.compile(r"[^\w.-]")
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of `task` every `interval` seconds until stopped. While the task runs, the stack of the event
+    loop thread is sampled, while it is suspended, the chain of coroutines it awaits ending in `[awaiting]`. Both are
+    rooted at the coroutine of the task, so the samples add up to the wall-clock time of the task.
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.task = task
+        self.interval = interval
+        self.samples: collections.Counter[str] = collections.Counter()
+        self._loop = task.get_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            stack = self.sample()
+            if stack:
+                self.samples[stack] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def sample(self) -> str:
+        coro = self.task.get_coro()
+        task_frame = getattr(coro, "cr_frame", None)
+        if task_frame is None:
+            # The task has finished, there is nothing left to sample
+            return ""
+        if asyncio.current_task(self._loop) is not self.task:
+            return ";".join([*map(_frame_name, _awaited_frames(coro)), AWAITING])
+
+        frames: list[types.FrameType] = []
+        frame = sys._current_frames().get(self._loop_thread_id)
+        while frame is not None:
+            frames.append(frame)
+            if frame is task_frame:
+                break
+            frame = frame.f_back
+        return ";".join(map(_frame_name, reversed(frames)))
+
+
+def _awaited_frames(awaitable: typing.Any) -> typing.Iterator[types.FrameType]:
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            return
+        yield frame
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+
+
+def _frame_name(frame: types.FrameType) -> str:
+    return f"{frame.f_code.co_name} ({frame.f_code.co_filename}:{frame.f_lineno})"
+
+
+class ProfilerMiddleware:
+    """
+    Profiles a `sample_rate` fraction of the requests, and the requests whose `X-Profile` header equals
+    `trigger_token`, one request at a time per worker. The samples are written in the collapsed stack format read by
+    `flamegraph.pl` and speedscope to `<output_directory>/<route name>-<time>-<id>.collapsed`.
+
+    It is only registered when profiling is enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app: ASGIApp, output_directory: str, sample_rate: float, trigger_token: str, interval: float):
+        self.app = app
+        self.output_directory = pathlib.Path(output_directory)
+        self.sample_rate = sample_rate
+        self.trigger_token = trigger_token.encode()
+        self.interval = interval
+        self._profiling = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._profiling or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._profiling = True
+        sampler = StackSampler(task=asyncio.current_task(), interval=self.interval)  # type: ignore[arg-type]
+        started_at = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampler.stop()
+            self._profiling = False
+            duration = time.perf_counter() - started_at
+            route_name = getattr(scope.get("route"), "name", UNMATCHED_ROUTE)
+            path = await asyncio.to_thread(self._write_profile, route_name, sampler.samples)
+            loguru.logger.info(
+                "Profiled {} {} ({:.1f} ms, {} samples) to {}",
+                scope["method"],
+                scope["path"],
+                duration * 1000,
+                sampler.samples.total(),
+                path,
+            )
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.trigger_token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.trigger_token)
+        return random.random() < self.sample_rate
+
+    def _write_profile(self, route_name: str, samples: collections.Counter[str]) -> pathlib.Path:
+        self.output_directory.mkdir(parents=True, exist_ok=True)
+        file_name = f"{_UNSAFE_FILE_NAME_CHARACTERS.sub('_', route_name)}-{time.strftime('%Y%m%dT%H%M%S')}"
+        path = self.output_directory / f"{file_name}-{uuid.uuid4().hex[:8]}.collapsed"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in samples.items()))
+        return path
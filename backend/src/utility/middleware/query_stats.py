@@ -0,0 +1,51 @@
+"""
+Pure ASGI middleware counting the database queries of each request.
+"""
+
+import loguru
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utility.database.query_stats import track_queries
+
+QUERY_COUNT_HEADER = "x-db-query-count"
+QUERY_TIME_HEADER = "x-db-query-time-ms"
+
+
+class QueryStatsMiddleware:
+    """
+    Tracks the queries of each request and logs the statements executed at least `repeated_query_threshold` times
+    by it. With `expose_headers` the number of queries and their time in milliseconds up to the start of the
+    response are sent as the `X-DB-Query-Count` and `X-DB-Query-Time-Ms` headers, which tests can check a route's
+    query budget with.
+    """
+
+    def __init__(self, app: ASGIApp, expose_headers: bool, repeated_query_threshold: int):
+        self.app = app
+        self.expose_headers = expose_headers
+        self.repeated_query_threshold = repeated_query_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_query_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.expose_headers:
+                    message.setdefault("headers", [])
+                    message["headers"].append((QUERY_COUNT_HEADER.encode(), str(stats.count).encode()))
+                    message["headers"].append((QUERY_TIME_HEADER.encode(), f"{stats.duration * 1000:.2f}".encode()))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_query_stats)
+            finally:
+                for statement, count in stats.repeated(self.repeated_query_threshold):
+                    loguru.logger.warning(
+                        "Statement executed {} times by {} {}, possible N+1 query: {}",
+                        count,
+                        scope["method"],
+                        scope["path"],
+                        statement,
+                    )
@@ -0,0 +1,36 @@
+"""
+Pure ASGI middleware binding a request id to every log record of a request.
+"""
+
+import uuid
+
+import loguru
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+class RequestContextMiddleware:
+    """
+    Reuses the `X-Request-ID` header of the client or generates one, binds it to the log records of the
+    request through `loguru.logger.contextualize` and echoes it in the response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = dict(scope["headers"]).get(REQUEST_ID_HEADER, b"").decode("latin-1") or uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"].append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+            await send(message)
+
+        with loguru.logger.contextualize(request_id=request_id):
+            await self.app(scope, receive, send_with_request_id)
@@ -0,0 +1,38 @@
+"""
+Serialize trusted ORM rows straight into the JSON structure of a response schema.
+
+Rows read from the database were validated on their way in, validating them again for every
+response is pure overhead. The serializer is compiled once per schema and produces the same aliased
+keys, field order and datetime format as `schema.model_dump(mode="json", by_alias=True)`.
+"""
+
+import datetime
+import operator
+import typing
+
+import pydantic
+
+from src.utility.formatters.date_time import datetime_2_isoformat
+
+ORMSerializer = typing.Callable[[typing.Any], dict[str, typing.Any]]
+
+
+def compile_orm_serializer(schema: type[pydantic.BaseModel]) -> ORMSerializer:
+    field_names = tuple(schema.model_fields)
+    aliases = tuple(field.alias or name for name, field in schema.model_fields.items())
+    datetime_aliases = tuple(
+        field.alias or name
+        for name, field in schema.model_fields.items()
+        if datetime.datetime in (field.annotation, *typing.get_args(field.annotation))
+    )
+    get_values = operator.attrgetter(*field_names)
+
+    def serialize(orm_row: typing.Any) -> dict[str, typing.Any]:
+        values = get_values(orm_row)
+        data = dict(zip(aliases, values if len(field_names) > 1 else (values,)))
+        for alias in datetime_aliases:
+            if data[alias] is not None:
+                data[alias] = datetime_2_isoformat(data[alias])
+        return data
+
+    return serialize
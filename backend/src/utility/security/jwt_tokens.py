@@ -0,0 +1,196 @@
+"""
+Signed JWT access and refresh tokens, verified without a database lookup.
+
+A verified access token is memoized in a bounded LRU cache keyed by the token, so a client sending the same token
+again only pays for a dict lookup and the expiry and deny-list checks. Revoked token ids are kept in a deny-list
+until the token would have expired anyway, in the shared cache with `CACHE_BACKEND=shared` so that a revocation holds
+on every worker. The deny-list fails closed: an id is never dropped before its token expires, and a deny-list that can
+not be read or is full raises `CacheUnavailableError` instead of accepting the token.
+"""
+
+import collections
+import functools
+import time
+import typing
+import uuid
+
+import fastapi
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import jwt
+from jose.exceptions import JOSEError
+
+from src.config.settings.setup import settings
+from src.utility.cache.cache_backend import (
+    CacheBackend,
+    CacheUnavailableError,
+    get_cache_backend,
+    InMemoryCacheBackend,
+)
+from src.utility.metrics.metrics_registry import AUTH_TOKEN_VERIFICATIONS
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+class TokenClaims(typing.NamedTuple):
+    account_id: int
+    username: str
+    is_admin: bool
+    token_type: str
+    jti: str
+    expires_at: int
+
+
+class TokenManager:
+    def __init__(
+        self,
+        secret_key: str,
+        algorithm: str,
+        access_token_ttl: int,
+        refresh_token_ttl: int,
+        verified_cache_size: int,
+        deny_list: CacheBackend,
+        clock: typing.Callable[[], float] = time.time,
+    ):
+        if not secret_key:
+            raise RuntimeError("JWT_SECRET_KEY must be set to issue and verify tokens")
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.access_token_ttl = access_token_ttl
+        self.refresh_token_ttl = refresh_token_ttl
+        self.verified_cache_size = verified_cache_size
+        self.deny_list = deny_list
+        self._clock = clock
+        self._verified: collections.OrderedDict[str, TokenClaims] = collections.OrderedDict()
+
+    def issue(self, account_id: int, username: str, is_admin: bool, token_type: str) -> tuple[str, TokenClaims]:
+        ttl = self.access_token_ttl if token_type == ACCESS_TOKEN else self.refresh_token_ttl
+        issued_at = int(self._clock())
+        claims = TokenClaims(
+            account_id=account_id,
+            username=username,
+            is_admin=is_admin,
+            token_type=token_type,
+            jti=uuid.uuid4().hex,
+            expires_at=issued_at + ttl,
+        )
+        token = jwt.encode(
+            {
+                "sub": str(account_id),
+                "username": username,
+                "is_admin": is_admin,
+                "type": token_type,
+                "jti": claims.jti,
+                "iat": issued_at,
+                "exp": claims.expires_at,
+            },
+            self.secret_key,
+            algorithm=self.algorithm,
+        )
+        return token, claims
+
+    async def verify(self, token: str, token_type: str = ACCESS_TOKEN) -> TokenClaims:
+        claims = self._verified.get(token)
+        if claims is not None:
+            self._verified.move_to_end(token)
+            outcome = "cache_hit"
+        else:
+            claims = self._decode(token)
+            outcome = "verified"
+
+        if claims.token_type != token_type:
+            self._reject("wrong_type", f"Expected an {token_type} token")
+        if claims.expires_at <= self._clock():
+            self._verified.pop(token, None)
+            self._reject("expired", "Token has expired")
+        try:
+            is_revoked = await self.deny_list.get(claims.jti) is not None
+        except CacheUnavailableError:
+            AUTH_TOKEN_VERIFICATIONS.inc(labels=("unavailable",))
+            raise
+        if is_revoked:
+            self._verified.pop(token, None)
+            self._reject("revoked", "Token has been revoked")
+
+        if outcome == "verified":
+            self._verified[token] = claims
+            while len(self._verified) > self.verified_cache_size:
+                self._verified.popitem(last=False)
+        AUTH_TOKEN_VERIFICATIONS.inc(labels=(outcome,))
+        return claims
+
+    async def revoke(self, claims: TokenClaims) -> bool:
+        """
+        Deny the token until it expires. Returns False if it was already revoked, the check and the revocation are one
+        atomic step so that of concurrent requests using the same token only one gets True.
+        """
+        ttl_seconds = max(claims.expires_at - self._clock(), 1)
+        return await self.deny_list.add(claims.jti, claims.expires_at, ttl_seconds=ttl_seconds)
+
+    def _decode(self, token: str) -> TokenClaims:
+        try:
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            return TokenClaims(
+                account_id=int(payload["sub"]),
+                username=payload["username"],
+                is_admin=bool(payload["is_admin"]),
+                token_type=payload["type"],
+                jti=payload["jti"],
+                expires_at=int(payload["exp"]),
+            )
+        except (JOSEError, KeyError, TypeError, ValueError) as e:
+            self._reject("invalid", f"Invalid token: {e}")
+
+    def _reject(self, reason: str, detail: str) -> typing.NoReturn:
+        AUTH_TOKEN_VERIFICATIONS.inc(labels=(reason,))
+        raise InvalidTokenError(detail)
+
+
+@functools.lru_cache
+def get_token_manager() -> TokenManager:
+    return TokenManager(
+        secret_key=settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM,
+        access_token_ttl=settings.JWT_ACCESS_TOKEN_TTL_SECONDS,
+        refresh_token_ttl=settings.JWT_REFRESH_TOKEN_TTL_SECONDS,
+        verified_cache_size=settings.JWT_VERIFIED_CACHE_SIZE,
+        deny_list=get_deny_list(),
+    )
+
+
+def get_deny_list() -> CacheBackend:
+    if settings.CACHE_BACKEND == "shared":
+        return get_cache_backend("jwt-deny-list", fail_closed=True)
+    return InMemoryCacheBackend(
+        max_size=settings.JWT_DENY_LIST_SIZE,
+        ttl_seconds=settings.JWT_REFRESH_TOKEN_TTL_SECONDS,
+        clock=time.time,
+        evict=False,
+    )
+
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+async def get_current_token(
+    credentials: HTTPAuthorizationCredentials | None = fastapi.Depends(_bearer),
+) -> TokenClaims:
+    """
+    Dependency authenticating the request by its `Authorization: Bearer` access token, without a database lookup.
+    """
+    if credentials is None:
+        raise fastapi.HTTPException(
+            status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        return await get_token_manager().verify(credentials.credentials, token_type=ACCESS_TOKEN)
+    except InvalidTokenError as e:
+        raise fastapi.HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    except CacheUnavailableError as e:
+        raise fastapi.HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+        )
@@ -0,0 +1,86 @@
+"""
+Argon2 password hashing executed on a bounded thread pool.
+
+Argon2 is deliberately CPU and memory heavy. `argon2-cffi` releases the GIL while hashing, so
+running it on worker threads keeps the event loop free to serve other requests.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import secrets
+
+import argon2
+import loguru
+from argon2 import exceptions as argon2_error
+
+from src.config.settings.setup import settings
+
+
+class PasswordHasher:
+    def __init__(self, time_cost: int, memory_cost: int, parallelism: int, max_workers: int):
+        self.max_workers = max_workers
+        self._hasher = argon2.PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._unknown_hash: str | None = None
+
+    @property
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if not self._executor:
+            loguru.logger.info(f"Starting password hashing pool with {self.max_workers} workers...")
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hashing"
+            )
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._hasher.hash, password)
+
+    async def hash_many(self, passwords: list[str], max_concurrency: int) -> list[str]:
+        """
+        Hash `passwords` with at most `max_concurrency` of them on the pool at a time. The pool works first come
+        first served, so queueing all of them at once would hold up every other hash of this worker until the last
+        one is done.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def hash_one(password: str) -> str:
+            async with semaphore:
+                return await self.hash(password)
+
+        return list(await asyncio.gather(*(hash_one(password) for password in passwords)))
+
+    async def verify(self, hashed_password: str, password: str) -> bool:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._hasher.verify, hashed_password, password
+            )
+        except (argon2_error.VerifyMismatchError, argon2_error.InvalidHashError):
+            return False
+
+    async def verify_unknown(self, password: str) -> None:
+        """
+        Verify `password` against the hash of a random password, so that a caller without a hash to verify it against
+        takes as long as one with.
+        """
+        if self._unknown_hash is None:
+            self._unknown_hash = await self.hash(secrets.token_urlsafe(16))
+        await self.verify(self._unknown_hash, password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self._hasher.check_needs_rehash(hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+@functools.lru_cache
+def get_password_hasher() -> PasswordHasher:
+    return PasswordHasher(
+        time_cost=settings.PASSWORD_HASH_TIME_COST,
+        memory_cost=settings.PASSWORD_HASH_MEMORY_COST,
+        parallelism=settings.PASSWORD_HASH_PARALLELISM,
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+    )
@@ -0,0 +1,250 @@
+"""
+Load and latency benchmark of the account API, served in-process against the local database.
+
+The app runs through `httpx.ASGITransport` with `asgi_lifespan.LifespanManager` running the startup and
+shutdown events, so the schema check, the pool warmup and the drain are part of the run. Each concurrency
+level drives a seeded mix of create, get-by-id, list, update and delete requests and reports throughput
+and p50/p95/p99 latency per route name.
+
+Results are written to `BENCHMARK_API_RESULTS_DIR`. When `BENCHMARK_API_BASELINE` points at an earlier
+results file, a route whose p95 latency grew or whose throughput dropped by more than
+`BENCHMARK_API_REGRESSION_TOLERANCE` fails the benchmark.
+"""
+
+import asyncio
+import collections
+import datetime
+import json
+import math
+import os
+import pathlib
+import random
+import time
+import typing
+import uuid
+
+import httpx
+import pytest
+from asgi_lifespan import LifespanManager
+
+CONCURRENCY_LEVELS = [int(level) for level in os.getenv("BENCHMARK_API_CONCURRENCY", "1,10,50").split(",")]
+REQUESTS_PER_LEVEL = int(os.getenv("BENCHMARK_API_REQUESTS", "500"))
+SEED_ACCOUNTS = int(os.getenv("BENCHMARK_API_SEED_ACCOUNTS", "100"))
+RESULTS_DIR = pathlib.Path(os.getenv("BENCHMARK_API_RESULTS_DIR", "benchmark_results"))
+BASELINE = os.getenv("BENCHMARK_API_BASELINE")
+REGRESSION_TOLERANCE = float(os.getenv("BENCHMARK_API_REGRESSION_TOLERANCE", "0.2"))
+PASSWORD = "Test1234!"
+
+# Route name and share of the requests of every operation of the mix
+WORKLOAD_MIX = {
+    "account:get_account_by_id": 0.5,
+    "account:get_all_accounts": 0.2,
+    "account:update_account_by_id": 0.15,
+    "account:create_account": 0.1,
+    "account:delete_account_by_id": 0.05,
+}
+
+
+class Workload:
+    """
+    Issues the requests of the mix against accounts created by the workload itself.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, seed: int):
+        self.client = client
+        self.random = random.Random(seed)
+        self.run_id = uuid.uuid4().hex[:8]
+        self.account_ids: list[int] = []
+        self.created = 0
+        self.latencies: dict[str, list[float]] = collections.defaultdict(list)
+        self.errors: collections.Counter[str] = collections.Counter()
+
+    def new_account(self) -> dict[str, str]:
+        self.created += 1
+        username = f"bench{self.run_id}{self.created}"
+        return {"username": username, "email": f"{username}@gmx.de", "password": PASSWORD}
+
+    async def seed(self, accounts: int) -> None:
+        # In batches of the default `BULK_CREATE_MAX_ITEMS`
+        for start in range(0, accounts, 50):
+            batch = [self.new_account() for _ in range(min(50, accounts - start))]
+            response = await self.client.post("/v1/account/bulk", json=batch)
+            response.raise_for_status()
+            self.account_ids.extend(item["account"]["id"] for item in response.json() if item["isCreated"])
+
+    async def cleanup(self) -> None:
+        for start in range(0, len(self.account_ids), 1000):
+            ids = self.account_ids[start : start + 1000]
+            await self.client.request("DELETE", "/v1/account/bulk", json={"ids": ids})
+        self.account_ids.clear()
+
+    async def request(self, route_name: str) -> None:
+        if route_name == "account:create_account":
+            call = self.client.post("/v1/account", json=self.new_account())
+        elif route_name == "account:get_all_accounts":
+            call = self.client.get("/v1/account", params={"limit": 50, "after": self.random.choice(self.account_ids)})
+        elif route_name == "account:get_account_by_id":
+            call = self.client.get(f"/v1/account/{self.random.choice(self.account_ids)}")
+        elif route_name == "account:update_account_by_id":
+            account = self.new_account()
+            call = self.client.put(
+                f"/v1/account/{self.random.choice(self.account_ids)}",
+                json={"username": account["username"], "email": account["email"]},
+            )
+        else:
+            # Keep at least one account around for the reads
+            if len(self.account_ids) < 2:
+                return
+            call = self.client.delete(
+                f"/v1/account/{self.account_ids.pop(self.random.randrange(len(self.account_ids)))}"
+            )
+
+        started_at = time.perf_counter()
+        response = await call
+        self.latencies[route_name].append(time.perf_counter() - started_at)
+        # Concurrent deletes and the last page make 404s an expected outcome of the mix
+        if response.status_code >= 400 and response.status_code != 404:
+            self.errors[route_name] += 1
+        elif route_name == "account:create_account":
+            self.account_ids.append(response.json()["id"])
+
+    async def run(self, concurrency: int, requests: int) -> float:
+        route_names = self.random.choices(list(WORKLOAD_MIX), weights=list(WORKLOAD_MIX.values()), k=requests)
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        for route_name in route_names:
+            queue.put_nowait(route_name)
+
+        async def worker() -> None:
+            while not queue.empty():
+                await self.request(queue.get_nowait())
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started_at
+
+
+def percentile(latencies: list[float], percent: float) -> float:
+    ordered = sorted(latencies)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(workload: Workload, elapsed_seconds: float) -> dict[str, dict[str, float]]:
+    return {
+        route_name: {
+            "requests": len(latencies),
+            "errors": workload.errors[route_name],
+            "throughput": len(latencies) / elapsed_seconds,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+        for route_name, latencies in sorted(workload.latencies.items())
+    }
+
+
+def find_regressions(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Compare the per route results of each concurrency level with a baseline run.
+    """
+    regressions = []
+    for level, routes in results.items():
+        for route_name, stats in routes.items():
+            baseline_stats = baseline.get(level, {}).get(route_name)
+            if not baseline_stats:
+                continue
+            if stats["p95_ms"] > baseline_stats["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{route_name} at concurrency {level}: p95 "
+                    f"{baseline_stats['p95_ms']:.1f}ms -> {stats['p95_ms']:.1f}ms"
+                )
+            if stats["throughput"] < baseline_stats["throughput"] * (1 - tolerance):
+                regressions.append(
+                    f"{route_name} at concurrency {level}: throughput "
+                    f"{baseline_stats['throughput']:.0f}/s -> {stats['throughput']:.0f}/s"
+                )
+    return regressions
+
+
+def print_results(results: dict[str, dict[str, dict[str, float]]]) -> None:
+    print(f"\n{'concurrency':>11} {'route':<32} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for level, routes in results.items():
+        for route_name, stats in routes.items():
+            print(
+                f"{level:>11} {route_name:<32} {stats['throughput']:>8.1f} {stats['p50_ms']:>8.2f} "
+                f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['errors']:>6}"
+            )
+
+
+async def start_app() -> typing.Any:
+    from src.main import initialize_application
+
+    app = initialize_application()
+    lifespan = LifespanManager(app, startup_timeout=60, shutdown_timeout=60)
+    try:
+        await lifespan.__aenter__()
+    except Exception as e:
+        pytest.skip(f"Requires the local database: {e}")
+    return app, lifespan
+
+
+def test_find_regressions_flags_slower_routes_only():
+    baseline = {"10": {"account:get_account_by_id": {"p95_ms": 10.0, "throughput": 100.0}}}
+    results = {
+        "10": {
+            "account:get_account_by_id": {"p95_ms": 13.0, "throughput": 70.0},
+            "account:create_account": {"p95_ms": 50.0, "throughput": 10.0},
+        }
+    }
+
+    regressions = find_regressions(results, baseline, tolerance=0.2)
+
+    assert len(regressions) == 2
+    assert all(regression.startswith("account:get_account_by_id at concurrency 10") for regression in regressions)
+    assert find_regressions(results, baseline, tolerance=0.5) == []
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_account_api_mixed_workload():
+    app, lifespan = await start_app()
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            workload = Workload(client, seed=42)
+            await workload.seed(SEED_ACCOUNTS)
+            try:
+                for level in CONCURRENCY_LEVELS:
+                    workload.latencies.clear()
+                    workload.errors.clear()
+                    elapsed_seconds = await workload.run(concurrency=level, requests=REQUESTS_PER_LEVEL)
+                    results[str(level)] = summarize(workload, elapsed_seconds)
+            finally:
+                await workload.cleanup()
+    finally:
+        await lifespan.__aexit__(None, None, None)
+
+    print_results(results)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    results_file = RESULTS_DIR / f"account_api_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    results_file.write_text(
+        json.dumps(
+            {
+                "requests_per_level": REQUESTS_PER_LEVEL,
+                "workload_mix": WORKLOAD_MIX,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+    print(f"Results written to {results_file}")
+
+    assert all(stats["errors"] == 0 for routes in results.values() for stats in routes.values())
+    if BASELINE:
+        baseline = json.loads(pathlib.Path(BASELINE).read_text())["results"]
+        regressions = find_regressions(results, baseline, tolerance=REGRESSION_TOLERANCE)
+        assert not regressions, "Regressions against the baseline:\n" + "\n".join(regressions)
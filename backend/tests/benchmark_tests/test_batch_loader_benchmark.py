@@ -0,0 +1,111 @@
+"""
+Concurrent point reads of accounts, each on its own query versus batched by the account loader.
+
+Runs against the database of the current `ENVIRONMENT` and reports lookups and queries per second of both. The
+queries are counted with the `db_query_duration_seconds` metric.
+"""
+
+import asyncio
+import os
+import random
+import time
+import uuid
+
+import pytest
+import sqlalchemy
+
+from src.crud import account_crud
+from src.models.db_tables.account_table import Account
+from src.utility.database.db_class import db
+from src.utility.database.db_session import open_async_read_session
+from src.utility.metrics.metrics_registry import DB_QUERY_DURATION
+
+CONCURRENCY = int(os.getenv("BENCHMARK_BATCH_CONCURRENCY", "100"))
+LOOKUPS = int(os.getenv("BENCHMARK_BATCH_LOOKUPS", "5000"))
+SEED_ACCOUNTS = int(os.getenv("BENCHMARK_BATCH_SEED_ACCOUNTS", "1000"))
+
+
+def count_select_queries() -> int:
+    series = DB_QUERY_DURATION.values.get(("select",))
+    return series[2] if series else 0
+
+
+async def seed_accounts() -> list[int]:
+    run_id = uuid.uuid4().hex[:8]
+    insert_stmt = (
+        sqlalchemy.insert(Account)
+        .values(
+            [
+                {"username": f"batch{run_id}{index}", "email": f"batch{run_id}{index}@gmx.de", "password": "unused"}
+                for index in range(SEED_ACCOUNTS)
+            ]
+        )
+        .returning(Account.id)
+    )
+    async with db.async_session() as db_session:
+        ids = list((await db_session.execute(insert_stmt)).scalars().all())
+        await db_session.commit()
+    return ids
+
+
+async def delete_accounts(ids: list[int]) -> None:
+    async with db.async_session() as db_session:
+        await account_crud.delete_many_by_ids(ids, db_session)
+
+
+async def lookup_one_query_each(id: int) -> Account | None:
+    async with open_async_read_session() as db_session:
+        accounts = await account_crud.get_many_by_ids([id], db_session)
+        return accounts[0] if accounts else None
+
+
+async def lookup_batched(id: int) -> Account | None:
+    return await account_crud.get_account_loader().load(id)
+
+
+async def run(lookup, ids: list[int]) -> dict[str, float]:
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for id in ids:
+        queue.put_nowait(id)
+
+    async def worker() -> None:
+        while not queue.empty():
+            assert await lookup(queue.get_nowait()) is not None
+
+    queries_before = count_select_queries()
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    elapsed_seconds = time.perf_counter() - started_at
+    queries = count_select_queries() - queries_before
+    return {
+        "lookups_per_second": len(ids) / elapsed_seconds,
+        "queries_per_second": queries / elapsed_seconds,
+        "queries": queries,
+    }
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_batched_point_reads_need_fewer_queries():
+    try:
+        account_ids = await seed_accounts()
+    except Exception as e:
+        pytest.skip(f"Requires the local database: {e}")
+
+    try:
+        ids = random.Random(42).choices(account_ids, k=LOOKUPS)
+        one_query_each = await run(lookup_one_query_each, ids)
+        batched = await run(lookup_batched, ids)
+    finally:
+        await delete_accounts(account_ids)
+        await db.dispose(drain_timeout=1)
+
+    print(f"\n{LOOKUPS} lookups of {SEED_ACCOUNTS} accounts at concurrency {CONCURRENCY}")
+    for name, result in (("one query each", one_query_each), ("batched", batched)):
+        print(
+            f"{name:>15}: {result['lookups_per_second']:>8.0f} lookups/s, "
+            f"{result['queries_per_second']:>8.0f} queries/s, {result['queries']:.0f} queries"
+        )
+
+    assert batched["queries"] < one_query_each["queries"]
+    assert batched["lookups_per_second"] > one_query_each["lookups_per_second"]
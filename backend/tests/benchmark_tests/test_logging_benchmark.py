@@ -0,0 +1,89 @@
+"""
+Request throughput of an in-process app that logs like the CRUD layer, with logging disabled, with
+the synchronous development sink and with the non-blocking production sink.
+
+Log records are written to a stream with a fixed write latency, standing in for a pipe to a log
+collector or a busy disk.
+"""
+
+import asyncio
+import io
+import os
+import sys
+import time
+
+import httpx
+import loguru
+import pytest
+from fastapi import FastAPI
+
+from src.config.logging import add_development_sink, add_production_sink
+from src.utility.middleware.request_context import RequestContextMiddleware
+
+REQUESTS = int(os.getenv("BENCHMARK_LOGGING_REQUESTS", "300"))
+CONCURRENCY = int(os.getenv("BENCHMARK_LOGGING_CONCURRENCY", "10"))
+WRITE_LATENCY_SECONDS = float(os.getenv("BENCHMARK_LOGGING_WRITE_LATENCY_SECONDS", "0.0001"))
+LOGS_PER_REQUEST = 5
+
+
+class SlowStream(io.StringIO):
+    def write(self, message: str) -> int:
+        time.sleep(WRITE_LATENCY_SECONDS)
+        return len(message)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/account/{id}")
+    async def get_account(id: int) -> dict:
+        for _ in range(LOGS_PER_REQUEST):
+            loguru.logger.info("* fetching account by id")
+        return {"id": id}
+
+    return app
+
+
+async def measure_throughput(app: FastAPI) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+
+        async def worker(requests: int) -> None:
+            for id in range(requests):
+                response = await client.get(f"/account/{id}")
+                assert response.status_code == 200
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(worker(REQUESTS // CONCURRENCY) for _ in range(CONCURRENCY)))
+        return (REQUESTS // CONCURRENCY) * CONCURRENCY / (time.perf_counter() - started_at)
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_logging_throughput():
+    app = build_app()
+    throughput: dict[str, float] = {}
+
+    try:
+        loguru.logger.remove()
+        throughput["disabled"] = await measure_throughput(app)
+
+        add_development_sink(SlowStream())
+        throughput["development"] = await measure_throughput(app)
+        loguru.logger.remove()
+
+        add_production_sink(SlowStream(), sample_rate=1.0)
+        throughput["production"] = await measure_throughput(app)
+        loguru.logger.remove()
+
+        add_production_sink(SlowStream(), sample_rate=0.1)
+        throughput["production sampled"] = await measure_throughput(app)
+    finally:
+        loguru.logger.remove()
+        loguru.logger.add(sys.stderr)
+
+    loguru.logger.info(
+        "Requests per second with logging: "
+        + ", ".join(f"{mode} {requests_per_second:.0f}" for mode, requests_per_second in throughput.items())
+    )
+    assert throughput["production"] > throughput["development"]
@@ -0,0 +1,63 @@
+"""
+Event loop responsiveness during a signup burst.
+
+Concurrent GET requests are simulated by coroutines that measure how long they wait for the event
+loop, while a burst of signups hashes passwords either on the event loop itself or through the
+`PasswordHasher` worker pool.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+import loguru
+import pytest
+
+from src.utility.security.password_hashing import PasswordHasher
+
+SIGNUP_BURST_SIZE = int(os.getenv("BENCHMARK_SIGNUP_BURST_SIZE", "8"))
+CONCURRENT_GETS = int(os.getenv("BENCHMARK_CONCURRENT_GETS", "20"))
+P99_BUDGET_SECONDS = float(os.getenv("BENCHMARK_HASHING_P99_BUDGET_SECONDS", "0.05"))
+
+
+def p99(latencies: list[float]) -> float:
+    return statistics.quantiles(latencies, n=100)[98]
+
+
+async def measure_get_latencies(signup_burst: asyncio.Future) -> list[float]:
+    latencies: list[float] = []
+
+    async def simulated_get() -> None:
+        while not signup_burst.done():
+            started_at = time.perf_counter()
+            await asyncio.sleep(0.001)
+            latencies.append(time.perf_counter() - started_at - 0.001)
+
+    await asyncio.gather(*(simulated_get() for _ in range(CONCURRENT_GETS)), signup_burst)
+    return latencies
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_get_latency_stays_flat_during_signup_burst():
+    hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1, max_workers=2)
+    await hasher.hash("Warmup1234!")
+
+    async def blocking_signup_burst() -> None:
+        for _ in range(SIGNUP_BURST_SIZE):
+            hasher._hasher.hash("Test1234!")
+            await asyncio.sleep(0)
+
+    async def pooled_signup_burst() -> None:
+        await asyncio.gather(*(hasher.hash("Test1234!") for _ in range(SIGNUP_BURST_SIZE)))
+
+    try:
+        blocking_p99 = p99(await measure_get_latencies(asyncio.ensure_future(blocking_signup_burst())))
+        pooled_p99 = p99(await measure_get_latencies(asyncio.ensure_future(pooled_signup_burst())))
+    finally:
+        hasher.shutdown()
+
+    loguru.logger.info(f"GET p99 during signup burst: on event loop {blocking_p99:.4f}s, on pool {pooled_p99:.4f}s")
+    assert pooled_p99 < blocking_p99
+    assert pooled_p99 < P99_BUDGET_SECONDS
@@ -0,0 +1,48 @@
+"""
+Compare the schema based response path with the compiled ORM serializer for a single account and a
+page of accounts.
+
+The schema path mirrors what the account handlers did before: build `AccountOut` from the ORM
+object, validate it again as `response_model` and render it with `JSONResponse`.
+"""
+
+import os
+import timeit
+
+import loguru
+import pydantic
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from src.models.schemas.account_schema import AccountOut
+from src.utility.pydantic_schema.orm_serializer import compile_orm_serializer
+from tests.utility_tests.test_orm_serializer import build_account
+
+ROUNDS = int(os.getenv("BENCHMARK_SERIALIZATION_ROUNDS", "50"))
+PAGE_SIZE = int(os.getenv("BENCHMARK_SERIALIZATION_PAGE_SIZE", "100"))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("page_size", [1, PAGE_SIZE], ids=["single", "list"])
+def test_orm_serializer_is_faster_than_schema_path(page_size: int):
+    accounts = [build_account(id) for id in range(page_size)]
+    response_adapter = pydantic.TypeAdapter(list[AccountOut])
+    serialize_account_out = compile_orm_serializer(AccountOut)
+
+    def schema_path() -> bytes | memoryview:
+        models = [AccountOut(**account.__dict__) for account in accounts]
+        validated = response_adapter.validate_python(models, from_attributes=True)
+        return JSONResponse(content=response_adapter.dump_python(validated, mode="json", by_alias=True)).body
+
+    def orm_serializer_path() -> bytes | memoryview:
+        return ORJSONResponse(content=[serialize_account_out(account) for account in accounts]).body
+
+    assert schema_path() == orm_serializer_path()
+    schema_seconds = min(timeit.repeat(schema_path, number=ROUNDS, repeat=3)) / ROUNDS
+    orm_serializer_seconds = min(timeit.repeat(orm_serializer_path, number=ROUNDS, repeat=3)) / ROUNDS
+
+    loguru.logger.info(
+        f"{page_size} account(s): schema path {schema_seconds * 1e6:.1f}us, "
+        f"ORM serializer {orm_serializer_seconds * 1e6:.1f}us ({schema_seconds / orm_serializer_seconds:.1f}x)"
+    )
+    assert orm_serializer_seconds < schema_seconds
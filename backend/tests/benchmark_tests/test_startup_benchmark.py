@@ -0,0 +1,77 @@
+"""
+Cold start of the backend: the time to import `src.main` and the time until the first request is served.
+
+Each round runs in a fresh interpreter. The first request goes through the full middleware stack of the
+app, the lifespan (schema check and pool warmup) is not part of it since it needs a database.
+"""
+
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+ROUNDS = int(os.getenv("BENCHMARK_STARTUP_ROUNDS", "3"))
+IMPORT_BUDGET_SECONDS = float(os.getenv("BENCHMARK_IMPORT_BUDGET_SECONDS", "1.5"))
+FIRST_REQUEST_BUDGET_SECONDS = float(os.getenv("BENCHMARK_FIRST_REQUEST_BUDGET_SECONDS", "2.0"))
+BACKEND_DIR = pathlib.Path(__file__).parent.parent.parent.resolve()
+
+COLD_START_SCRIPT = """
+import asyncio, json, time
+started_at = time.perf_counter()
+
+import src.main
+
+imported_at = time.perf_counter()
+
+from src.config.settings.setup import get_settings
+from src.utility.database.db_class import db
+
+created_on_import = {"engine": db._async_engine is not None, "settings": get_settings.cache_info().currsize > 0}
+
+import httpx
+
+async def first_request() -> int:
+    transport = httpx.ASGITransport(app=src.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return (await client.get("/metrics")).status_code
+
+status_code = asyncio.run(first_request())
+print(json.dumps({
+    "import_seconds": imported_at - started_at,
+    "first_request_seconds": time.perf_counter() - started_at,
+    "status_code": status_code,
+    "created_on_import": created_on_import,
+}))
+"""
+
+
+def measure_cold_start() -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.benchmark
+def test_cold_start_stays_within_budget():
+    rounds = [measure_cold_start() for _ in range(ROUNDS)]
+    import_seconds = min(result["import_seconds"] for result in rounds)
+    first_request_seconds = min(result["first_request_seconds"] for result in rounds)
+    print(
+        f"\nCold start over {ROUNDS} rounds, best: import {import_seconds * 1000:.0f}ms, "
+        f"first request {first_request_seconds * 1000:.0f}ms"
+    )
+
+    # Importing the app must neither read the settings nor create an engine
+    assert all(result["created_on_import"] == {"engine": False, "settings": False} for result in rounds)
+    assert all(result["status_code"] == 200 for result in rounds)
+    assert import_seconds < IMPORT_BUDGET_SECONDS
+    assert first_request_seconds < FIRST_REQUEST_BUDGET_SECONDS
@@ -0,0 +1,56 @@
+"""
+Compare the per-request statement overhead of building the account lookups on every call, as `account_crud` did
+before, with executing its prebuilt statements.
+
+Both run through the ORM against an in-memory SQLite database, so the difference is the building of the statement
+and of its cache key, which the prebuilt statement memoizes. Both hit the compiled cache of the engine.
+"""
+
+import os
+import timeit
+import typing
+
+import loguru
+import pytest
+import sqlalchemy
+from sqlalchemy.orm import Session
+
+from src.crud.account_crud import _SELECT_ACCOUNT_BY_USERNAME, _SELECT_ACCOUNT_PAGE_AFTER
+from src.models.db_tables.account_table import Account
+
+ROUNDS = int(os.getenv("BENCHMARK_STATEMENT_ROUNDS", "500"))
+
+
+@pytest.fixture
+def session() -> typing.Iterator[Session]:
+    engine = sqlalchemy.create_engine("sqlite://")
+    typing.cast(sqlalchemy.Table, Account.__table__).create(engine)
+    with Session(engine) as session:
+        session.add(Account(id=1, username="statementBenchmark", email="statementBenchmark@gmx.de", password="x"))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+@pytest.mark.benchmark
+def test_prebuilt_statements_are_faster_than_building_them_per_request(session: Session):
+    def built_per_request() -> tuple[Account, Account]:
+        page = sqlalchemy.select(Account).order_by(Account.id).limit(1).where(Account.id > 0)
+        by_username = sqlalchemy.select(Account).where(Account.username == "statementBenchmark")
+        return session.execute(page).scalar_one(), session.execute(by_username).scalar_one()
+
+    def prebuilt() -> tuple[Account, Account]:
+        return (
+            session.execute(_SELECT_ACCOUNT_PAGE_AFTER, {"after": 0, "limit": 1}).scalar_one(),
+            session.execute(_SELECT_ACCOUNT_BY_USERNAME, {"username": "statementBenchmark"}).scalar_one(),
+        )
+
+    assert built_per_request() == prebuilt()
+    built_seconds = min(timeit.repeat(built_per_request, number=ROUNDS, repeat=3)) / ROUNDS
+    prebuilt_seconds = min(timeit.repeat(prebuilt, number=ROUNDS, repeat=3)) / ROUNDS
+
+    loguru.logger.info(
+        f"2 lookups per request: built per request {built_seconds * 1e6:.1f}us, "
+        f"prebuilt {prebuilt_seconds * 1e6:.1f}us ({built_seconds / prebuilt_seconds:.2f}x)"
+    )
+    assert prebuilt_seconds < built_seconds
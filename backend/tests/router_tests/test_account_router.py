@@ -1,7 +1,12 @@
+import asyncio
+import json
+
 import loguru
 import pytest
 from httpx import AsyncClient
 
+from src.utility.middleware.query_stats import QUERY_COUNT_HEADER
+
 
 @pytest.mark.asyncio
 async def test_get_all_accounts(async_client: AsyncClient):
@@ -51,8 +56,9 @@ async def test_create_account_username_must_be_unique(async_client: AsyncClient)
         "/v1/account",
         json={"username": "notUnique", "email": "test1@gnx.de", "password": "Test1234!"},  # username already exists
     )
-    # THEN: I should get a 409 Conflict response
+    # THEN: I should get a 409 Conflict response naming the username
     assert response.status_code == 409
+    assert response.json()["detail"] == "Username notUnique already in use"
 
 
 @pytest.mark.asyncio
@@ -67,8 +73,9 @@ async def test_create_account_invalid_email(async_client: AsyncClient):
         json={"username": "tcaie1", "email": "notUnique@gmx.de", "password": "Test1234!"},  # email already exists
     )
     loguru.logger.debug(response.json())
-    # THEN: I should get a 409 Conflict response
+    # THEN: I should get a 409 Conflict response naming the email
     assert response.status_code == 409
+    assert response.json()["detail"] == "Email notUnique@gmx.de already in use"
 
 
 @pytest.mark.asyncio
@@ -165,3 +172,329 @@ async def test_delete_account_by_id_not_found(async_client: AsyncClient):
     # THEN: I should get a 404 Not Found response
     assert response.status_code == 404
     assert "not found" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "taken, update_data, detail",
+    [
+        (
+            "updateClashName",
+            {"username": "updateClashName", "email": "updateClashNameOther@gmx.de"},
+            "Username updateClashName already in use",
+        ),
+        (
+            "updateClashMail",
+            {"username": "updateClashMailOther", "email": "updateClashMail@gmx.de"},
+            "Email updateClashMail@gmx.de already in use",
+        ),
+    ],
+)
+async def test_update_account_by_id_must_keep_username_and_email_unique(
+    async_client: AsyncClient, taken: str, update_data: dict, detail: str
+):
+    # GIVEN: An account whose username and email are taken, and another account
+    other = f"{taken}Other"
+    for username in (taken, other):
+        response = await async_client.post(
+            "/v1/account", json={"username": username, "email": f"{username}@gmx.de", "password": "Test1234!"}
+        )
+        assert response.status_code == 201
+    account_id = response.json()["id"]
+
+    # WHEN: I update the other account with the taken username or email
+    response = await async_client.put(f"/v1/account/{account_id}", json=update_data)
+
+    # THEN: I should get a 409 Conflict response naming the clashing value, and the account should be unchanged
+    assert response.status_code == 409
+    assert response.json()["detail"] == detail
+    response = await async_client.get(f"/v1/account/{account_id}")
+    assert response.json()["username"] == other
+    assert response.json()["email"] == f"{other}@gmx.de"
+
+
+@pytest.mark.asyncio
+async def test_delete_account_by_id_twice(async_client: AsyncClient):
+    # GIVEN: An account that has been deleted
+    response = await async_client.post(
+        "/v1/account", json={"username": "deleteTwice", "email": "deleteTwice@gmx.de", "password": "Test1234!"}
+    )
+    account_id = response.json()["id"]
+    response = await async_client.delete(f"/v1/account/{account_id}")
+    assert response.json() == {"isDeleted": True}
+
+    # WHEN: I delete and update it again
+    deleted_again = await async_client.delete(f"/v1/account/{account_id}")
+    updated = await async_client.put(
+        f"/v1/account/{account_id}", json={"username": "deleteTwiceUpdated", "email": "deleteTwiceUpdated@gmx.de"}
+    )
+
+    # THEN: Both should get a 404 Not Found response, and the account should stay gone
+    assert deleted_again.status_code == 404
+    assert updated.status_code == 404
+    assert (await async_client.get(f"/v1/account/{account_id}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_all_accounts_paginated(async_client: AsyncClient):
+    # GIVEN: At least two existing accounts in the database
+    for username in ("pageOne", "pageTwo"):
+        response = await async_client.post(
+            "/v1/account", json={"username": username, "email": f"{username}@gmx.de", "password": "Test1234!"}
+        )
+        assert response.status_code == 201
+
+    # WHEN: I request the first page with a limit of one
+    first_page = await async_client.get("/v1/account", params={"limit": 1})
+
+    # THEN: I should get a single account and a cursor pointing to the next page
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 1
+    next_cursor = first_page.headers["X-Next-Cursor"]
+    assert next_cursor == str(first_page.json()[0]["id"])
+
+    # WHEN: I request the next page with the returned cursor
+    second_page = await async_client.get("/v1/account", params={"limit": 1, "after": next_cursor})
+
+    # THEN: I should get the account following the cursor
+    assert second_page.status_code == 200
+    assert len(second_page.json()) == 1
+    assert second_page.json()[0]["id"] > first_page.json()[0]["id"]
+
+
+@pytest.mark.asyncio
+async def test_stream_accounts(async_client: AsyncClient):
+    # GIVEN: An existing account in the database
+    response = await async_client.post(
+        "/v1/account", json={"username": "streamTest", "email": "streamTest@gmx.de", "password": "Test1234!"}
+    )
+    assert response.status_code == 201
+
+    # WHEN: I stream all accounts
+    response = await async_client.get("/v1/account/stream")
+
+    # THEN: I should get one JSON document per line, ordered by id
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    accounts = [json.loads(line) for line in response.text.splitlines()]
+    assert "streamTest" in [account["username"] for account in accounts]
+    assert [account["id"] for account in accounts] == sorted(account["id"] for account in accounts)
+
+
+@pytest.mark.asyncio
+async def test_create_accounts_bulk_reports_conflicts(async_client: AsyncClient):
+    # GIVEN: An existing account with username "bulkTaken"
+    response = await async_client.post(
+        "/v1/account", json={"username": "bulkTaken", "email": "bulkTaken@gmx.de", "password": "Test1234!"}
+    )
+    assert response.status_code == 201
+
+    # WHEN: I create several accounts at once, one of them clashing with the existing account
+    response = await async_client.post(
+        "/v1/account/bulk",
+        json=[
+            {"username": "bulkOne", "email": "bulkOne@gmx.de", "password": "Test1234!"},
+            {"username": "bulkTaken", "email": "bulkOther@gmx.de", "password": "Test1234!"},
+            {"username": "bulkTwo", "email": "bulkTwo@gmx.de", "password": "Test1234!"},
+        ],
+    )
+
+    # THEN: I should get one result per item with the clashing item reported as conflict
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["isCreated"] for result in results] == [True, False, True]
+    assert results[0]["account"]["username"] == "bulkOne"
+    assert results[1]["account"] is None
+    assert results[1]["detail"] == "Username bulkTaken already in use"
+
+
+@pytest.mark.asyncio
+async def test_account_responses_never_contain_the_password(async_client: AsyncClient):
+    # GIVEN: Accounts created one by one and in bulk
+    response = await async_client.post(
+        "/v1/account", json={"username": "noPassword", "email": "noPassword@gmx.de", "password": "Test1234!"}
+    )
+    assert response.status_code == 201
+    account_id = response.json()["id"]
+    bulk_response = await async_client.post(
+        "/v1/account/bulk", json=[{"username": "noPasswordBulk", "email": "noPwBulk@gmx.de", "password": "Test1234!"}]
+    )
+
+    # WHEN: I read them through every account route
+    responses = [
+        response,
+        bulk_response,
+        await async_client.get("/v1/account"),
+        await async_client.get(f"/v1/account/{account_id}"),
+        await async_client.get("/v1/account", params={"ids": [account_id]}),
+        await async_client.get("/v1/account/search", params={"username": "noPassword"}),
+        await async_client.get("/v1/account/stream"),
+        await async_client.put(f"/v1/account/{account_id}", json={"username": "noPasswordUpdated"}),
+    ]
+
+    # THEN: None of them should contain the password or its hash
+    for response in responses:
+        assert response.status_code in (200, 201)
+        assert "password" not in response.text.lower()
+        assert "$argon2" not in response.text
+
+
+@pytest.mark.asyncio
+async def test_get_accounts_by_ids(async_client: AsyncClient):
+    # GIVEN: An existing account in the database and a non-existent account ID
+    response = await async_client.post(
+        "/v1/account", json={"username": "byIds", "email": "byIds@gmx.de", "password": "Test1234!"}
+    )
+    assert response.status_code == 201
+    account_id = response.json()["id"]
+    non_existent_id = 9999
+
+    # WHEN: I get both accounts by their IDs
+    response = await async_client.get("/v1/account", params={"ids": [account_id, non_existent_id]})
+
+    # THEN: I should get the existing account and the missing ID reported in a header
+    assert response.status_code == 200
+    assert [account["id"] for account in response.json()] == [account_id]
+    assert response.headers["X-Missing-Ids"] == str(non_existent_id)
+
+
+@pytest.mark.asyncio
+async def test_delete_accounts_bulk(async_client: AsyncClient):
+    # GIVEN: An existing account in the database and a non-existent account ID
+    response = await async_client.post(
+        "/v1/account", json={"username": "bulkDelete", "email": "bulkDelete@gmx.de", "password": "Test1234!"}
+    )
+    assert response.status_code == 201
+    account_id = response.json()["id"]
+    non_existent_id = 9999
+
+    # WHEN: I delete both accounts at once
+    response = await async_client.request("DELETE", "/v1/account/bulk", json={"ids": [account_id, non_existent_id]})
+
+    # THEN: I should get one result per ID
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": account_id, "isDeleted": True},
+        {"id": non_existent_id, "isDeleted": False},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_accounts_by_username_prefix_and_email(async_client: AsyncClient):
+    # GIVEN: Two accounts sharing a username prefix and one account with another prefix
+    for username in ("searchPrefixA", "searchPrefixB", "searchOther"):
+        response = await async_client.post(
+            "/v1/account", json={"username": username, "email": f"{username}@gmx.de", "password": "Test1234!"}
+        )
+        assert response.status_code == 201
+
+    # WHEN: I search by the shared username prefix, one account per page
+    first_page = await async_client.get("/v1/account/search", params={"username": "searchPrefix", "limit": 1})
+    second_page = await async_client.get(
+        "/v1/account/search",
+        params={"username": "searchPrefix", "limit": 1, "after": first_page.headers["X-Next-Cursor"]},
+    )
+
+    # THEN: I should get the accounts with that prefix in id order
+    assert first_page.status_code == 200
+    assert second_page.status_code == 200
+    assert [account["username"] for account in first_page.json() + second_page.json()] == [
+        "searchPrefixA",
+        "searchPrefixB",
+    ]
+
+    # WHEN: I search by email in another case, filtered on a flag
+    response = await async_client.get(
+        "/v1/account/search", params={"email": "SEARCHOTHER@gmx.de", "is_admin": False, "is_verified": False}
+    )
+
+    # THEN: I should get the account with that email
+    assert response.status_code == 200
+    assert [account["username"] for account in response.json()] == ["searchOther"]
+
+
+@pytest.mark.asyncio
+async def test_search_accounts_without_match(async_client: AsyncClient):
+    # WHEN: I search for a username prefix no account has
+    response = await async_client.get("/v1/account/search", params={"username": "noSuchPrefix", "is_admin": True})
+
+    # THEN: I should get an empty list
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_count_accounts(async_client: AsyncClient):
+    # GIVEN: An existing account in the database
+    response = await async_client.post(
+        "/v1/account", json={"username": "countTest", "email": "countTest@gmx.de", "password": "Test1234!"}
+    )
+    assert response.status_code == 201
+
+    # WHEN: I count the accounts exactly and approximately
+    exact = await async_client.get("/v1/account/count", params={"mode": "exact"})
+    approximate = await async_client.get("/v1/account/count")
+
+    # THEN: I should get the count and the mode that was used
+    assert exact.status_code == 200
+    assert exact.json()["mode"] == "exact"
+    assert exact.json()["count"] >= 1
+    # AND: A small table is counted exactly even when an approximate count is requested
+    assert approximate.status_code == 200
+    assert approximate.json() == {"count": exact.json()["count"], "mode": "exact"}
+
+
+@pytest.mark.asyncio
+async def test_account_routes_stay_within_their_query_budget(async_client: AsyncClient):
+    # GIVEN: An existing account
+    response = await async_client.post(
+        "/v1/account", json={"username": "queryBudget", "email": "queryBudget@gmx.de", "password": "Test1234!"}
+    )
+    assert response.status_code == 201
+    account_id = response.json()["id"]
+
+    # WHEN: I read and update it
+    read_response = await async_client.get(f"/v1/account/{account_id}")
+    update_response = await async_client.put(f"/v1/account/{account_id}", json={"username": "queryBudgetUpdated"})
+
+    # THEN: Each route should execute a single statement
+    assert int(read_response.headers[QUERY_COUNT_HEADER]) <= 1
+    assert int(update_response.headers[QUERY_COUNT_HEADER]) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_account_changes(async_client: AsyncClient):
+    # GIVEN: An open stream of the account changes
+    async with async_client.stream("GET", "/v1/account/changes") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        lines = response.aiter_lines()
+        assert await anext(lines) == ": connected"
+
+        # WHEN: An account is created and deleted
+        created = await async_client.post(
+            "/v1/account", json={"username": "changeFeed", "email": "changeFeed@gmx.de", "password": "Test1234!"}
+        )
+        account_id = created.json()["id"]
+        await async_client.delete(f"/v1/account/{account_id}")
+
+        # THEN: Both changes should be streamed, with the created account but without its password
+        events: list[tuple[str, dict]] = []
+
+        async def read_events() -> None:
+            event_type = ""
+            while ("delete", {"id": account_id}) not in events:
+                line = await anext(lines)
+                if line.startswith("event: "):
+                    event_type = line.removeprefix("event: ")
+                elif line.startswith("data: "):
+                    data = json.loads(line.removeprefix("data: "))
+                    if data.get("id") == account_id:
+                        events.append((event_type, data))
+
+        await asyncio.wait_for(read_events(), timeout=5)
+        (create_event, create_data), (delete_event, delete_data) = events
+        assert create_event == "create" and create_data["username"] == "changeFeed"
+        assert "password" not in create_data
+        assert delete_event == "delete" and delete_data == {"id": account_id}
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_login_refresh_and_logout(async_client: AsyncClient):
+    # GIVEN: An existing account
+    response = await async_client.post(
+        "/v1/account", json={"username": "authFlow", "email": "authFlow@gmx.de", "password": "Test1234!"}
+    )
+    assert response.status_code == 201
+
+    # WHEN: I log in with its credentials
+    response = await async_client.post("/v1/auth/login", json={"username": "authFlow", "password": "Test1234!"})
+
+    # THEN: I should get an access and a refresh token authenticating me
+    assert response.status_code == 200
+    tokens = response.json()
+    assert tokens["tokenType"] == "bearer"
+    response = await async_client.get("/v1/auth/me", headers={"Authorization": f"Bearer {tokens['accessToken']}"})
+    assert response.status_code == 200
+    assert response.json()["username"] == "authFlow"
+
+    # WHEN: I refresh the tokens
+    response = await async_client.post("/v1/auth/refresh", json={"refreshToken": tokens["refreshToken"]})
+
+    # THEN: I should get new tokens, and the used refresh token should not work again
+    assert response.status_code == 200
+    refreshed_tokens = response.json()
+    response = await async_client.post("/v1/auth/refresh", json={"refreshToken": tokens["refreshToken"]})
+    assert response.status_code == 401
+
+    # WHEN: I log out
+    headers = {"Authorization": f"Bearer {refreshed_tokens['accessToken']}"}
+    response = await async_client.post(
+        "/v1/auth/logout", headers=headers, json={"refreshToken": refreshed_tokens["refreshToken"]}
+    )
+
+    # THEN: Neither the access token nor the refresh token should work anymore, not even after logging in again
+    assert response.status_code == 204
+    assert (await async_client.get("/v1/auth/me", headers=headers)).status_code == 401
+    response = await async_client.post("/v1/auth/login", json={"username": "authFlow", "password": "Test1234!"})
+    assert response.status_code == 200
+    response = await async_client.post("/v1/auth/refresh", json={"refreshToken": refreshed_tokens["refreshToken"]})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_with_the_same_token(async_client: AsyncClient):
+    # GIVEN: A logged in account
+    await async_client.post(
+        "/v1/account", json={"username": "authRace", "email": "authRace@gmx.de", "password": "Test1234!"}
+    )
+    response = await async_client.post("/v1/auth/login", json={"username": "authRace", "password": "Test1234!"})
+    refresh_token = response.json()["refreshToken"]
+
+    # WHEN: I refresh with the same refresh token concurrently
+    responses = await asyncio.gather(
+        *(async_client.post("/v1/auth/refresh", json={"refreshToken": refresh_token}) for _ in range(5))
+    )
+
+    # THEN: Only one refresh should get new tokens
+    assert sorted(response.status_code for response in responses) == [200, 401, 401, 401, 401]
+
+
+@pytest.mark.asyncio
+async def test_login_with_wrong_password(async_client: AsyncClient):
+    # GIVEN: An existing account
+    await async_client.post(
+        "/v1/account", json={"username": "authWrong", "email": "authWrong@gmx.de", "password": "Test1234!"}
+    )
+
+    # WHEN: I log in with a wrong password
+    response = await async_client.post("/v1/auth/login", json={"username": "authWrong", "password": "Wrong1234!"})
+
+    # THEN: I should get a 401 Unauthorized response
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_with_unknown_username(async_client: AsyncClient):
+    # WHEN: I log in with a username that does not exist
+    response = await async_client.post("/v1/auth/login", json={"username": "authUnknown", "password": "Test1234!"})
+
+    # THEN: I should get the same 401 Unauthorized response as for a wrong password
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid username or password"
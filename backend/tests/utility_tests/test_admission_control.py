@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import fastapi
+import httpx
+import pytest
+
+from src.utility.middleware.admission_control import AdmissionBudget, AdmissionControlMiddleware, parse_route_limits
+
+POOL_SIZE = 4
+POOL_TIMEOUT_SECONDS = 0.5
+QUERY_SECONDS = 0.05
+
+
+def build_app(with_admission_control: bool, route_limits: dict[str, int] | None = None) -> fastapi.FastAPI:
+    """
+    App whose routes hold one of `POOL_SIZE` connections for `QUERY_SECONDS`, failing like the SQLAlchemy pool when
+    no connection is free within `POOL_TIMEOUT_SECONDS`.
+    """
+    app = fastapi.FastAPI()
+    pool = asyncio.Semaphore(POOL_SIZE)
+
+    async def query() -> None:
+        try:
+            await asyncio.wait_for(pool.acquire(), POOL_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise fastapi.HTTPException(status_code=500, detail="QueuePool limit reached, connection timed out")
+        try:
+            await asyncio.sleep(QUERY_SECONDS)
+        finally:
+            pool.release()
+
+    @app.get("/accounts", name="account:get_all_accounts")
+    async def get_accounts() -> dict:
+        await query()
+        return {}
+
+    @app.post("/accounts", name="account:create_account")
+    async def create_account() -> dict:
+        await query()
+        return {}
+
+    @app.get("/metrics", name="metrics:get_metrics")
+    async def get_metrics() -> dict:
+        return {}
+
+    if with_admission_control:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            read_limit=POOL_SIZE,
+            write_limit=1,
+            max_queue=2 * POOL_SIZE,
+            queue_timeout=0.2,
+            retry_after=1,
+            max_pool_waiters=0,
+            route_limits=route_limits,
+        )
+    return app
+
+
+async def overload(app: fastapi.FastAPI, requests: int) -> list[tuple[int, float, httpx.Response]]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+
+        async def timed_request() -> tuple[int, float, httpx.Response]:
+            started_at = time.perf_counter()
+            response = await client.get("/accounts")
+            return response.status_code, time.perf_counter() - started_at, response
+
+        return await asyncio.gather(*(timed_request() for _ in range(requests)))
+
+
+@pytest.mark.asyncio
+async def test_budget_queues_up_to_its_bound_in_arrival_order():
+    # GIVEN: A budget admitting one request and queueing one more
+    budget = AdmissionBudget("read", limit=1, max_queue=1)
+
+    # WHEN: Three requests arrive while the first one is in flight
+    assert await budget.acquire(timeout=1) is None
+    queued = asyncio.create_task(budget.acquire(timeout=1))
+    await asyncio.sleep(0)
+
+    # THEN: The second one should be queued and the third one refused right away
+    assert budget.queued == 1
+    assert await budget.acquire(timeout=1) == "queue_full"
+
+    # AND: Releasing the first one should admit the queued one
+    budget.release()
+    assert await queued is None
+    assert budget.in_flight == 1
+    budget.release()
+    assert budget.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_budget_refuses_after_the_queue_timeout():
+    budget = AdmissionBudget("write", limit=1, max_queue=4)
+    assert await budget.acquire(timeout=1) is None
+
+    assert await budget.acquire(timeout=0.01) == "queue_timeout"
+    assert budget.queued == 0
+    budget.release()
+    assert budget.in_flight == 0
+
+
+def test_parse_route_limits():
+    assert parse_route_limits("") == {}
+    assert parse_route_limits("metrics:get_metrics=0, account:create_accounts_bulk=4") == {
+        "metrics:get_metrics": 0,
+        "account:create_accounts_bulk": 4,
+    }
+
+
+@pytest.mark.asyncio
+async def test_overload_is_shed_with_bounded_latency():
+    # GIVEN: Far more concurrent requests than the pool can serve within its timeout
+    requests = 200
+
+    # WHEN: They hit the app without admission control
+    results = await overload(build_app(with_admission_control=False), requests)
+
+    # THEN: The excess waits for the pool until it times out, and fails only then
+    failed = [latency for status_code, latency, _ in results if status_code == 500]
+    assert len(failed) > requests / 2
+    assert min(failed) >= POOL_TIMEOUT_SECONDS
+
+    # WHEN: They hit the app with admission control
+    results = await overload(build_app(with_admission_control=True), requests)
+
+    # THEN: No request should time out on the pool, the excess is refused quickly with a Retry-After
+    assert {status_code for status_code, _, _ in results} == {200, 503}
+    assert max(latency for _, latency, _ in results) < POOL_TIMEOUT_SECONDS
+    rejected = [response for status_code, _, response in results if status_code == 503]
+    assert rejected
+    assert all(response.headers["Retry-After"] == "1" for response in rejected)
+
+
+@pytest.mark.asyncio
+async def test_routes_use_their_own_budget_or_are_exempt():
+    # GIVEN: An app with a write budget of one and an exempt metrics route
+    app = build_app(with_admission_control=True, route_limits={"metrics:get_metrics": 0})
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # WHEN: Writes and metrics scrapes arrive concurrently
+        responses = await asyncio.gather(
+            *(client.post("/accounts") for _ in range(20)), *(client.get("/metrics") for _ in range(20))
+        )
+
+    # THEN: Only writes should be shed, the exempt route is always served
+    write_statuses = {response.status_code for response in responses[:20]}
+    assert write_statuses == {200, 503}
+    assert all(response.status_code == 200 for response in responses[20:])
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from src.utility.database.batch_loader import BatchLoader
+
+
+class FakeTable:
+    def __init__(self, fail: bool = False):
+        self.batches: list[list[int]] = []
+        self.fail = fail
+        self.versions: dict[int, int] = {}
+        # Set to hold the lookups until it is set
+        self.released: asyncio.Event | None = None
+
+    async def load_many(self, ids: list[int]) -> dict[int, str]:
+        self.batches.append(ids)
+        # Read before waiting, like a query whose snapshot was taken before a concurrent write
+        values = {id: f"account{id}" + "v2" * self.versions.get(id, 0) for id in ids if id < 100}
+        if self.released is not None:
+            await self.released.wait()
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return values
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_batched_and_deduplicated():
+    # GIVEN: A loader over a table
+    table = FakeTable()
+    loader = BatchLoader("test", load_many=table.load_many, max_batch_size=100, window_seconds=0.005)
+
+    # WHEN: 50 concurrent lookups of 10 distinct ids, one of them missing, arrive
+    ids = [id % 10 for id in range(49)] + [100]
+    values = await asyncio.gather(*(loader.load(id) for id in ids))
+
+    # THEN: They should be served by one query over the distinct ids
+    assert table.batches == [[*range(10), 100]]
+    assert values == [f"account{id}" if id < 100 else None for id in ids]
+
+
+@pytest.mark.asyncio
+async def test_lookups_of_a_key_being_loaded_share_its_query():
+    table = FakeTable()
+    table.released = asyncio.Event()
+    loader = BatchLoader("test", load_many=table.load_many, max_batch_size=100, window_seconds=0)
+
+    first = asyncio.create_task(loader.load(1))
+    while not table.batches:
+        await asyncio.sleep(0)
+    second = asyncio.create_task(loader.load(1))
+    await asyncio.sleep(0)
+    table.released.set()
+    assert await asyncio.gather(first, second) == ["account1", "account1"]
+    assert table.batches == [[1]]
+
+
+@pytest.mark.asyncio
+async def test_lookups_after_an_invalidation_do_not_share_the_query_from_before():
+    # GIVEN: A loader whose cache is invalidated by every write, and a lookup being loaded
+    table = FakeTable()
+    table.released = asyncio.Event()
+    epoch = 0
+    loader = BatchLoader("test", load_many=table.load_many, max_batch_size=100, window_seconds=0, epoch=lambda: epoch)
+    before_write = asyncio.create_task(loader.load(1))
+    while not table.batches:
+        await asyncio.sleep(0)
+
+    # WHEN: The row is updated, and looked up again while the first lookup is still loading
+    table.versions[1] = 1
+    epoch += 1
+    after_write = asyncio.create_task(loader.load(1))
+    await asyncio.sleep(0)
+    table.released.set()
+
+    # THEN: The later lookup should read the updated row in a batch of its own
+    assert await asyncio.gather(before_write, after_write) == ["account1", "account1v2"]
+    assert table.batches == [[1], [1]]
+    assert await loader.load(1) == "account1v2"
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_at_the_maximum_size():
+    table = FakeTable()
+    loader = BatchLoader("test", load_many=table.load_many, max_batch_size=4, window_seconds=1)
+
+    await asyncio.gather(*(loader.load(id) for id in range(10)))
+
+    # The full batches are dispatched right away, the last one after the window
+    assert table.batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+@pytest.mark.asyncio
+async def test_a_failed_batch_fails_every_lookup_and_a_cancelled_caller_does_not_cancel_the_others():
+    # GIVEN: A loader over an unavailable table
+    loader = BatchLoader("test", load_many=FakeTable(fail=True).load_many, max_batch_size=100, window_seconds=0)
+
+    # WHEN: Three lookups share a batch and one of the callers is cancelled
+    lookups = [asyncio.create_task(loader.load(id)) for id in (1, 1, 2)]
+    await asyncio.sleep(0)
+    lookups[0].cancel()
+    results = await asyncio.gather(*lookups, return_exceptions=True)
+
+    # THEN: The other callers should get the error of the batch
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert all(isinstance(result, RuntimeError) for result in results[1:])
@@ -0,0 +1,250 @@
+import pytest
+
+from src.utility.cache.cache_backend import (
+    CacheBackend,
+    CacheFullError,
+    CacheUnavailableError,
+    InMemoryCacheBackend,
+    SharedCacheBackend,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LocalSharedCacheClient:
+    """
+    Local stand-in for the Redis client used by `SharedCacheBackend`.
+    """
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    async def get(self, name: str) -> str | None:
+        return self.values.get(name)
+
+    async def set(self, name: str, value: str, ex: int | None = None, nx: bool = False) -> bool | None:
+        if nx and name in self.values:
+            return None
+        self.values[name] = value
+        return True
+
+    async def delete(self, *names: str) -> None:
+        for name in names:
+            self.values.pop(name, None)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_counts_hits_and_misses():
+    # GIVEN: An in-memory cache holding one entry
+    cache = InMemoryCacheBackend(max_size=10, ttl_seconds=60)
+    await cache.set(1, {"username": "cached"})
+
+    # WHEN: I read the cached and an unknown key
+    hit = await cache.get(1)
+    miss = await cache.get(2)
+
+    # THEN: I should get the cached value, nothing for the unknown key and both counted
+    assert hit == {"username": "cached"}
+    assert miss is None
+    assert cache.stats == {"hits": 1, "misses": 1, "size": 1, "evictions": 0, "expirations": 0}
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_evicts_least_recently_used():
+    # GIVEN: A full in-memory cache whose oldest entry was read recently
+    cache = InMemoryCacheBackend(max_size=2, ttl_seconds=60)
+    await cache.set(1, "one")
+    await cache.set(2, "two")
+    await cache.get(1)
+
+    # WHEN: I add another entry
+    await cache.set(3, "three")
+
+    # THEN: The least recently used entry should be evicted
+    assert await cache.get(2) is None
+    assert await cache.get(1) == "one"
+    assert await cache.get(3) == "three"
+    assert cache.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_expires_entries():
+    # GIVEN: An in-memory cache entry with a time to live of 60 seconds
+    clock = FakeClock()
+    cache = InMemoryCacheBackend(max_size=10, ttl_seconds=60, clock=clock)
+    await cache.set(1, "one")
+
+    # WHEN: The time to live has passed
+    clock.now = 60.0
+
+    # THEN: The entry should be gone
+    assert await cache.get(1) is None
+    assert cache.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_drops_fill_started_before_invalidation():
+    # GIVEN: A cache fill that read the database before a concurrent write invalidated the key
+    cache = InMemoryCacheBackend(max_size=10, ttl_seconds=60)
+    epoch_before_read = cache.epoch
+    await cache.delete(1)
+
+    # WHEN: The fill stores the value it read
+    await cache.set(1, "stale", epoch=epoch_before_read)
+
+    # THEN: The stale value should not be cached
+    assert await cache.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_adds_a_key_once_until_it_expires():
+    # GIVEN: An in-memory cache
+    clock = FakeClock()
+    cache = InMemoryCacheBackend(max_size=10, ttl_seconds=60, clock=clock)
+
+    # WHEN: I add the same key twice, and again after its own time to live has passed
+    added = [await cache.add("jti", 1, ttl_seconds=5), await cache.add("jti", 2, ttl_seconds=5)]
+    clock.now = 5.0
+    added_after_expiry = await cache.add("jti", 3, ttl_seconds=5)
+
+    # THEN: Only the first and the last add should store the value
+    assert added == [True, False]
+    assert added_after_expiry is True
+    assert await cache.get("jti") == 3
+
+
+@pytest.mark.asyncio
+async def test_full_in_memory_cache_drops_expired_entries_before_evicting():
+    # GIVEN: A full in-memory cache whose least recently used entry is still valid
+    clock = FakeClock()
+    cache = InMemoryCacheBackend(max_size=3, ttl_seconds=60, clock=clock)
+    for key, ttl_seconds in (("a", 300), ("b", 50), ("c", 200)):
+        await cache.add(key, key, ttl_seconds=ttl_seconds)
+
+    # WHEN: I add another entry after one of the entries expired
+    clock.now = 100.0
+    await cache.add("d", "d", ttl_seconds=400)
+
+    # THEN: The expired entry should be dropped instead of the least recently used one
+    assert [await cache.get(key) for key in "abcd"] == ["a", None, "c", "d"]
+    assert (cache.expirations, cache.evictions) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_without_eviction_refuses_new_keys_when_full():
+    # GIVEN: A full in-memory cache that must not evict
+    clock = FakeClock()
+    cache = InMemoryCacheBackend(max_size=2, ttl_seconds=60, clock=clock, evict=False)
+    await cache.add("a", "a", ttl_seconds=10)
+    await cache.add("b", "b", ttl_seconds=100)
+
+    # WHEN: I add another key before any entry expired
+    # THEN: It should be refused and every entry kept
+    with pytest.raises(CacheFullError):
+        await cache.add("c", "c", ttl_seconds=100)
+    assert [await cache.get(key) for key in "ab"] == ["a", "b"]
+
+    # WHEN: I add it again after an entry expired
+    clock.now = 10.0
+    await cache.add("c", "c", ttl_seconds=100)
+
+    # THEN: Only the expired entry should make room for it
+    assert [await cache.get(key) for key in "abc"] == [None, "b", "c"]
+    assert cache.evictions == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_round_trips_through_client():
+    # GIVEN: A shared cache backed by a local stand-in client
+    client = LocalSharedCacheClient()
+    cache = SharedCacheBackend(client=client, namespace="account", ttl_seconds=60)
+
+    # WHEN: I store, read and delete an entry
+    await cache.set(1, {"username": "shared"})
+    stored = await cache.get(1)
+    await cache.delete(1)
+
+    # THEN: The entry should be stored namespaced and be gone after deletion
+    assert stored == {"username": "shared"}
+    assert list(client.values) == ["account:1"]
+    assert await cache.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_refuses_fills_of_other_workers_from_before_a_delete():
+    # GIVEN: Two workers sharing a cache, the first reading an account from the database before the second deletes it
+    client = LocalSharedCacheClient()
+    reading_worker = SharedCacheBackend(client=client, namespace="account", ttl_seconds=60)
+    writing_worker = SharedCacheBackend(client=client, namespace="account", ttl_seconds=60)
+    epoch_before_read = reading_worker.epoch
+    await writing_worker.delete(1)
+
+    # WHEN: The first worker fills the cache with the account it read
+    await reading_worker.set(1, {"username": "stale"}, epoch=epoch_before_read)
+
+    # THEN: The stale account should not be cached on any worker
+    assert await reading_worker.get(1) is None
+    assert await writing_worker.get(1) is None
+
+    # WHEN: The invalidation lease has expired and the account is read again
+    del client.values["account:1"]
+    await reading_worker.set(1, {"username": "current"}, epoch=reading_worker.epoch)
+
+    # THEN: It should be cached again
+    assert await writing_worker.get(1) == {"username": "current"}
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_adds_a_key_once():
+    # GIVEN: A shared cache backed by a local stand-in client
+    cache = SharedCacheBackend(client=LocalSharedCacheClient(), namespace="jwt-deny-list", ttl_seconds=60)
+
+    # WHEN: I add the same key twice
+    added = [await cache.add("jti", 1, ttl_seconds=5), await cache.add("jti", 2, ttl_seconds=5)]
+
+    # THEN: Only the first add should store the value
+    assert added == [True, False]
+    assert await cache.get("jti") == 1
+
+
+class FailingSharedCacheClient(LocalSharedCacheClient):
+    async def get(self, name: str) -> str | None:
+        raise ConnectionError("shared cache is down")
+
+    async def set(self, name: str, value: str, ex: int | None = None, nx: bool = False) -> bool | None:
+        raise ConnectionError("shared cache is down")
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_errors_are_misses_unless_it_fails_closed():
+    # GIVEN: An unavailable shared cache, failing open and failing closed
+    cache = SharedCacheBackend(client=FailingSharedCacheClient(), namespace="account", ttl_seconds=60)
+    fail_closed_cache = SharedCacheBackend(
+        client=FailingSharedCacheClient(), namespace="jwt-deny-list", ttl_seconds=60, fail_closed=True
+    )
+
+    # THEN: A read should be a miss, or raise when failing closed, and a check-and-set should always raise
+    assert await cache.get(1) is None
+    with pytest.raises(CacheUnavailableError):
+        await fail_closed_cache.get(1)
+    with pytest.raises(CacheUnavailableError):
+        await cache.add(1, "one", ttl_seconds=5)
+    assert (cache.errors, fail_closed_cache.errors) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_never_hits():
+    # GIVEN: A disabled cache
+    cache = CacheBackend()
+
+    # WHEN: I store and read an entry
+    await cache.set(1, "one")
+
+    # THEN: The entry should never be returned
+    assert await cache.get(1) is None
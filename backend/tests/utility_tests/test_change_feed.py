@@ -0,0 +1,201 @@
+import asyncio
+import typing
+
+import fastapi
+import httpx
+import orjson
+import pytest
+from fastapi.responses import StreamingResponse
+
+from src.utility.database.change_feed import ChangeEvent, ChangeFeed, ChangeFeedFullError, RESET, Subscription
+from src.utility.middleware.compression import EventStreamAwareGZipMiddleware
+
+CHANNEL = "test_changes"
+
+
+class FakeListenerConnection:
+    def __init__(self) -> None:
+        self.listeners: dict[str, typing.Callable[..., None]] = {}
+        self.termination_listeners: list[typing.Callable[..., None]] = []
+        self.closed = False
+
+    async def add_listener(self, channel: str, callback: typing.Callable[..., None]) -> None:
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback: typing.Callable[..., None]) -> None:
+        self.termination_listeners.append(callback)
+
+    async def execute(self, query: str) -> None:
+        pass
+
+    async def close(self, *, timeout: float | None = None) -> None:
+        self.closed = True
+
+    def notify(self, id: int, type: str = "update") -> None:
+        payload = orjson.dumps({"id": id, "type": type, "account": {"id": 1}}).decode()
+        self.listeners[CHANNEL](self, 1, CHANNEL, payload)
+
+    def terminate(self) -> None:
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+def parse(payload: str) -> ChangeEvent:
+    change = orjson.loads(payload)
+    return ChangeEvent.create(id=change["id"], type=change["type"], data=change["account"])
+
+
+async def build_feed(
+    connections: list[FakeListenerConnection], buffer_size: int = 10, queue_size: int = 10
+) -> tuple[ChangeFeed, list[Subscription]]:
+    """
+    Feed listening through fake connections, with two subscribers.
+    """
+
+    async def connect() -> FakeListenerConnection:
+        connections.append(FakeListenerConnection())
+        return connections[-1]
+
+    feed = ChangeFeed(
+        name="test",
+        channel=CHANNEL,
+        connect=connect,
+        parse=parse,
+        buffer_size=buffer_size,
+        subscriber_queue_size=queue_size,
+        max_subscribers=2,
+        ping_interval=60,
+        reconnect_delay=0,
+    )
+    subscriptions = [feed.subscribe(), feed.subscribe()]
+    await wait_until(lambda: connections and CHANNEL in connections[-1].listeners)
+    return feed, subscriptions
+
+
+async def wait_until(condition: typing.Callable[[], typing.Any]) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("Condition not met")
+
+
+async def get_events(subscription: Subscription, count: int) -> list[ChangeEvent | None]:
+    return [await asyncio.wait_for(subscription.get(), timeout=1) for _ in range(count)]
+
+
+async def get_event_ids(subscription: Subscription, count: int) -> list[int | None]:
+    event_ids = []
+    for event in await get_events(subscription, count):
+        assert event is not None
+        event_ids.append(event.id)
+    return event_ids
+
+
+@pytest.mark.asyncio
+async def test_notifications_are_fanned_out_over_one_connection():
+    # GIVEN: Two subscribers of a feed
+    connections: list[FakeListenerConnection] = []
+    feed, (first, second) = await build_feed(connections)
+
+    # WHEN: A notification arrives
+    connections[0].notify(1, "create")
+
+    # THEN: Both should get the same encoded event through the single connection
+    assert len(connections) == 1
+    (event,) = await get_events(first, 1)
+    assert event is not None
+    assert event.frame == b'id: 1\nevent: create\ndata: {"id":1}\n\n'
+    assert await get_events(second, 1) == [event]
+    with pytest.raises(ChangeFeedFullError):
+        feed.subscribe()
+
+    await feed.close()
+    assert connections[0].closed and feed.subscribers == 0
+    assert await first.get() is None
+
+
+@pytest.mark.asyncio
+async def test_subscribers_resume_after_their_last_event():
+    # GIVEN: A feed whose buffer holds the last 3 events
+    connections: list[FakeListenerConnection] = []
+    feed, subscriptions = await build_feed(connections, buffer_size=3)
+    for id in (1, 3, 2, 4):
+        connections[0].notify(id)
+    for subscription in subscriptions:
+        feed.unsubscribe(subscription)
+
+    # WHEN: Clients resume after a buffered event and after an event no longer buffered
+    resumed = feed.subscribe(last_event_id=3)
+    resumed_too_late = feed.subscribe(last_event_id=1)
+
+    # THEN: The first should get the events following it in commit order, the second should be reset
+    assert await get_event_ids(resumed, 2) == [2, 4]
+    assert await get_events(resumed_too_late, 1) == [RESET]
+    await feed.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscribers_get_their_queued_events_and_are_dropped():
+    # GIVEN: A subscriber that does not consume its events
+    connections: list[FakeListenerConnection] = []
+    feed, (slow, fast) = await build_feed(connections, queue_size=2)
+
+    # WHEN: More events arrive than its queue holds
+    for id in range(1, 4):
+        connections[0].notify(id)
+        await get_events(fast, 1)
+
+    # THEN: It should get the queued events and then the end of its stream, without holding back the others
+    assert feed.subscribers == 1
+    assert await get_event_ids(slow, 2) == [1, 2]
+    assert await slow.get() is None
+    await feed.close()
+
+
+@pytest.mark.asyncio
+async def test_subscribers_are_reset_when_the_connection_is_lost():
+    # GIVEN: A subscriber of a feed whose connection is lost
+    connections: list[FakeListenerConnection] = []
+    feed, (subscription, other_subscription) = await build_feed(connections)
+    feed.unsubscribe(other_subscription)
+    connections[0].notify(1)
+    connections[0].terminate()
+
+    # WHEN: The feed has reconnected
+    await wait_until(lambda: len(connections) == 2 and CHANNEL in connections[1].listeners)
+
+    # THEN: The subscriber should be told that events may have been missed, which are no longer resumable
+    assert connections[0].closed
+    assert await get_event_ids(subscription, 2) == [1, None]
+    assert await get_events(feed.subscribe(last_event_id=1), 1) == [RESET]
+    await feed.close()
+
+
+@pytest.mark.asyncio
+async def test_event_streams_are_not_compressed():
+    # GIVEN: An app compressing its responses, with an event stream and a large JSON response
+    app = fastapi.FastAPI()
+
+    @app.get("/events")
+    async def events() -> StreamingResponse:
+        async def frames():
+            yield b"event: update\ndata: " + b"x" * 2000 + b"\n\n"
+
+        return StreamingResponse(frames(), media_type="text/event-stream")
+
+    @app.get("/accounts")
+    async def accounts() -> list[str]:
+        return ["x" * 2000]
+
+    app.add_middleware(EventStreamAwareGZipMiddleware, minimum_size=1024)
+
+    # WHEN: I get both accepting gzip
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        event_response = await client.get("/events", headers={"Accept-Encoding": "gzip"})
+        json_response = await client.get("/accounts", headers={"Accept-Encoding": "gzip"})
+
+    # THEN: Only the JSON response should be compressed
+    assert "content-encoding" not in event_response.headers
+    assert event_response.text.startswith("event: update")
+    assert json_response.headers["content-encoding"] == "gzip"
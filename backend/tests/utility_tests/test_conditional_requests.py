@@ -0,0 +1,103 @@
+import datetime
+import types
+
+import fastapi
+import httpx
+import pytest
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+
+from src.utility.http.conditional_requests import conditional_response, get_validators, is_not_modified
+
+CREATED_AT = datetime.datetime(2026, 1, 1, 12, 0, 0, 500000, tzinfo=datetime.timezone.utc)
+UPDATED_AT = datetime.datetime(2026, 1, 2, 12, 0, 0, 250000, tzinfo=datetime.timezone.utc)
+
+
+def make_account(id: int, updated_at: datetime.datetime | None = None) -> types.SimpleNamespace:
+    return types.SimpleNamespace(id=id, created_at=CREATED_AT, updated_at=updated_at)
+
+
+def test_validators_change_with_versions_and_membership():
+    # GIVEN: A page of accounts
+    accounts = [make_account(1), make_account(2, updated_at=UPDATED_AT)]
+
+    # WHEN: I compute its validators
+    validators = get_validators(accounts)
+
+    # THEN: The ETag should be weak and stable, and there should be no Last-Modified for the collection
+    assert validators.etag.startswith('W/"')
+    assert validators == get_validators([make_account(1), make_account(2, updated_at=UPDATED_AT)])
+    assert validators.last_modified is None
+    assert "Last-Modified" not in validators.headers
+    # AND: Any update, addition or removal should change the ETag
+    assert validators.etag != get_validators([make_account(1), make_account(2)]).etag
+    assert validators.etag != get_validators([*accounts, make_account(3)]).etag
+    assert validators.etag != get_validators(accounts[:1]).etag
+
+
+@pytest.mark.parametrize(
+    "request_headers, expected",
+    [
+        ({}, False),
+        ({"if-none-match": "*"}, True),
+        ({"if-none-match": '"other", {etag}'}, True),
+        ({"if-none-match": '"other"'}, False),
+        ({"if-modified-since": "Fri, 02 Jan 2026 12:00:00 GMT"}, True),
+        ({"if-modified-since": "Fri, 02 Jan 2026 11:59:59 GMT"}, False),
+        ({"if-modified-since": "not a date"}, False),
+        # If-None-Match takes precedence over If-Modified-Since
+        ({"if-none-match": '"other"', "if-modified-since": "Fri, 02 Jan 2026 12:00:00 GMT"}, False),
+    ],
+)
+def test_is_not_modified(request_headers: dict[str, str], expected: bool):
+    validators = get_validators([make_account(1, updated_at=UPDATED_AT)], with_last_modified=True)
+    request_headers = {key: value.format(etag=validators.etag) for key, value in request_headers.items()}
+
+    assert is_not_modified(request_headers, validators) is expected
+
+
+def test_updates_within_the_second_of_last_modified_change_the_etag():
+    # GIVEN: A client holding a row, with its Last-Modified in whole seconds
+    validators = get_validators([make_account(1, updated_at=UPDATED_AT)], with_last_modified=True)
+    assert validators.headers["Last-Modified"] == "Fri, 02 Jan 2026 12:00:00 GMT"
+
+    # WHEN: The row is updated later within the same second
+    updated = get_validators(
+        [make_account(1, updated_at=UPDATED_AT.replace(microsecond=750000))], with_last_modified=True
+    )
+
+    # THEN: Last-Modified should stay the same, but revalidating with the ETag of the old copy should not answer 304
+    assert updated.last_modified == validators.last_modified
+    assert is_not_modified({"if-none-match": validators.etag}, updated) is False
+
+
+@pytest.mark.asyncio
+async def test_conditional_response_skips_the_body_and_compresses_large_responses():
+    # GIVEN: An app serving a large list of accounts with validators, behind the GZip middleware
+    accounts = [make_account(id, updated_at=UPDATED_AT) for id in range(200)]
+    built_responses = []
+
+    def build_response() -> ORJSONResponse:
+        built_responses.append(True)
+        return ORJSONResponse(content=[{"id": account.id, "username": f"user{account.id}"} for account in accounts])
+
+    app = fastapi.FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+    @app.get("/accounts")
+    async def get_accounts(request: fastapi.Request) -> fastapi.Response:
+        return conditional_response(request, accounts, build_response)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # WHEN: I get the list and revalidate it with its ETag
+        response = await client.get("/accounts", headers={"Accept-Encoding": "gzip"})
+        revalidated = await client.get("/accounts", headers={"If-None-Match": response.headers["ETag"]})
+
+    # THEN: The first response should be compressed and the revalidation answered without building a body
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.json()) == 200
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == response.headers["ETag"]
+    assert len(built_responses) == 1
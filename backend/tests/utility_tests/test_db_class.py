@@ -0,0 +1,99 @@
+import asyncio
+import types
+
+import pytest
+
+from src.utility.database.db_class import Database
+
+
+class FakeConnection:
+    def __init__(self, engine: "FakeEngine"):
+        self.engine = engine
+
+    def __await__(self):
+        async def start() -> "FakeConnection":
+            await asyncio.sleep(0)
+            self.engine.pool.checked_out += 1
+            self.engine.max_checked_out = max(self.engine.max_checked_out, self.engine.pool.checked_out)
+            return self
+
+        return start().__await__()
+
+    async def close(self) -> None:
+        self.engine.pool.checked_out -= 1
+
+
+class FakePool:
+    def __init__(self, size: int):
+        self.pool_size = size
+        self.checked_out = 0
+
+    def size(self) -> int:
+        return self.pool_size
+
+    def checkedout(self) -> int:
+        return self.checked_out
+
+
+class FakeEngine:
+    def __init__(self, pool_size: int):
+        self.pool = FakePool(size=pool_size)
+        self.url = types.SimpleNamespace(host="primary")
+        self.max_checked_out = 0
+        self.is_disposed = False
+
+    def connect(self) -> FakeConnection:
+        return FakeConnection(self)
+
+    async def dispose(self) -> None:
+        self.is_disposed = True
+
+
+def build_database(pool_size: int) -> Database:
+    database = Database()
+    database._async_engine = FakeEngine(pool_size=pool_size)  # type: ignore
+    return database
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_connections_concurrently_up_to_pool_size():
+    # GIVEN: A database with a pool of 3 connections
+    database = build_database(pool_size=3)
+
+    # WHEN: I warm up more connections than the pool holds
+    opened = await database.warm_up(connections=5)
+
+    # THEN: The whole pool should have been open at once and returned afterwards
+    assert opened == 3
+    assert database._async_engine.max_checked_out == 3  # type: ignore
+    assert database._async_engine.pool.checkedout() == 0  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_dispose_waits_for_checked_out_connections():
+    # GIVEN: A connection that is returned after 0.1 seconds
+    database = build_database(pool_size=3)
+    connection = await database._async_engine.connect()  # type: ignore
+    asyncio.get_running_loop().call_later(0.1, lambda: asyncio.ensure_future(connection.close()))
+
+    # WHEN: I dispose the database with a longer drain timeout
+    started_at = asyncio.get_running_loop().time()
+    await database.dispose(drain_timeout=5)
+
+    # THEN: The engine should be disposed once the connection was returned
+    assert database._async_engine.is_disposed is True  # type: ignore
+    assert database._async_engine.pool.checkedout() == 0  # type: ignore
+    assert asyncio.get_running_loop().time() - started_at < 1
+
+
+@pytest.mark.asyncio
+async def test_dispose_gives_up_after_drain_timeout():
+    # GIVEN: A connection that is never returned
+    database = build_database(pool_size=3)
+    await database._async_engine.connect()  # type: ignore
+
+    # WHEN: I dispose the database
+    await database.dispose(drain_timeout=0.1)
+
+    # THEN: The engine should be disposed anyway
+    assert database._async_engine.is_disposed is True  # type: ignore
@@ -0,0 +1,38 @@
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from src.utility.database.instrumented_pool import InstrumentedAsyncAdaptedQueuePool
+
+
+@pytest.mark.asyncio
+async def test_only_callers_of_an_exhausted_pool_are_waiting():
+    # GIVEN: A pool of one connection without overflow, recording the waiting callers while it connects
+    waiting_while_connecting = []
+
+    def connect() -> sqlite3.Connection:
+        waiting_while_connecting.append(pool.waiting)
+        return sqlite3.connect(":memory:", check_same_thread=False)
+
+    pool = InstrumentedAsyncAdaptedQueuePool(connect, pool_size=1, max_overflow=0, timeout=5)
+
+    # WHEN: A caller checks out the only connection
+    connection = await greenlet_spawn(pool.connect)
+
+    # THEN: Opening it should not count as waiting
+    assert waiting_while_connecting == [0]
+    assert pool.waiting == 0 and pool.is_exhausted()
+
+    # WHEN: Another caller checks out a connection while there is none left
+    checkout = asyncio.ensure_future(greenlet_spawn(pool.connect))
+    await asyncio.sleep(0.05)
+
+    # THEN: It should be waiting until the connection is returned
+    assert pool.waiting == 1
+    await greenlet_spawn(connection.close)
+    other_connection = await checkout
+    assert pool.waiting == 0
+    await greenlet_spawn(other_connection.close)
+    await greenlet_spawn(pool.dispose)
@@ -0,0 +1,198 @@
+import time
+import typing
+
+import fastapi
+import httpx
+import pytest
+
+from src.utility.cache.cache_backend import CacheBackend, CacheFullError, CacheUnavailableError, InMemoryCacheBackend
+from src.utility.security import jwt_tokens
+from src.utility.security.jwt_tokens import (
+    ACCESS_TOKEN,
+    get_current_token,
+    InvalidTokenError,
+    REFRESH_TOKEN,
+    TokenClaims,
+    TokenManager,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_800_000_000):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_token_manager(
+    clock: FakeClock, verified_cache_size: int = 10, deny_list: CacheBackend | None = None
+) -> TokenManager:
+    return TokenManager(
+        secret_key="test-secret",
+        algorithm="HS256",
+        access_token_ttl=900,
+        refresh_token_ttl=3600,
+        verified_cache_size=verified_cache_size,
+        deny_list=deny_list or InMemoryCacheBackend(max_size=10, ttl_seconds=3600, clock=clock, evict=False),
+        clock=clock,
+    )
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_are_memoized(monkeypatch: pytest.MonkeyPatch):
+    # GIVEN: An issued access token
+    token_manager = make_token_manager(FakeClock())
+    token, claims = token_manager.issue(1, "tokenUser", False, token_type=ACCESS_TOKEN)
+    decoded: list[str] = []
+    decode = token_manager._decode
+
+    def recording_decode(token: str) -> TokenClaims:
+        decoded.append(token)
+        return decode(token)
+
+    monkeypatch.setattr(token_manager, "_decode", recording_decode)
+
+    # WHEN: I verify it repeatedly
+    results = [await token_manager.verify(token) for _ in range(5)]
+
+    # THEN: The signature should only be checked once
+    assert results == [claims] * 5
+    assert decoded == [token]
+
+
+@pytest.mark.asyncio
+async def test_expired_revoked_tampered_and_mistyped_tokens_are_refused():
+    clock = FakeClock()
+    token_manager = make_token_manager(clock)
+    access_token, access_claims = token_manager.issue(1, "tokenUser", False, token_type=ACCESS_TOKEN)
+    refresh_token, _ = token_manager.issue(1, "tokenUser", False, token_type=REFRESH_TOKEN)
+    await token_manager.verify(access_token)
+
+    with pytest.raises(InvalidTokenError):
+        await token_manager.verify(refresh_token, token_type=ACCESS_TOKEN)
+    with pytest.raises(InvalidTokenError):
+        await token_manager.verify(access_token[:-2] + "xx")
+    with pytest.raises(InvalidTokenError):
+        await make_token_manager(clock).verify(access_token.replace(access_token.split(".")[1], "e30"))
+
+    # A revoked token is refused even though it is in the verified cache
+    await token_manager.revoke(access_claims)
+    with pytest.raises(InvalidTokenError, match="revoked"):
+        await token_manager.verify(access_token)
+
+    other_token, _ = token_manager.issue(2, "otherUser", False, token_type=ACCESS_TOKEN)
+    await token_manager.verify(other_token)
+    clock.now += 901
+    with pytest.raises(InvalidTokenError, match="expired"):
+        await token_manager.verify(other_token)
+
+
+@pytest.mark.asyncio
+async def test_verified_cache_is_bounded():
+    token_manager = make_token_manager(FakeClock(), verified_cache_size=3)
+    for account_id in range(10):
+        token, _ = token_manager.issue(account_id, f"user{account_id}", False, token_type=ACCESS_TOKEN)
+        await token_manager.verify(token)
+
+    assert len(token_manager._verified) == 3
+
+
+@pytest.mark.asyncio
+async def test_a_token_is_revoked_once_for_all_token_managers_sharing_the_deny_list():
+    # GIVEN: Two token managers, like two workers, sharing one deny-list
+    clock = FakeClock()
+    deny_list = InMemoryCacheBackend(max_size=10, ttl_seconds=3600, clock=clock)
+    token_manager, other_token_manager = (make_token_manager(clock, deny_list=deny_list) for _ in range(2))
+    token, claims = token_manager.issue(1, "tokenUser", False, token_type=REFRESH_TOKEN)
+    await other_token_manager.verify(token, token_type=REFRESH_TOKEN)
+
+    # WHEN: Both revoke the same token
+    revoked = [await token_manager.revoke(claims), await other_token_manager.revoke(claims)]
+
+    # THEN: Only the first revocation should succeed, and both should refuse the token
+    assert revoked == [True, False]
+    for manager in (token_manager, other_token_manager):
+        with pytest.raises(InvalidTokenError, match="revoked"):
+            await manager.verify(token, token_type=REFRESH_TOKEN)
+
+    # WHEN: The token has expired
+    clock.now += 3600
+
+    # THEN: Its deny-list entry should be gone as well
+    assert await deny_list.get(claims.jti) is None
+
+
+@pytest.mark.asyncio
+async def test_revoked_tokens_stay_revoked_when_the_deny_list_is_full():
+    # GIVEN: A deny-list full of revoked tokens that have not expired
+    clock = FakeClock()
+    token_manager = make_token_manager(clock)
+    revoked_tokens = []
+    for account_id in range(10):
+        token, claims = token_manager.issue(account_id, f"user{account_id}", False, token_type=REFRESH_TOKEN)
+        assert await token_manager.revoke(claims)
+        revoked_tokens.append(token)
+
+    # WHEN: Another token is revoked
+    _, claims = token_manager.issue(10, "user10", False, token_type=REFRESH_TOKEN)
+
+    # THEN: The revocation should fail, and the first revoked token should still be refused
+    with pytest.raises(CacheFullError):
+        await token_manager.revoke(claims)
+    with pytest.raises(InvalidTokenError, match="revoked"):
+        await token_manager.verify(revoked_tokens[0], token_type=REFRESH_TOKEN)
+
+
+class UnavailableDenyList(CacheBackend):
+    async def _get(self, key: typing.Hashable) -> typing.Any | None:
+        raise CacheUnavailableError("deny-list is down")
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_refused_while_the_deny_list_is_unavailable(monkeypatch: pytest.MonkeyPatch):
+    # GIVEN: A token manager whose deny-list can not be read
+    token_manager = make_token_manager(FakeClock(now=time.time()), deny_list=UnavailableDenyList())
+    monkeypatch.setattr(jwt_tokens, "get_token_manager", lambda: token_manager)
+    token, _ = token_manager.issue(7, "depUser", True, token_type=ACCESS_TOKEN)
+
+    app = fastapi.FastAPI()
+
+    @app.get("/me")
+    async def me(claims: TokenClaims = fastapi.Depends(get_current_token)) -> dict:
+        return {"id": claims.account_id}
+
+    # WHEN: I verify the token, and call a route with it
+    with pytest.raises(CacheUnavailableError):
+        await token_manager.verify(token)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+
+    # THEN: The token should not be accepted
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_get_current_token_authenticates_without_a_database(monkeypatch: pytest.MonkeyPatch):
+    # GIVEN: A route depending on the current token
+    token_manager = make_token_manager(FakeClock(now=time.time()))
+    monkeypatch.setattr(jwt_tokens, "get_token_manager", lambda: token_manager)
+    token, _ = token_manager.issue(7, "depUser", True, token_type=ACCESS_TOKEN)
+
+    app = fastapi.FastAPI()
+
+    @app.get("/me")
+    async def me(claims: TokenClaims = fastapi.Depends(get_current_token)) -> dict:
+        return {"id": claims.account_id, "isAdmin": claims.is_admin}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # WHEN: I call it without and with the access token
+        anonymous = await client.get("/me")
+        authenticated = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+
+    # THEN: Only the request with the token should be authenticated
+    assert anonymous.status_code == 401
+    assert anonymous.headers["WWW-Authenticate"] == "Bearer"
+    assert authenticated.status_code == 200
+    assert authenticated.json() == {"id": 7, "isAdmin": True}
@@ -0,0 +1,97 @@
+import io
+import typing
+
+import httpx
+import loguru
+import orjson
+import pytest
+from fastapi import FastAPI
+
+from src.config.logging import JSONSink, LogFilter, parse_module_levels
+from src.utility.middleware.request_context import RequestContextMiddleware
+
+
+def build_record(module: str, level: str) -> "loguru.Record":
+    # The filter only reads the name and the level of a record
+    return typing.cast("loguru.Record", {"name": module, "level": loguru.logger.level(level)})
+
+
+def test_parse_module_levels():
+    assert parse_module_levels(" src.crud=warning, sqlalchemy=INFO,") == {"src.crud": "WARNING", "sqlalchemy": "INFO"}
+    assert parse_module_levels("") == {}
+
+
+def test_log_filter_applies_longest_module_prefix():
+    # GIVEN: A filter at DEBUG that raises `src.crud` to WARNING and lowers `src.crud.audit` back to INFO
+    log_filter = LogFilter(
+        level="DEBUG", module_levels={"src.crud": "WARNING", "src.crud.audit": "INFO"}, sample_rate=1.0
+    )
+
+    # THEN: Each module should be filtered by its longest matching prefix
+    assert log_filter(build_record("src.main", "DEBUG")) is True
+    assert log_filter(build_record("src.crud.account_crud", "INFO")) is False
+    assert log_filter(build_record("src.crud.account_crud", "WARNING")) is True
+    assert log_filter(build_record("src.crud.audit", "INFO")) is True
+    assert log_filter.min_level_no == loguru.logger.level("DEBUG").no
+
+
+def test_log_filter_samples_only_below_warning():
+    # GIVEN: A filter that samples none of the records below WARNING
+    log_filter = LogFilter(level="INFO", module_levels={}, sample_rate=0.0)
+
+    # THEN: Info records should be dropped while warnings and errors are kept
+    assert log_filter(build_record("src.crud.account_crud", "INFO")) is False
+    assert log_filter(build_record("src.crud.account_crud", "WARNING")) is True
+    assert log_filter(build_record("src.crud.account_crud", "ERROR")) is True
+
+
+@pytest.mark.asyncio
+async def test_json_sink_writes_request_id_of_request():
+    # GIVEN: An app logging inside a request and a JSON sink
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        loguru.logger.info("handling ping")
+        return {}
+
+    stream = io.StringIO()
+    handler_id = loguru.logger.add(JSONSink(stream), format="{message}", level="INFO")
+    try:
+        # WHEN: I send a request with a request id
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/ping", headers={"X-Request-ID": "req-42"})
+        await loguru.logger.complete()
+    finally:
+        loguru.logger.remove(handler_id)
+
+    # THEN: The request id should be echoed and attached to the structured record
+    assert response.headers["X-Request-ID"] == "req-42"
+    records = [orjson.loads(line) for line in stream.getvalue().splitlines()]
+    assert {"message": "handling ping", "requestId": "req-42", "level": "INFO"}.items() <= records[0].items()
+
+
+def test_json_sink_keeps_the_traceback_of_exceptions():
+    # GIVEN: A JSON sink
+    stream = io.StringIO()
+    sink = JSONSink(stream)
+    handler_id = loguru.logger.add(sink, format="{message}", level="INFO", backtrace=False, diagnose=False)
+
+    # WHEN: An exception is logged
+    accounts: dict[str, int] = {}
+    try:
+        try:
+            accounts["missing"]
+        except KeyError:
+            loguru.logger.exception("lookup failed")
+    finally:
+        loguru.logger.remove(handler_id)
+        sink.stop()
+
+    # THEN: Its type, message and traceback should be written
+    exception = orjson.loads(stream.getvalue())["exception"]
+    assert exception["type"] == "KeyError"
+    assert exception["message"] == "'missing'"
+    assert exception["traceback"].startswith("Traceback (most recent call last):")
+    assert "test_json_sink_keeps_the_traceback_of_exceptions" in exception["traceback"]
@@ -0,0 +1,80 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.api.routes.metrics_router import router as metrics_router
+from src.utility.metrics.metrics_registry import Counter, Histogram, Metric, MetricsRegistry
+from src.utility.middleware.metrics import MetricsMiddleware
+
+
+def test_histogram_renders_cumulative_buckets():
+    # GIVEN: A histogram with two buckets
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", label_names=("route",), buckets=(0.1, 1.0)))
+
+    # WHEN: I observe a value in each bucket and one above all of them
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, labels=("a:b",))
+
+    # THEN: The bucket counts should be cumulative and end with +Inf
+    rendered = registry.render()
+    assert "# TYPE latency_seconds histogram" in rendered
+    assert 'latency_seconds_bucket{route="a:b",le="0.1"} 1' in rendered
+    assert 'latency_seconds_bucket{route="a:b",le="1.0"} 2' in rendered
+    assert 'latency_seconds_bucket{route="a:b",le="+Inf"} 3' in rendered
+    assert 'latency_seconds_count{route="a:b"} 3' in rendered
+    assert 'latency_seconds_sum{route="a:b"} 5.55' in rendered
+
+
+def test_counter_escapes_label_values():
+    # GIVEN: A counter with a label value containing quotes
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("events_total", "Events.", label_names=("kind",)))
+
+    # WHEN: I increment it
+    counter.inc(labels=('say "hi"',))
+
+    # THEN: The quotes should be escaped
+    assert 'events_total{kind="say \\"hi\\""} 1.0' in registry.render()
+
+
+def test_registry_rejects_duplicate_names():
+    registry = MetricsRegistry()
+    registry.register(Counter("events_total", "Events."))
+
+    with pytest.raises(ValueError):
+        registry.register(Counter("events_total", "Events."))
+
+
+def test_metric_without_samples_can_not_be_created():
+    class Unrendered(Metric):
+        pass
+
+    with pytest.raises(TypeError):
+        Unrendered("unrendered", "Never rendered.")  # type: ignore[abstract]
+
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_labels_latency_by_route_name():
+    # GIVEN: An app with a named route and the metrics endpoint
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+    @app.get("/ping/{id}", name="ping:get_ping")
+    async def ping(id: int) -> dict:
+        return {}
+
+    # WHEN: I call the route and scrape the metrics
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/ping/1")
+        await client.get("/ping/2")
+        await client.get("/missing")
+        response = await client.get("/metrics")
+
+    # THEN: The latency should be labelled by route name instead of path
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{route="ping:get_ping",status="200"} 2' in response.text
+    assert 'http_request_duration_seconds_count{route="unmatched",status="404"} 1' in response.text
+    assert "http_requests_in_flight 1.0" in response.text
@@ -0,0 +1,44 @@
+import datetime
+
+import orjson
+import pydantic
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from src.models.db_tables.account_table import Account
+from src.models.schemas.account_schema import AccountOut
+from src.utility.pydantic_schema.orm_serializer import compile_orm_serializer
+
+
+def build_account(id: int, updated_at: datetime.datetime | None = None) -> Account:
+    return Account(
+        id=id,
+        username=f"user{id}",
+        email=f"user{id}@gmx.de",
+        password="hashed",
+        is_admin=False,
+        is_logged_in=True,
+        is_verified=False,
+        created_at=datetime.datetime(2024, 5, 17, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        updated_at=updated_at,
+    )
+
+
+def test_orm_serializer_matches_response_model_output():
+    # GIVEN: Accounts with and without an update timestamp
+    accounts = [
+        build_account(1),
+        build_account(2, updated_at=datetime.datetime(2024, 6, 1, 12, 0, tzinfo=datetime.timezone.utc)),
+    ]
+    serialize_account_out = compile_orm_serializer(AccountOut)
+
+    # WHEN: I serialize them through the schema and through the compiled serializer
+    validated = [AccountOut(**account.__dict__) for account in accounts]
+    expected = JSONResponse(
+        content=pydantic.TypeAdapter(list[AccountOut]).dump_python(validated, mode="json", by_alias=True)
+    ).body
+    actual = ORJSONResponse(content=[serialize_account_out(account) for account in accounts]).body
+
+    # THEN: Both should produce identical bytes
+    assert actual == expected
+    assert orjson.loads(actual)[0]["createdAt"] == "2024-05-17T08:30:15.123456Z"
+    assert "password" not in orjson.loads(actual)[0]
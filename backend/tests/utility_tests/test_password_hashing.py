@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from src.utility.security.password_hashing import PasswordHasher
+
+
+@pytest.fixture
+def password_hasher():
+    hasher = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1, max_workers=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_password(password_hasher: PasswordHasher):
+    # GIVEN: A hashed password
+    hashed_password = await password_hasher.hash("Test1234!")
+
+    # WHEN: I verify the correct and a wrong password against the hash
+    is_correct = await password_hasher.verify(hashed_password, "Test1234!")
+    is_wrong = await password_hasher.verify(hashed_password, "Wrong1234!")
+
+    # THEN: Only the correct password should match and the hash should not contain it
+    assert "Test1234!" not in hashed_password
+    assert is_correct is True
+    assert is_wrong is False
+
+
+@pytest.mark.asyncio
+async def test_verify_unknown_takes_a_full_verification(
+    password_hasher: PasswordHasher, monkeypatch: pytest.MonkeyPatch
+):
+    # GIVEN: A hasher recording the hashes it verifies against
+    verified_hashes: list[str] = []
+    verify = password_hasher.verify
+
+    async def recording_verify(hashed_password: str, password: str) -> bool:
+        verified_hashes.append(hashed_password)
+        return await verify(hashed_password, password)
+
+    monkeypatch.setattr(password_hasher, "verify", recording_verify)
+
+    # WHEN: I verify a password without a hash of its own, twice
+    await password_hasher.verify_unknown("Test1234!")
+    await password_hasher.verify_unknown("Test1234!")
+
+    # THEN: Each should verify it against the same Argon2 hash
+    assert len(verified_hashes) == 2
+    assert verified_hashes[0] == verified_hashes[1] and verified_hashes[0].startswith("$argon2")
+
+
+@pytest.mark.asyncio
+async def test_needs_rehash_with_other_parameters(password_hasher: PasswordHasher):
+    # GIVEN: A hash of a hasher with a higher time cost
+    stronger_hasher = PasswordHasher(time_cost=2, memory_cost=8192, parallelism=1, max_workers=1)
+    hashed_password = await stronger_hasher.hash("Test1234!")
+    stronger_hasher.shutdown()
+
+    # THEN: Only the hashes of other parameters should need a rehash
+    assert password_hasher.needs_rehash(hashed_password) is True
+    assert password_hasher.needs_rehash(await password_hasher.hash("Test1234!")) is False
+
+
+@pytest.mark.asyncio
+async def test_verify_invalid_hash(password_hasher: PasswordHasher):
+    # GIVEN: A stored password that is not an Argon2 hash
+    # WHEN: I verify a password against it
+    is_verified = await password_hasher.verify("plain-text", "plain-text")
+
+    # THEN: The password should not match
+    assert is_verified is False
+
+
+@pytest.mark.asyncio
+async def test_hash_many_leaves_the_pool_to_other_hashes():
+    # GIVEN: A pool of two workers, busy hashing many passwords one at a time
+    hasher = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1, max_workers=2)
+    passwords = [f"Bulk{index}!" for index in range(50)]
+    bulk = asyncio.create_task(hasher.hash_many(passwords, max_concurrency=1))
+    await asyncio.sleep(0)
+
+    # WHEN: Another password is hashed meanwhile
+    await hasher.hash("Single1!")
+
+    # THEN: It should not wait for all of them, which are hashed in order
+    assert not bulk.done()
+    hashed_passwords = await bulk
+    assert len(hashed_passwords) == len(passwords)
+    assert await hasher.verify(hashed_passwords[-1], passwords[-1])
+    hasher.shutdown()
@@ -0,0 +1,34 @@
+import pytest
+
+from src.utility.database.pool_budget import PoolBudget, split_pool_budget
+
+
+@pytest.mark.parametrize(
+    "pool_size, max_overflow, workers, max_connections, expected",
+    [
+        # The shares of the totals fit under the cap
+        (100, 20, 4, 200, PoolBudget(pool_size=25, max_overflow=5)),
+        # The overflow is cut first
+        (100, 20, 4, 100, PoolBudget(pool_size=25, max_overflow=0)),
+        # Then the pool size
+        (100, 20, 4, 80, PoolBudget(pool_size=20, max_overflow=0)),
+        # Every worker keeps at least one pooled connection
+        (2, 0, 4, 80, PoolBudget(pool_size=1, max_overflow=0)),
+        (10, 5, 1, 100, PoolBudget(pool_size=10, max_overflow=5)),
+    ],
+)
+def test_split_pool_budget_stays_under_the_connection_cap(
+    pool_size: int, max_overflow: int, workers: int, max_connections: int, expected: PoolBudget
+):
+    # WHEN: I split the pool of the server across its workers
+    budget = split_pool_budget(pool_size, max_overflow, workers, max_connections)
+
+    # THEN: All workers together should never exceed the connection cap
+    assert budget == expected
+    assert workers * budget.max_connections <= max_connections
+
+
+@pytest.mark.parametrize("workers, max_connections", [(0, 80), (8, 4)])
+def test_split_pool_budget_refuses_impossible_splits(workers: int, max_connections: int):
+    with pytest.raises(ValueError):
+        split_pool_budget(pool_size=10, max_overflow=5, workers=workers, max_connections=max_connections)
@@ -0,0 +1,93 @@
+import asyncio
+import pathlib
+import time
+
+import fastapi
+import httpx
+import pytest
+
+from src.utility.middleware.profiler import AWAITING, ProfilerMiddleware, StackSampler
+
+TRIGGER_TOKEN = "profile-me"
+
+
+def build_app(output_directory: pathlib.Path, sample_rate: float = 0.0) -> fastapi.FastAPI:
+    app = fastapi.FastAPI()
+
+    def hash_passwords() -> None:
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+
+    @app.get("/accounts", name="account:get_all_accounts")
+    async def get_accounts() -> list[int]:
+        hash_passwords()
+        await asyncio.sleep(0.05)
+        return [1, 2, 3]
+
+    app.add_middleware(
+        ProfilerMiddleware,
+        output_directory=str(output_directory),
+        sample_rate=sample_rate,
+        trigger_token=TRIGGER_TOKEN,
+        interval=0.001,
+    )
+    return app
+
+
+async def get_accounts(app: fastapi.FastAPI, headers: dict[str, str] | None = None) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get("/accounts", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_requests_with_the_trigger_token_are_profiled(tmp_path: pathlib.Path):
+    # GIVEN: An app with the profiler registered
+    app = build_app(tmp_path)
+
+    # WHEN: I send a request with the trigger token
+    response = await get_accounts(app, headers={"X-Profile": TRIGGER_TOKEN})
+
+    # THEN: A collapsed stack file named by the route should hold the samples on the CPU and while awaiting, rooted
+    # at the same frame
+    assert response.status_code == 200
+    (profile,) = tmp_path.iterdir()
+    assert profile.name.startswith("account_get_all_accounts-") and profile.suffix == ".collapsed"
+    samples = [line.rsplit(" ", 1) for line in profile.read_text().splitlines()]
+    cpu_samples = sum(int(count) for stack, count in samples if stack.split(";")[-1].startswith("hash_passwords"))
+    awaiting_samples = sum(int(count) for stack, count in samples if stack.endswith(AWAITING))
+    assert cpu_samples > 0 and awaiting_samples > 0
+    assert len({stack.split(";")[0] for stack, _ in samples}) == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_are_not_profiled_without_the_trigger_token(tmp_path: pathlib.Path):
+    app = build_app(tmp_path)
+
+    await get_accounts(app)
+    await get_accounts(app, headers={"X-Profile": "wrong-token"})
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_a_sampled_fraction_of_the_requests_is_profiled(tmp_path: pathlib.Path):
+    app = build_app(tmp_path, sample_rate=1.0)
+
+    await get_accounts(app)
+
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+@pytest.mark.asyncio
+async def test_a_finished_task_yields_no_samples():
+    # GIVEN: A sampler of a task that has finished
+    task = asyncio.create_task(asyncio.sleep(0))
+    await task
+    sampler = StackSampler(task, interval=0.01)
+
+    # WHEN: I take a sample
+    stack = sampler.sample()
+
+    # THEN: It should be empty instead of the stack of whatever runs on the loop thread
+    assert stack == ""
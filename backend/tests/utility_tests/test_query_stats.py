@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import fastapi
+import httpx
+import loguru
+import pytest
+import sqlalchemy
+from sqlalchemy import exc as sqlalchemy_error
+
+from src.utility.database.query_stats import assert_query_budget, record_query, redact_parameters, track_queries
+from src.utility.events import db_events  # noqa: F401, registers the cursor listeners
+from src.utility.middleware.query_stats import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, QueryStatsMiddleware
+
+SELECT_ACCOUNT = "SELECT account.id FROM account WHERE account.id = $1::INTEGER"
+
+
+@pytest.mark.asyncio
+async def test_queries_are_tracked_in_spawned_tasks_and_nested_blocks():
+    async def commit() -> None:
+        await asyncio.sleep(0)
+        record_query("COMMIT", 0.001)
+
+    # GIVEN: A tracked block with a nested tracked block
+    with track_queries() as outer:
+        record_query(SELECT_ACCOUNT, 0.002)
+        with track_queries() as inner:
+            # WHEN: Queries are executed by tasks spawned within the block
+            await asyncio.gather(
+                asyncio.create_task(asyncio.to_thread(record_query, SELECT_ACCOUNT, 0.001)),
+                asyncio.create_task(commit()),
+            )
+    record_query(SELECT_ACCOUNT, 0.001)
+
+    # THEN: They should count for both blocks, and nothing after the blocks should
+    assert outer.count == 3 and inner.count == 2
+    assert outer.duration == pytest.approx(0.004)
+    assert outer.repeated(threshold=2) == [(SELECT_ACCOUNT, 2)]
+    assert inner.repeated(threshold=2) == []
+
+
+def test_assert_query_budget_lists_the_statements_over_budget():
+    with assert_query_budget(2):
+        record_query(SELECT_ACCOUNT, 0.001)
+
+    with pytest.raises(AssertionError, match=r"at most 1 queries, 2 were executed:\n2x SELECT account.id"):
+        with assert_query_budget(1):
+            record_query(SELECT_ACCOUNT, 0.001)
+            record_query(SELECT_ACCOUNT, 0.001)
+
+
+def test_failed_statements_leave_no_timing_state_on_the_connection():
+    # GIVEN: A pooled connection
+    engine = sqlalchemy.create_engine("sqlite://")
+    with engine.connect() as conn, track_queries() as stats:
+        info_before = dict(conn.info)
+
+        # WHEN: Statements fail on it, and a later one succeeds
+        for _ in range(3):
+            with pytest.raises(sqlalchemy_error.OperationalError):
+                conn.exec_driver_sql("SELECT * FROM missing_table")
+        time.sleep(0.05)
+        conn.exec_driver_sql("SELECT 1")
+
+        # THEN: Nothing should pile up on the connection, and the later statement is timed from its own start
+        assert dict(conn.info) == info_before
+    assert stats.count == 1
+    assert stats.duration < 0.05
+    engine.dispose()
+
+
+def test_redacted_parameters_keep_no_values():
+    assert redact_parameters((42, "secret@gmx.de")) == ["int", "str"]
+    assert redact_parameters({"id_1": 42, "password": "Test1234!"}) == {"id_1": "int", "password": "str"}
+    assert redact_parameters([(1, "a"), (2, "b")], executemany=True) == "<2 parameter sets>"
+
+
+@pytest.mark.asyncio
+async def test_middleware_exposes_the_query_stats_and_flags_repeated_statements():
+    # GIVEN: A route looking accounts up one by one
+    app = fastapi.FastAPI()
+
+    @app.get("/accounts")
+    async def get_accounts() -> list[int]:
+        for _ in range(3):
+            record_query(SELECT_ACCOUNT, 0.001)
+        return [1, 2, 3]
+
+    app.add_middleware(QueryStatsMiddleware, expose_headers=True, repeated_query_threshold=3)
+    warnings: list[str] = []
+    handler_id = loguru.logger.add(warnings.append, level="WARNING", format="{message}")
+
+    # WHEN: I call it
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/accounts")
+    finally:
+        loguru.logger.remove(handler_id)
+
+    # THEN: The response should carry the query stats and the repeated statement should be logged
+    assert response.headers[QUERY_COUNT_HEADER] == "3"
+    assert float(response.headers[QUERY_TIME_HEADER]) == pytest.approx(3.0)
+    assert len(warnings) == 1 and "executed 3 times by GET /accounts" in warnings[0]
@@ -0,0 +1,71 @@
+import io
+import typing
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.models.db_tables.table_collection import DBBaseTable
+from src.utility.database.schema_version import (
+    check_db_schema_version,
+    get_head_revisions,
+    MIGRATIONS_DIR,
+    SchemaVersionMismatchError,
+)
+
+
+class FakeConnection:
+    def __init__(self, revisions: set[str]):
+        self.revisions = revisions
+
+    async def run_sync(self, fn) -> set[str]:
+        return self.revisions
+
+
+def fake_connection(revisions: set[str]) -> AsyncConnection:
+    return typing.cast(AsyncConnection, FakeConnection(revisions))
+
+
+def test_migrations_render_account_table_with_named_constraints():
+    # GIVEN: The alembic config of the backend
+    output = io.StringIO()
+    config = Config(str(MIGRATIONS_DIR.parent.parent.parent / "alembic.ini"), output_buffer=output)
+
+    # WHEN: I render the migrations as SQL
+    command.upgrade(config, "head", sql=True)
+
+    # THEN: The account table should be created with the constraint names the CRUD layer relies on
+    sql = output.getvalue()
+    assert "CREATE TABLE account" in sql
+    assert "CONSTRAINT account_email_key UNIQUE (email)" in sql
+    assert "CONSTRAINT account_username_key UNIQUE (username)" in sql
+    assert "DROP TABLE" not in sql
+
+
+@pytest.mark.asyncio
+async def test_check_db_schema_version_accepts_head():
+    assert await check_db_schema_version(fake_connection(get_head_revisions())) == ",".join(get_head_revisions())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("revisions", [set(), {"0000"}])
+async def test_check_db_schema_version_refuses_other_revisions(revisions: set[str]):
+    with pytest.raises(SchemaVersionMismatchError):
+        await check_db_schema_version(fake_connection(revisions))
+
+
+def test_migrations_create_the_indexes_of_the_models():
+    # GIVEN: The alembic config of the backend and the indexes declared on the models
+    output = io.StringIO()
+    config = Config(str(MIGRATIONS_DIR.parent.parent.parent / "alembic.ini"), output_buffer=output)
+    index_names = {index.name for table in DBBaseTable.metadata.tables.values() for index in table.indexes}
+
+    # WHEN: I render the migrations as SQL
+    command.upgrade(config, "head", sql=True)
+
+    # THEN: Every index of the models should be created by a migration, without locking the table
+    sql = output.getvalue()
+    assert index_names
+    for index_name in index_names:
+        assert f"CREATE INDEX CONCURRENTLY {index_name} ON account" in sql